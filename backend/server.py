@@ -3,13 +3,15 @@ FastAPI Proxy Server — Routes all /api/* requests to Next.js on port 3000.
 The Kubernetes ingress sends /api/* to port 8001. This proxy forwards
 those requests to the Next.js API routes running on port 3000.
 """
+import os
+
 from fastapi import FastAPI, Request
 from fastapi.responses import StreamingResponse, Response
 import httpx
 
 app = FastAPI()
 
-NEXTJS_URL = "http://localhost:3000"
+NEXTJS_URL = os.getenv("NEXTJS_URL", "http://localhost:3000")
 
 @app.api_route("/api/{path:path}", methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "HEAD"])
 async def proxy_to_nextjs(request: Request, path: str):
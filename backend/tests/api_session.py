@@ -0,0 +1,128 @@
+"""
+Pooled HTTP and per-run test data for the API suites
+
+The suites call requests.get/post/... directly; each of those builds and
+throws away a Session, so every test pays a fresh TCP (and TLS, against the
+preview deployment) handshake. install() sends them through one keep-alive
+Session per worker instead, without touching the call sites.
+
+Everything a suite writes is named with the run prefix
+(TEST_<worker>_<run id>_), so parallel workers never collide and cleanup
+removes exactly this run's data and nothing older or newer.
+"""
+import os
+import uuid
+from http.cookiejar import DefaultCookiePolicy
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+POOL_SIZE = 16
+DEFAULT_TIMEOUT = 60  # the slowest routes (AI chat) pass their own; nothing should hang a worker forever
+UPLOAD_BUCKET = "blog-images"  # webapp/app/api/upload/route.ts
+LISTING_REVIEWS_GROUP = "listing-reviews"  # xdist_group for suites that post reviews
+
+
+def make_session(pool_size=POOL_SIZE, retries=2):
+    """Keep-alive Session that retries connection failures only (a request that was sent is never resent)"""
+    session = requests.Session()
+    retry = Retry(total=retries, connect=retries, read=0, status=0, other=0, backoff_factor=0.2)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    # Module-level requests.* never carried cookies between calls; keep it that way so an
+    # auth cookie set in one test can't turn another test's expected 401 into a 200
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    return session
+
+
+def install(session, timeout=DEFAULT_TIMEOUT):
+    """Route requests.get/post/put/patch/delete/... through session; returns the undo callable"""
+    original = requests.api.request
+
+    def request(method, url, **kwargs):
+        kwargs.setdefault("timeout", timeout)
+        return session.request(method=method, url=url, **kwargs)
+
+    requests.api.request = request
+
+    def undo():
+        requests.api.request = original
+    return undo
+
+
+def run_prefix(worker=None, run_id=None):
+    """TEST_<worker>_<run id>_; xdist workers share PYTEST_XDIST_TESTRUNUID, so one run reads as one id"""
+    worker = worker or os.environ.get("PYTEST_XDIST_WORKER", "main")
+    run_id = run_id or os.environ.get("TEST_RUN_ID") or os.environ.get("PYTEST_XDIST_TESTRUNUID", "")[:8] \
+        or uuid.uuid4().hex[:8]
+    return f"TEST_{worker}_{run_id}_"
+
+
+def strip_reviews(metadata, prefix):
+    """
+    PATCH body for directory_listings that drops reviews by prefix-named reviewers,
+    or None when there is nothing to drop. Recomputes the counters the way
+    POST /api/directory/reviews maintains them.
+    """
+    metadata = metadata or {}
+    reviews = metadata.get("gl365_reviews") or []
+    kept = [r for r in reviews if not str(r.get("reviewer_name", "")).startswith(prefix)]
+    if len(kept) == len(reviews):
+        return None
+    dropped = {r.get("id") for r in reviews} - {r.get("id") for r in kept}
+    log = [e for e in metadata.get("review_activity_log") or [] if e.get("review_id") not in dropped]
+    avg = sum(r["rating"] for r in kept) / len(kept) if kept else 0
+    return {
+        "metadata": {**metadata, "gl365_reviews": kept, "review_activity_log": log},
+        "avg_feedback_rating": int(avg * 10 + 0.5) / 10,  # Math.round(avg * 10) / 10
+        "total_feedback_count": len(kept),
+    }
+
+
+class RunData:
+    """Names for the records this worker creates, and what to remove at session end"""
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self.review_listings = set()
+        self.upload_paths = []
+
+    def name(self, label):
+        return f"{self.prefix}{label}"
+
+    def reviewer(self, listing_id, label):
+        """reviewer_name for a review posted to listing_id (registered for cleanup)"""
+        self.review_listings.add(listing_id)
+        return self.name(label)
+
+    def upload_folder(self, folder="test-uploads"):
+        return f"{folder}/{self.prefix.rstrip('_')}"
+
+    def uploaded(self, result):
+        """Register an /api/upload response body for cleanup"""
+        if result.get("path"):
+            self.upload_paths.append(result["path"])
+
+    def cleanup(self, session, supabase_url, service_key):
+        """Remove this run's data with the service role; returns one line per action"""
+        headers = {"apikey": service_key, "Authorization": f"Bearer {service_key}"}
+        rest = f"{supabase_url.rstrip('/')}/rest/v1/directory_listings"
+        done = []
+        for listing_id in sorted(self.review_listings):
+            res = session.get(rest, params={"select": "metadata", "id": f"eq.{listing_id}"}, headers=headers)
+            res.raise_for_status()
+            rows = res.json()
+            patch = strip_reviews(rows[0]["metadata"], self.prefix) if rows else None
+            if patch is None:
+                continue
+            res = session.patch(rest, params={"id": f"eq.{listing_id}"}, headers=headers, json=patch)
+            res.raise_for_status()
+            done.append(f"reviews on {listing_id}: {patch['total_feedback_count']} left")
+        if self.upload_paths:
+            res = session.delete(f"{supabase_url.rstrip('/')}/storage/v1/object/{UPLOAD_BUCKET}", headers=headers,
+                                 json={"prefixes": self.upload_paths})
+            res.raise_for_status()
+            done.append(f"{len(self.upload_paths)} uploads from {UPLOAD_BUCKET}")
+        return done
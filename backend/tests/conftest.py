@@ -0,0 +1,52 @@
+"""
+Shared fixtures for the API suites: pooled HTTP, per-run test data, cleanup
+
+    pytest backend/tests                              # serial
+    pytest backend/tests -n auto --dist loadgroup     # parallel (pytest-xdist)
+
+Every requests.* call in the suites goes through one keep-alive session per
+worker (api_session.install). Records a test creates are named from the
+run_data fixture (TEST_<worker>_<run id>_...) and removed at session end when
+SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY are set; without them the prefix is
+printed so the rows can be found later.
+
+Suites that read-modify-write one shared row (reviews live in a single
+listing's metadata JSON) set pytestmark = pytest.mark.xdist_group(...) so
+--dist loadgroup keeps them on the same worker.
+"""
+import os
+
+import pytest
+
+from api_session import RunData, install, make_session, run_prefix
+
+
+def pytest_configure(config):
+    # Registered by pytest-xdist when it's installed; declared here so serial runs don't warn
+    config.addinivalue_line("markers", "xdist_group(name): run these tests on the same xdist worker")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def api_client():
+    """The worker's pooled session; module-level requests.get/post/... use it too"""
+    session = make_session()
+    undo = install(session)
+    yield session
+    undo()
+    session.close()
+
+
+@pytest.fixture(scope="session")
+def run_data(api_client):
+    """Unique names for created records, cleaned up after the last test on this worker"""
+    data = RunData(run_prefix())
+    yield data
+    if not (data.review_listings or data.upload_paths):
+        return
+    supabase_url = os.getenv("SUPABASE_URL") or os.getenv("NEXT_PUBLIC_SUPABASE_URL")
+    service_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+    if not (supabase_url and service_key):
+        print(f"\nTest data left in place (no SUPABASE_URL/SUPABASE_SERVICE_ROLE_KEY): prefix {data.prefix}")
+        return
+    for line in data.cleanup(api_client, supabase_url, service_key):
+        print(f"\nCleaned up {line}")
@@ -6,12 +6,16 @@ import pytest
 import requests
 import os
 
+from api_session import LISTING_REVIEWS_GROUP
+
 # Use production URL from iteration reports
 BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', 'https://lead-pipeline-23.preview.emergentagent.com').rstrip('/')
 
 # Test listing ID: La Segunda Bakery
 TEST_LISTING_ID = "5813b912-d37f-4c2c-b5d8-17964e5a728a"
 
+pytestmark = pytest.mark.xdist_group(LISTING_REVIEWS_GROUP)
+
 
 class TestReviewTextValidation:
     """Test POST /api/directory/reviews minimum text length validation (10 chars required)"""
@@ -62,11 +66,11 @@ class TestReviewTextValidation:
         })
         assert response.status_code == 400, f"Expected 400, got {response.status_code}: {response.text}"
     
-    def test_accepts_exactly_10_char_text(self):
+    def test_accepts_exactly_10_char_text(self, run_data):
         """Exactly 10 characters should be accepted"""
         response = requests.post(f"{BASE_URL}/api/directory/reviews", json={
             "listing_id": TEST_LISTING_ID,
-            "reviewer_name": "TEST_10Char_Reviewer",
+            "reviewer_name": run_data.reviewer(TEST_LISTING_ID, "10Char_Reviewer"),
             "rating": 5,
             "text": "1234567890"  # Exactly 10 chars
         })
@@ -75,12 +79,12 @@ class TestReviewTextValidation:
         assert data.get("success") == True
         assert "review_id" in data
     
-    def test_accepts_long_review_text(self):
+    def test_accepts_long_review_text(self, run_data):
         """Long review text should be accepted"""
         long_text = "This is an excellent bakery! The Cuban bread is fresh and delicious. Highly recommended for anyone visiting Tampa."
         response = requests.post(f"{BASE_URL}/api/directory/reviews", json={
             "listing_id": TEST_LISTING_ID,
-            "reviewer_name": "TEST_Long_Reviewer",
+            "reviewer_name": run_data.reviewer(TEST_LISTING_ID, "Long_Reviewer"),
             "rating": 5,
             "text": long_text
         })
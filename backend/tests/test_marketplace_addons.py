@@ -19,14 +19,6 @@ BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', 'https://lead-pipeline-23.pre
 TEST_LISTING_ID = "a635441b-b03d-4886-b740-e62106a3c99d"  # Tampa General Hospital (unclaimed free listing)
 
 
-@pytest.fixture(scope="module")
-def api_client():
-    """Shared requests session"""
-    session = requests.Session()
-    session.headers.update({"Content-Type": "application/json"})
-    return session
-
-
 class TestAddonsCatalogAPI:
     """GET /api/directory/addons - Addon catalog endpoint tests"""
 
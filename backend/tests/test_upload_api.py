@@ -170,7 +170,7 @@ class TestUploadImageOptimization:
                 0xD9
             ])
     
-    def test_png_upload_converts_to_webp(self):
+    def test_png_upload_converts_to_webp(self, run_data):
         """Test 3: POST /api/upload with PNG should auto-compress to WebP format"""
         png_data = self.create_minimal_png(200, 200, (255, 128, 64))
         original_size = len(png_data)
@@ -178,12 +178,13 @@ class TestUploadImageOptimization:
         files = {
             'file': ('test_image.png', io.BytesIO(png_data), 'image/png')
         }
-        data = {'folder': 'test-uploads'}
+        data = {'folder': run_data.upload_folder()}
         
         response = requests.post(f"{BASE_URL}/api/upload", files=files, data=data)
         assert response.status_code == 200, f"Expected 200, got {response.status_code}: {response.text}"
         
         result = response.json()
+        run_data.uploaded(result)
         assert result.get('success') == True, f"Upload should succeed: {result}"
         assert 'url' in result, "Response should contain url"
         assert 'originalSize' in result, "Response should contain originalSize"
@@ -197,7 +198,7 @@ class TestUploadImageOptimization:
         
         print(f"PNG upload success: {original_size}B -> {result['compressedSize']}B ({result['savingsPercent']}% savings)")
     
-    def test_jpeg_upload_converts_to_webp(self):
+    def test_jpeg_upload_converts_to_webp(self, run_data):
         """Test 3: POST /api/upload with JPEG should auto-compress to WebP format"""
         jpeg_data = self.create_minimal_jpeg(200, 200)
         original_size = len(jpeg_data)
@@ -205,18 +206,19 @@ class TestUploadImageOptimization:
         files = {
             'file': ('test_image.jpg', io.BytesIO(jpeg_data), 'image/jpeg')
         }
-        data = {'folder': 'test-uploads'}
+        data = {'folder': run_data.upload_folder()}
         
         response = requests.post(f"{BASE_URL}/api/upload", files=files, data=data)
         assert response.status_code == 200, f"Expected 200, got {response.status_code}: {response.text}"
         
         result = response.json()
+        run_data.uploaded(result)
         assert result.get('success') == True, f"Upload should succeed: {result}"
         assert result['format'] == 'webp', f"Format should be webp, got {result['format']}"
         
         print(f"JPEG upload success: {original_size}B -> {result['compressedSize']}B ({result['savingsPercent']}% savings)")
     
-    def test_upload_response_fields(self):
+    def test_upload_response_fields(self, run_data):
         """Test 4: POST /api/upload should return originalSize, compressedSize, savingsPercent, format fields"""
         png_data = self.create_minimal_png(100, 100)
         
@@ -228,6 +230,7 @@ class TestUploadImageOptimization:
         assert response.status_code == 200, f"Expected 200, got {response.status_code}"
         
         result = response.json()
+        run_data.uploaded(result)
         
         # Check all required fields
         required_fields = ['originalSize', 'compressedSize', 'savingsPercent', 'format']
@@ -242,7 +245,7 @@ class TestUploadImageOptimization:
         
         print(f"All required fields present: originalSize={result['originalSize']}, compressedSize={result['compressedSize']}, savingsPercent={result['savingsPercent']}, format={result['format']}")
     
-    def test_skip_optimize_flag(self):
+    def test_skip_optimize_flag(self, run_data):
         """Test 5: POST /api/upload with skip_optimize=true should NOT compress the image"""
         png_data = self.create_minimal_png(150, 150)
         original_size = len(png_data)
@@ -250,12 +253,13 @@ class TestUploadImageOptimization:
         files = {
             'file': ('skip_test.png', io.BytesIO(png_data), 'image/png')
         }
-        data = {'skip_optimize': 'true', 'folder': 'test-uploads'}
+        data = {'skip_optimize': 'true', 'folder': run_data.upload_folder()}
         
         response = requests.post(f"{BASE_URL}/api/upload", files=files, data=data)
         assert response.status_code == 200, f"Expected 200, got {response.status_code}"
         
         result = response.json()
+        run_data.uploaded(result)
         assert result.get('success') == True, f"Upload should succeed: {result}"
         
         # When skip_optimize=true, format should be original format, not webp
@@ -266,7 +270,7 @@ class TestUploadImageOptimization:
         
         print(f"skip_optimize=true works: format={result['format']}, no size change")
     
-    def test_gif_passthrough(self):
+    def test_gif_passthrough(self, run_data):
         """Test 6: POST /api/upload with GIF should NOT convert to WebP (passthrough)"""
         # Create a minimal valid GIF
         gif_data = bytes([
@@ -285,12 +289,13 @@ class TestUploadImageOptimization:
         files = {
             'file': ('test.gif', io.BytesIO(gif_data), 'image/gif')
         }
-        data = {'folder': 'test-uploads'}
+        data = {'folder': run_data.upload_folder()}
         
         response = requests.post(f"{BASE_URL}/api/upload", files=files, data=data)
         assert response.status_code == 200, f"Expected 200, got {response.status_code}: {response.text}"
         
         result = response.json()
+        run_data.uploaded(result)
         assert result.get('success') == True, f"Upload should succeed: {result}"
         
         # GIF should pass through without WebP conversion
@@ -0,0 +1,583 @@
+"""
+In-memory implementation of the PostgREST subset the app and scripts use.
+
+Covers what supabase-js and the scripts' raw REST calls send:
+
+  select    columns, aliases (alias:col), casts (col::text, ignored) and
+            embeds along foreign keys, to-many (directory_listings ->
+            directory_badges) and to-one (directory_badges ->
+            directory_listings), with !inner and embedded filters/order/limit
+            (directory_badges.is_active=eq.true)
+  filters   eq neq gt gte lt lte like ilike is in cs cd ov, each negatable
+            with not., plus nested or=(...) / and=(...) trees
+  order     col.asc|desc[.nullsfirst|.nullslast], several keys
+  paging    limit / offset, or a Range header
+  Prefer    count=exact (Content-Range), return=representation|minimal,
+            resolution=merge-duplicates|ignore-duplicates with on_conflict
+  Accept    application/vnd.pgrst.object+json (.single())
+
+Rows are plain dicts and the schema is loose: a column that no row has reads
+as null instead of raising 42703. Errors use PostgREST's JSON shape and codes
+(23505 on unique violations, PGRST116 for .single() misses) so callers take
+the same branches they do against Supabase.
+"""
+import copy
+import json
+import re
+import uuid
+from datetime import datetime, timezone
+
+OBJECT_MEDIA_TYPE = "application/vnd.pgrst.object+json"
+RESERVED_PARAMS = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+LOGICAL = ("or", "and", "not.or", "not.and")
+_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}")
+
+
+class PostgrestError(Exception):
+    def __init__(self, status, code, message, details=None, hint=None):
+        super().__init__(message)
+        self.status = status
+        self.body = {"code": code, "message": message, "details": details, "hint": hint}
+
+
+def now_iso():
+    return datetime.now(timezone.utc).isoformat()
+
+
+# ---------------------------------------------------------------------------
+# Parsing
+# ---------------------------------------------------------------------------
+
+def split_top_level(text, sep=","):
+    """Split on `sep` outside parentheses, braces and double quotes"""
+    parts, depth, quoted, current = [], 0, False, []
+    i = 0
+    while i < len(text):
+        ch = text[i]
+        if ch == "\\" and quoted and i + 1 < len(text):
+            current.append(text[i:i + 2])
+            i += 2
+            continue
+        if ch == '"':
+            quoted = not quoted
+        elif not quoted and ch in "({":
+            depth += 1
+        elif not quoted and ch in ")}":
+            depth -= 1
+        if ch == sep and depth == 0 and not quoted:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(ch)
+        i += 1
+    parts.append("".join(current))
+    return [p.strip() for p in parts if p.strip()]
+
+
+def unquote(value):
+    if len(value) >= 2 and value[0] == '"' and value[-1] == '"':
+        return value[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+    return value
+
+
+def parse_list(value):
+    """'(a,"b,c")' or '{a,b}' -> ['a', 'b,c']"""
+    inner = value.strip()
+    if inner[:1] in "({" and inner[-1:] in ")}":
+        inner = inner[1:-1]
+    return [unquote(v) for v in split_top_level(inner)]
+
+
+def parse_select(text):
+    """
+    'id, name, badges:directory_badges!inner(id, is_active)' ->
+    [{"column": "id", "alias": "id"}, ..., {"embed": "directory_badges", "alias": "badges",
+     "inner": True, "select": [...]}]
+    """
+    items = []
+    for part in split_top_level(text or "*"):
+        if "(" in part and part.endswith(")"):
+            head, inner = part[:-1].split("(", 1)
+            alias, _, target = head.rpartition(":")
+            target, _, hint = target.partition("!")
+            items.append({"embed": target.strip(), "alias": (alias or target).strip(), "inner": hint == "inner",
+                          "select": parse_select(inner)})
+            continue
+        alias, _, column = part.split("::")[0].rpartition(":")
+        column = column.strip()
+        items.append({"column": column, "alias": (alias or column).strip()})
+    return items
+
+
+def parse_condition(text):
+    """'col.not.ilike.*x*' -> {"column", "op", "value", "negate"}"""
+    column, _, rest = text.partition(".")
+    return dict(_parse_op(rest), column=column)
+
+
+def _parse_op(text):
+    negate = False
+    if text.startswith("not."):
+        negate, text = True, text[4:]
+    op, _, value = text.partition(".")
+    if op not in OPERATORS:
+        raise PostgrestError(400, "PGRST100", f'"failed to parse filter ({op}.{value})"')
+    return {"op": op, "value": value, "negate": negate}
+
+
+def parse_logical(kind, text):
+    """or=(a.eq.1,and(b.gt.2,c.is.null)) -> {"logic": "or", "negate", "items": [...]}"""
+    negate = kind.startswith("not.")
+    items = []
+    for part in split_top_level(text.strip()[1:-1]):
+        for name in LOGICAL:
+            if part.startswith(name + "("):
+                items.append(parse_logical(name, part[len(name):]))
+                break
+        else:
+            items.append(parse_condition(part))
+    return {"logic": kind.split(".")[-1], "negate": negate, "items": items}
+
+
+def parse_order(text):
+    keys = []
+    for part in split_top_level(text):
+        column, *mods = part.split(".")
+        desc = "desc" in mods
+        nulls_first = "nullsfirst" in mods or (desc and "nullslast" not in mods)
+        keys.append((column, desc, nulls_first))
+    return keys
+
+
+def parse_prefer(header):
+    prefs = {}
+    for part in (header or "").split(","):
+        key, _, value = part.strip().partition("=")
+        if key:
+            prefs[key] = value
+    return prefs
+
+
+class Query:
+    """Parsed query string: select tree, filters, order and paging, per embed path"""
+
+    def __init__(self, params):
+        self.select = parse_select(next((v for k, v in params if k == "select"), "*"))
+        self.on_conflict = next((v for k, v in params if k == "on_conflict"), None)
+        self.filters = {}   # embed path ("" for the top level) -> [condition / logical tree]
+        self.order = {}
+        self.limit = {}
+        self.offset = {}
+        for key, value in params:
+            if key in RESERVED_PARAMS - {"order", "limit", "offset"}:
+                continue
+            if key in LOGICAL:
+                self.filters.setdefault("", []).append(parse_logical(key, value))
+                continue
+            path, _, name = key.rpartition(".")
+            if name in ("or", "and"):
+                self.filters.setdefault(path, []).append(parse_logical(name, value))
+            elif name == "order":
+                self.order[path] = parse_order(value)
+            elif name == "limit":
+                self.limit[path] = int(value)
+            elif name == "offset":
+                self.offset[path] = int(value)
+            else:
+                self.filters.setdefault(path, []).append(dict(_parse_op(value), column=name))
+
+
+# ---------------------------------------------------------------------------
+# Evaluation
+# ---------------------------------------------------------------------------
+
+def _as_datetime(value):
+    if isinstance(value, str) and _DATE_RE.match(value):
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+    return None
+
+
+def _coerce(raw, sample):
+    """Query-string value -> something comparable with the row's value"""
+    if isinstance(sample, bool):
+        return raw.lower() == "true"
+    if isinstance(sample, (int, float)):
+        try:
+            return float(raw)
+        except ValueError:
+            return raw
+    if isinstance(sample, (list, dict)):
+        return raw
+    left, right = _as_datetime(sample), _as_datetime(raw)
+    if left is not None and right is not None:
+        return right
+    return raw
+
+
+def _comparable(value, raw):
+    left = _as_datetime(value)
+    if left is not None and _as_datetime(raw) is not None:
+        return left
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else value
+
+
+def _like(value, pattern, flags=0):
+    regex = "".join(".*" if ch in "*%" else "." if ch == "_" else re.escape(ch) for ch in pattern)
+    return value is not None and re.fullmatch(regex, str(value), flags | re.DOTALL) is not None
+
+
+def _array_or_json(raw):
+    raw = raw.strip()
+    if raw.startswith("{") and ":" in raw and '"' in raw:
+        try:
+            return json.loads(raw)
+        except ValueError:
+            pass
+    if raw.startswith("["):
+        return json.loads(raw)
+    return parse_list(raw)
+
+
+def _contains(container, wanted):
+    if isinstance(wanted, dict):
+        return isinstance(container, dict) and all(
+            k in container and _contains(container[k], v) if isinstance(v, (dict, list)) else container.get(k) == v
+            for k, v in wanted.items())
+    if isinstance(container, list):
+        return all(str(w) in [str(c) for c in container] for w in wanted)
+    return False
+
+
+def _compare(op, value, raw):
+    if op == "is":
+        target = {"null": None, "true": True, "false": False, "unknown": None}[raw.lower()]
+        return value is target if target is not None else value is None
+    if op == "in":
+        return value is not None and str(value if not isinstance(value, bool) else str(value).lower()) in parse_list(raw)
+    if op in ("like", "ilike"):
+        return _like(value, raw, re.IGNORECASE if op == "ilike" else 0)
+    if op == "cs":
+        return _contains(value, _array_or_json(raw))
+    if op == "cd":
+        wanted = _array_or_json(raw)
+        return isinstance(value, list) and all(str(v) in [str(w) for w in wanted] for v in value)
+    if op == "ov":
+        return isinstance(value, list) and bool({str(v) for v in value} & set(parse_list(raw)))
+    if value is None:
+        return False
+    target = _coerce(raw, value)
+    left = _comparable(value, raw)
+    try:
+        return {"eq": left == target, "neq": left != target, "gt": left > target, "gte": left >= target,
+                "lt": left < target, "lte": left <= target}[op]
+    except TypeError:
+        return {"eq": str(value) == raw, "neq": str(value) != raw, "gt": str(value) > raw,
+                "gte": str(value) >= raw, "lt": str(value) < raw, "lte": str(value) <= raw}[op]
+
+
+OPERATORS = {"eq", "neq", "gt", "gte", "lt", "lte", "like", "ilike", "is", "in", "cs", "cd", "ov"}
+
+
+def matches(row, condition):
+    if "logic" in condition:
+        results = (matches(row, item) for item in condition["items"])
+        result = any(results) if condition["logic"] == "or" else all(results)
+    else:
+        result = _compare(condition["op"], row.get(condition["column"]), unquote(condition["value"]))
+    return not result if condition["negate"] else result
+
+
+def sort_rows(rows, keys):
+    rows = list(rows)
+    for column, desc, nulls_first in reversed(keys):
+        present = [r for r in rows if r.get(column) is not None]
+        missing = [r for r in rows if r.get(column) is None]
+        present.sort(key=lambda r: _comparable(r[column], r[column]), reverse=desc)
+        rows = missing + present if nulls_first else present + missing
+    return rows
+
+
+def _has_inner(select):
+    return any(item.get("inner") or _has_inner(item["select"]) for item in select if "embed" in item)
+
+
+def content_range(offset, count, total):
+    shown = f"{offset}-{offset + count - 1}" if count else "*"
+    return f"{shown}/{'*' if total is None else total}"
+
+
+# ---------------------------------------------------------------------------
+# Store
+# ---------------------------------------------------------------------------
+
+class LocalPostgrest:
+    """
+    Tables in memory, seeded from fixtures. `schema` maps table name to
+    {"primary_key", "unique": [...], "references": {column: table},
+    "defaults": {...}, "timestamps": [...]}; tables found only in fixtures get
+    an `id` primary key. `max_rows` caps every response like PostgREST's
+    db-max-rows (Supabase defaults to 1000), so unpaged reads truncate here
+    the way they do in production.
+    """
+
+    def __init__(self, schema, fixtures=None, max_rows=None):
+        self.schema = schema
+        self.fixtures = fixtures or {}
+        self.max_rows = max_rows
+        self.reset()
+
+    def reset(self):
+        self.tables = {name: [] for name in self.schema}
+        for name, rows in self.fixtures.items():
+            self.tables[name] = copy.deepcopy(rows)
+        self.indexes = {}  # (table, column) -> {value: [rows]}, built on first use
+
+    def index(self, table, column):
+        """Hash index used for embeds and unique checks, so both stay O(1) per row at generated scale"""
+        key = (table, column)
+        if key not in self.indexes:
+            index = {}
+            for row in self.rows(table):
+                value = row.get(column)
+                if value is not None and not isinstance(value, (list, dict)):
+                    index.setdefault(value, []).append(row)
+            self.indexes[key] = index
+        return self.indexes[key]
+
+    def _drop_indexes(self, *tables):
+        for key in [k for k in self.indexes if k[0] in tables]:
+            del self.indexes[key]
+
+    # -- schema helpers -----------------------------------------------------
+
+    def table_schema(self, table):
+        return self.schema.get(table, {"primary_key": "id"})
+
+    def rows(self, table):
+        if table not in self.tables:
+            raise PostgrestError(404, "42P01", f'relation "public.{table}" does not exist')
+        return self.tables[table]
+
+    def relation(self, parent, child):
+        """('many', fk) when child rows point at parent, ('one', fk) when parent points at child"""
+        for column, target in self.table_schema(child).get("references", {}).items():
+            if target == parent:
+                return "many", column
+        for column, target in self.table_schema(parent).get("references", {}).items():
+            if target == child:
+                return "one", column
+        raise PostgrestError(400, "PGRST200",
+                             f"Could not find a relationship between '{parent}' and '{child}' in the schema cache")
+
+    # -- reads ----------------------------------------------------------------
+
+    def shape(self, table, row, select, query, path=""):
+        """Project one row through the select tree, resolving embeds; None when an !inner embed is empty"""
+        out = {}
+        for item in select:
+            if "embed" not in item:
+                if item["column"] == "*":
+                    out.update({k: copy.deepcopy(v) for k, v in row.items()})
+                else:
+                    out[item["alias"]] = copy.deepcopy(row.get(item["column"]))
+                continue
+            child = item["embed"]
+            kind, fk = self.relation(table, child)
+            child_path = f"{path}.{item['alias']}" if path else item["alias"]
+            pk = self.table_schema(child if kind == "one" else table).get("primary_key", "id")
+            if kind == "many":
+                related = self.index(child, fk).get(row.get(pk), [])
+            else:
+                related = self.index(child, pk).get(row.get(fk), [])
+            related = self.apply(related, query, child_path)
+            shaped = [s for s in (self.shape(child, r, item["select"], query, child_path) for r in related)
+                      if s is not None]
+            if item["inner"] and not shaped:
+                return None
+            out[item["alias"]] = shaped if kind == "many" else (shaped[0] if shaped else None)
+        return out
+
+    def apply(self, rows, query, path=""):
+        for condition in query.filters.get(path, []):
+            rows = [r for r in rows if matches(r, condition)]
+        if path in query.order:
+            rows = sort_rows(rows, query.order[path])
+        offset = query.offset.get(path, 0)
+        limit = query.limit.get(path)
+        return rows[offset:offset + limit if limit is not None else None]
+
+    def select(self, table, query, range_header=None):
+        """(shaped rows, offset, total before paging)"""
+        rows = self.rows(table)
+        for condition in query.filters.get("", []):
+            rows = [r for r in rows if matches(r, condition)]
+        rows = sort_rows(rows, query.order.get("", []))
+        offset, limit = query.offset.get("", 0), query.limit.get("")
+        if range_header:
+            first, _, last = range_header.partition("-")
+            offset = int(first or 0)
+            limit = int(last) - offset + 1 if last else limit
+        if self.max_rows is not None:
+            limit = self.max_rows if limit is None else min(limit, self.max_rows)
+        end = offset + limit if limit is not None else None
+        if _has_inner(query.select):
+            # !inner embeds filter the parents, so shape everything before paging
+            shaped = [s for s in (self.shape(table, r, query.select, query) for r in rows) if s is not None]
+            return shaped[offset:end], offset, len(shaped)
+        return [self.shape(table, r, query.select, query) for r in rows[offset:end]], offset, len(rows)
+
+    # -- writes ---------------------------------------------------------------
+
+    def _conflict_columns(self, table, on_conflict):
+        spec = self.table_schema(table)
+        if on_conflict:
+            return [tuple(c.strip() for c in on_conflict.split(","))]
+        return [(spec.get("primary_key", "id"),)] + [(c,) for c in spec.get("unique", [])]
+
+    def _find_conflict(self, table, row, columns, skip=None):
+        if row.get(columns[0]) is None:
+            return None
+        for existing in self.index(table, columns[0]).get(row[columns[0]], []):
+            if existing is skip:
+                continue
+            if all(row.get(c) is not None and existing.get(c) == row.get(c) for c in columns):
+                return existing
+        return None
+
+    def _check_unique(self, table, row, skip=None):
+        for columns in self._conflict_columns(table, None):
+            if self._find_conflict(table, row, columns, skip) is not None:
+                key = ", ".join(columns)
+                raise PostgrestError(409, "23505", f'duplicate key value violates unique constraint "{table}_{"_".join(columns)}_key"',
+                                     f"Key ({key})=({', '.join(str(row.get(c)) for c in columns)}) already exists.")
+
+    def _new_row(self, table, values):
+        spec = self.table_schema(table)
+        row = copy.deepcopy(spec.get("defaults", {}))
+        row.update(values)
+        pk = spec.get("primary_key", "id")
+        if row.get(pk) is None and pk == "id":
+            row["id"] = str(uuid.uuid4())
+        stamp = now_iso()
+        for column in spec.get("timestamps", []):
+            row.setdefault(column, stamp)
+        return row
+
+    def insert(self, table, body, prefer, on_conflict=None):
+        """Returns the inserted (or merged) rows"""
+        self.rows(table)
+        records = body if isinstance(body, list) else [body]
+        resolution = prefer.get("resolution")
+        written = []
+        for values in records:
+            if not isinstance(values, dict):
+                raise PostgrestError(400, "PGRST102", "All object keys must match")
+            if resolution:
+                columns = self._conflict_columns(table, on_conflict)[0]
+                existing = self._find_conflict(table, values, columns)
+                if existing is not None:
+                    if resolution == "merge-duplicates":
+                        merged = {**existing, **values}
+                        if "updated_at" in self.table_schema(table).get("timestamps", []) and "updated_at" not in values:
+                            merged["updated_at"] = now_iso()
+                        self._check_unique(table, merged, skip=existing)
+                        existing.clear()
+                        existing.update(merged)
+                        self._drop_indexes(table)
+                        written.append(existing)
+                    continue
+            row = self._new_row(table, values)
+            self._check_unique(table, row)
+            self.tables[table].append(row)
+            for (indexed, column), index in self.indexes.items():
+                value = row.get(column)
+                if indexed == table and value is not None and not isinstance(value, (list, dict)):
+                    index.setdefault(value, []).append(row)
+            written.append(row)
+        return written
+
+    def update(self, table, query, values):
+        spec = self.table_schema(table)
+        targets = [r for r in self.rows(table) if all(matches(r, c) for c in query.filters.get("", []))]
+        for row in targets:
+            updated = {**row, **values}
+            self._check_unique(table, updated, skip=row)
+            row.clear()
+            row.update(updated)
+        if "updated_at" in spec.get("timestamps", []) and "updated_at" not in values:
+            for row in targets:
+                row["updated_at"] = now_iso()
+        self._drop_indexes(table)
+        return targets
+
+    def delete(self, table, query):
+        targets = [r for r in self.rows(table) if all(matches(r, c) for c in query.filters.get("", []))]
+        doomed = {id(r) for r in targets}
+        self.tables[table] = [r for r in self.tables[table] if id(r) not in doomed]
+        pk = self.table_schema(table).get("primary_key", "id")
+        keys = {r.get(pk) for r in targets}
+        for child, rows in self.tables.items():  # ON DELETE CASCADE
+            for column, target in self.table_schema(child).get("references", {}).items():
+                if target == table:
+                    self.tables[child] = [r for r in rows if r.get(column) not in keys]
+                    self._drop_indexes(child)
+        self._drop_indexes(table)
+        return targets
+
+    # -- HTTP -----------------------------------------------------------------
+
+    def handle(self, method, table, params, headers, body=None):
+        """
+        One /rest/v1/<table> request. `params` is the multi-valued query
+        string as (key, value) pairs, `headers` lower-cased. Returns
+        (status, response headers, JSON-serializable body or None).
+        """
+        try:
+            return self._handle(method.upper(), table, params, headers, body)
+        except PostgrestError as e:
+            return e.status, {}, e.body
+
+    def _handle(self, method, table, params, headers, body):
+        query = Query(params)
+        prefer = parse_prefer(headers.get("prefer"))
+        single = OBJECT_MEDIA_TYPE in headers.get("accept", "")
+        out_headers = {}
+
+        if method in ("GET", "HEAD"):
+            rows, offset, total = self.select(table, query, headers.get("range"))
+            exact = prefer.get("count") in ("exact", "planned", "estimated")
+            out_headers["Content-Range"] = content_range(offset, len(rows), total if exact else None)
+            status = 206 if exact and len(rows) < total else 200
+            if single:
+                return self._single(rows, status, out_headers)
+            return status, out_headers, None if method == "HEAD" else rows
+
+        if method == "POST":
+            written = self.insert(table, body, prefer, query.on_conflict)
+            status = 201
+        elif method == "PATCH":
+            written = self.update(table, query, body or {})
+            status = 200
+        elif method == "DELETE":
+            written = self.delete(table, query)
+            status = 200
+        else:
+            raise PostgrestError(405, "PGRST117", f"Unsupported HTTP method: {method}")
+
+        if prefer.get("return") != "representation":
+            return (201 if method == "POST" else 204), out_headers, None
+        shaped = [self.shape(table, r, query.select, query) for r in written]
+        if single:
+            return self._single(shaped, status, out_headers)
+        return status, out_headers, shaped
+
+    @staticmethod
+    def _single(rows, status, headers):
+        if len(rows) != 1:
+            raise PostgrestError(406, "PGRST116", "JSON object requested, multiple (or no) rows returned",
+                                 f"The result contains {len(rows)} rows")
+        return (200 if status == 206 else status), headers, rows[0]
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Supabase REST API (PostgREST), seeded from fixtures.
+
+Serves /rest/v1/<table> from memory (see postgrest.py for the supported
+subset) so the API suites, scripts and benchmarks can run without network
+access or shared production data, against the same rows every time:
+
+    python tests/local_supabase/server.py --port 54321
+    export SUPABASE_URL=http://localhost:54321 NEXT_PUBLIC_SUPABASE_URL=http://localhost:54321
+    export SUPABASE_SERVICE_ROLE_KEY=local NEXT_PUBLIC_SUPABASE_ANON_KEY=local
+
+POST /__reset restores the fixtures between runs. Any key is accepted.
+
+In-process (no server needed), hand the ASGI app to httpx:
+
+    app = create_app()
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://local")
+
+Fixtures are JSON arrays in fixtures/<table>.json; --fixtures points at
+another directory (for example one written by a dataset generator).
+"""
+import argparse
+import json
+import os
+import sys
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from postgrest import LocalPostgrest, PostgrestError  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+MAX_ROWS = 1000  # Supabase's default db-max-rows
+
+# Keys, foreign keys and column defaults from the migrations
+# (database/migrations/019_global_directory.sql, supabase/migrations/024_crm_leads_enhanced.sql, ...)
+SCHEMA = {
+    "directory_listings": {
+        "primary_key": "id",
+        "unique": ["slug"],
+        "timestamps": ["created_at", "updated_at"],
+        "defaults": {"subcategories": [], "gallery_images": [], "business_hours": {}, "ai_scraped_data": {},
+                     "tier": "free", "trust_score": 0, "total_feedback_count": 0, "avg_feedback_rating": 0,
+                     "is_published": True, "is_claimed": False, "metadata": {}, "tags": []},
+    },
+    "directory_badges": {
+        "primary_key": "id",
+        "references": {"listing_id": "directory_listings"},
+        "timestamps": ["earned_at", "created_at"],
+        "defaults": {"badge_color": "#39FF14", "earned_details": {}, "is_active": True,
+                     "feedback_threshold_met": False},
+    },
+    "directory_feedback": {
+        "primary_key": "id",
+        "references": {"listing_id": "directory_listings"},
+        "timestamps": ["created_at"],
+        "defaults": {"feedback_type": "general", "categories": {}, "is_red_flag": False, "source": "qr"},
+    },
+    "crm_leads": {
+        "primary_key": "id",
+        "unique": ["email"],
+        "timestamps": ["created_at", "updated_at", "last_activity_at"],
+        "defaults": {"source": "website", "priority": "medium", "tags": [], "status": "new", "lead_score": 0,
+                     "custom_fields": {}},
+    },
+    "directory_scrape_cache": {
+        "primary_key": "url",
+        "references": {"listing_id": "directory_listings"},
+        "timestamps": ["checked_at"],
+        "defaults": {"extracted": {}, "hits": 0},
+    },
+}
+
+
+def load_fixtures(directory=FIXTURES_DIR):
+    """table name -> rows, one <table>.json array per table"""
+    fixtures = {}
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".json"):
+            with open(os.path.join(directory, name), encoding="utf-8") as f:
+                rows = json.load(f)
+            if not isinstance(rows, list):
+                raise ValueError(f"{name}: expected a JSON array of rows")
+            fixtures[name[:-5]] = rows
+    return fixtures
+
+
+def create_app(fixtures_dir=FIXTURES_DIR, schema=SCHEMA, max_rows=MAX_ROWS):
+    store = LocalPostgrest(schema, load_fixtures(fixtures_dir), max_rows)
+    app = FastAPI(title="Local Supabase stand-in")
+    app.state.store = store
+
+    @app.post("/__reset")
+    async def reset():
+        store.reset()
+        return {"tables": {name: len(rows) for name, rows in store.tables.items()}}
+
+    @app.api_route("/rest/v1/{table}", methods=["GET", "HEAD", "POST", "PATCH", "DELETE"])
+    async def rest(request: Request, table: str):
+        body = None
+        if request.method in ("POST", "PATCH"):
+            raw = await request.body()
+            try:
+                body = json.loads(raw) if raw else {}
+            except ValueError as e:
+                error = PostgrestError(400, "PGRST102", f"Empty or invalid json: {e}")
+                return JSONResponse(error.body, status_code=error.status)
+        headers = {k.lower(): v for k, v in request.headers.items()}
+        status, out_headers, payload = store.handle(request.method, table, request.query_params.multi_items(),
+                                                    headers, body)
+        if payload is None:
+            return Response(status_code=status, headers=out_headers)
+        return JSONResponse(payload, status_code=status, headers=out_headers)
+
+    return app
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serve fixture data through a local PostgREST stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=54321)
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="directory of <table>.json fixture files")
+    parser.add_argument("--max-rows", type=int, default=MAX_ROWS, help="response row cap (db-max-rows); 0 = none")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    import uvicorn
+
+    opts = parse_args(argv)
+    app = create_app(opts.fixtures, max_rows=opts.max_rows or None)
+    counts = ", ".join(f"{name} {len(rows)}" for name, rows in app.state.store.tables.items())
+    print(f"Local Supabase on http://{opts.host}:{opts.port} ({counts})")
+    uvicorn.run(app, host=opts.host, port=opts.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Booking contention benchmark for POST /api/bookings.
+
+tests/test_stress_booking.py checks that 5 threads can't double-book one
+slot. This drives hundreds of concurrent clients at once, each booking a mix
+of distinct slots and "hot" slots shared with other clients, and measures
+what slot-locking costs the calendar:
+
+  - accepted bookings/sec (201s over wall time)
+  - conflict-rejection latency (409 SLOT_TAKEN responses)
+  - lock-wait time: the route's slot_check duration from its Server-Timing
+    header (only sent when the app runs with BOOKING_SERVER_TIMING=1), split
+    by hot vs distinct slots, plus the client-side latency hot-slot requests
+    pay over distinct ones
+  - double bookings in the end state, both from the responses (more than one
+    201 for a slot) and from GET /api/bookings after the run
+
+Every client sends its own X-Forwarded-For so the per-IP rate limit sees
+separate visitors. Slots are placed --days-ahead days out, names start with
+TEST_Bench and source is the run tag; bookings created by the run are
+cancelled afterwards unless --keep. The JSON report goes to test_reports/.
+
+Usage:
+    python tests/perf/booking_bench.py --base-url http://localhost:3000
+    python tests/perf/booking_bench.py --clients 400 --attempts 2 --overlap 0.8 --hot-slots 10
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from loadgen import _ms, git_revision, percentile, write_report  # noqa: E402
+
+SLOT_MINUTES = 15
+SLOT_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+
+def plan_attempts(clients, attempts, overlap, hot_slots, start, seed=365):
+    """
+    [(client, slot, hot)] for every booking attempt. A share `overlap` of the
+    attempts targets one of `hot_slots` shared slots; the rest get a slot of
+    their own.
+    """
+    rng = random.Random(seed)
+    hot = [start + timedelta(minutes=SLOT_MINUTES * i) for i in range(hot_slots)]
+    next_distinct = start + timedelta(minutes=SLOT_MINUTES * hot_slots)
+    plan = []
+    for client in range(clients):
+        for _ in range(attempts):
+            if hot and rng.random() < overlap:
+                plan.append((client, rng.choice(hot), True))
+            else:
+                plan.append((client, next_distinct, False))
+                next_distinct += timedelta(minutes=SLOT_MINUTES)
+    return plan
+
+
+def parse_server_timing(header):
+    """'slot_check;dur=12, insert;dur=30' -> {'slot_check': 12.0, 'insert': 30.0}"""
+    timings = {}
+    for part in (header or "").split(","):
+        name, _, params = part.strip().partition(";")
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "dur" and name:
+                try:
+                    timings[name] = float(value)
+                except ValueError:
+                    pass
+    return timings
+
+
+def normalize_slot(value):
+    """Naive UTC datetime for a slot string as sent or as returned by the API"""
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _latency_summary(values):
+    return {"n": len(values), "p50_ms": _ms(percentile(values, 50)), "p95_ms": _ms(percentile(values, 95)),
+            "p99_ms": _ms(percentile(values, 99))}
+
+
+def _ms_summary(values):
+    """Same shape for values already in milliseconds (Server-Timing)"""
+    return {"n": len(values), "p50_ms": percentile(values, 50), "p95_ms": percentile(values, 95),
+            "p99_ms": percentile(values, 99)}
+
+
+async def book_all(client, plan, run_tag, concurrency):
+    """Fire the planned attempts, all clients released together; returns one record per attempt"""
+    by_client = defaultdict(list)
+    for client_id, slot, hot in plan:
+        by_client[client_id].append((slot, hot))
+    semaphore = asyncio.Semaphore(concurrency)
+    go = asyncio.Event()
+    records = []
+
+    async def one_client(client_id, attempts):
+        headers = {"X-Forwarded-For": f"10.{client_id // 65536 % 256}.{client_id // 256 % 256}.{client_id % 256}"}
+        await go.wait()
+        for n, (slot, hot) in enumerate(attempts):
+            body = {
+                "full_name": f"TEST_Bench_Client{client_id}_{n}",
+                "email": f"test_bench{client_id}_{n}@example.com",
+                "phone": f"555-{client_id % 10000:04d}",
+                "preferred_datetime": slot.strftime(SLOT_FORMAT),
+                "source": run_tag,
+                "status": "pending",
+            }
+            async with semaphore:
+                sent = time.monotonic()
+                try:
+                    res = await client.post("/api/bookings", json=body, headers=headers)
+                    status = res.status_code
+                    timing = parse_server_timing(res.headers.get("server-timing"))
+                    booking_id = (res.json().get("booking") or {}).get("id") if status == 201 else None
+                except (httpx.HTTPError, ValueError):
+                    status, timing, booking_id = "transport", {}, None
+                latency = time.monotonic() - sent
+            records.append({"slot": slot, "hot": hot, "status": status, "latency": latency,
+                            "timing": timing, "booking_id": booking_id})
+
+    tasks = [asyncio.ensure_future(one_client(c, a)) for c, a in by_client.items()]
+    await asyncio.sleep(0)
+    started = time.monotonic()
+    go.set()
+    await asyncio.gather(*tasks)
+    return records, time.monotonic() - started
+
+
+async def end_state(client, slots):
+    """slot -> number of non-cancelled bookings, read back from GET /api/bookings"""
+    first, last = min(slots), max(slots)
+    res = await client.get("/api/bookings", params={"startDate": first.date().isoformat(),
+                                                    "endDate": last.date().isoformat()})
+    res.raise_for_status()
+    wanted = set(slots)
+    counts = Counter()
+    for booking in res.json().get("bookings", []):
+        if booking.get("status") == "cancelled" or not booking.get("preferred_datetime"):
+            continue
+        slot = normalize_slot(booking["preferred_datetime"])
+        if slot in wanted:
+            counts[slot] += 1
+    return counts
+
+
+async def cancel(client, booking_ids, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(booking_id):
+        async with semaphore:
+            try:
+                res = await client.put("/api/bookings", json={"id": booking_id, "status": "cancelled"})
+                return res.status_code == 200
+            except httpx.HTTPError:
+                return False
+
+    results = await asyncio.gather(*(one(b) for b in booking_ids))
+    return sum(results)
+
+
+def summarize(records, elapsed, end_counts=None):
+    statuses = Counter(str(r["status"]) for r in records)
+    accepted = [r for r in records if r["status"] == 201]
+    conflicts = [r for r in records if r["status"] == 409]
+    accepted_per_slot = Counter(r["slot"] for r in accepted)
+    doubles = {slot for slot, n in accepted_per_slot.items() if n > 1}
+    if end_counts is not None:
+        doubles |= {slot for slot, n in end_counts.items() if n > 1}
+
+    def slot_check(hot):
+        return [r["timing"]["slot_check"] for r in records if r["hot"] == hot and "slot_check" in r["timing"]]
+
+    hot_latency = percentile([r["latency"] for r in records if r["hot"] and r["status"] in (201, 409)], 50)
+    distinct_latency = percentile([r["latency"] for r in accepted if not r["hot"]], 50)
+    return {
+        "attempts": len(records),
+        "elapsed_s": round(elapsed, 3),
+        "statuses": dict(sorted(statuses.items())),
+        "accepted": len(accepted),
+        "accepted_per_s": round(len(accepted) / elapsed, 2) if elapsed > 0 else None,
+        "attempts_per_s": round(len(records) / elapsed, 2) if elapsed > 0 else None,
+        "rate_limited": statuses.get("429", 0),
+        "errors": sum(n for s, n in statuses.items() if s == "transport" or s.startswith("5")),
+        "accepted_latency": _latency_summary([r["latency"] for r in accepted]),
+        "conflict_latency": _latency_summary([r["latency"] for r in conflicts]),
+        "lock_wait": {
+            "slot_check_hot": _ms_summary(slot_check(True)),
+            "slot_check_distinct": _ms_summary(slot_check(False)),
+            "insert": _ms_summary([r["timing"]["insert"] for r in accepted if "insert" in r["timing"]]),
+            "hot_slot_overhead_p50_ms": (_ms(hot_latency - distinct_latency)
+                                         if hot_latency is not None and distinct_latency is not None else None),
+        },
+        "slots": {"hot": len({r["slot"] for r in records if r["hot"]}),
+                  "distinct": len({r["slot"] for r in records if not r["hot"]}),
+                  "verified_end_state": end_counts is not None},
+        "double_booked": sorted(slot.strftime(SLOT_FORMAT) for slot in doubles),
+    }
+
+
+async def run_bench(opts, transport=None):
+    """Book, verify and clean up; returns the report dict"""
+    start = (datetime.now(timezone.utc).replace(tzinfo=None, minute=0, second=0, microsecond=0)
+             + timedelta(days=opts.days_ahead))
+    start = start.replace(hour=8)
+    plan = plan_attempts(opts.clients, opts.attempts, opts.overlap, opts.hot_slots, start, opts.seed)
+    run_tag = f"booking_bench_{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')}"
+    limits = httpx.Limits(max_connections=opts.concurrency, max_keepalive_connections=opts.concurrency)
+
+    async with httpx.AsyncClient(base_url=opts.base_url, timeout=opts.timeout, limits=limits,
+                                 transport=transport) as client:
+        records, elapsed = await book_all(client, plan, run_tag, opts.concurrency)
+        end_counts = None
+        if not opts.no_verify:
+            end_counts = await end_state(client, sorted({slot for _, slot, _ in plan}))
+        cancelled = 0
+        created = [r["booking_id"] for r in records if r["booking_id"]]
+        if not opts.keep and created:
+            cancelled = await cancel(client, created, opts.concurrency)
+
+    report = summarize(records, elapsed, end_counts)
+    report["cancelled"] = cancelled
+    report["run"] = {"tag": run_tag, "clients": opts.clients, "attempts_per_client": opts.attempts,
+                     "overlap": opts.overlap, "hot_slots": opts.hot_slots, "concurrency": opts.concurrency,
+                     "first_slot": start.strftime(SLOT_FORMAT), "seed": opts.seed}
+    return report
+
+
+def print_report(report):
+    run = report["run"]
+    print(f"{report['attempts']} attempts from {run['clients']} clients in {report['elapsed_s']}s "
+          f"({report['attempts_per_s']}/s): {report['statuses']}")
+    print(f"Accepted: {report['accepted']} ({report['accepted_per_s']}/s), "
+          f"p50 {report['accepted_latency']['p50_ms']}ms p99 {report['accepted_latency']['p99_ms']}ms")
+    conflict = report["conflict_latency"]
+    print(f"Conflicts: {conflict['n']}, p50 {conflict['p50_ms']}ms p99 {conflict['p99_ms']}ms")
+    lock = report["lock_wait"]
+    print(f"Slot check p50/p99: hot {lock['slot_check_hot']['p50_ms']}/{lock['slot_check_hot']['p99_ms']}ms, "
+          f"distinct {lock['slot_check_distinct']['p50_ms']}/{lock['slot_check_distinct']['p99_ms']}ms; "
+          f"hot-slot overhead p50 {lock['hot_slot_overhead_p50_ms']}ms")
+    if not lock["slot_check_hot"]["n"] and not lock["slot_check_distinct"]["n"]:
+        print("WARNING: no Server-Timing headers; start the app with BOOKING_SERVER_TIMING=1 for lock-wait times")
+    if report["rate_limited"]:
+        print(f"WARNING: {report['rate_limited']} attempts were rate limited (429)")
+    if report["double_booked"]:
+        print(f"DOUBLE BOOKED: {len(report['double_booked'])} slots, e.g. {', '.join(report['double_booked'][:5])}")
+    else:
+        print("No double bookings" + ("" if report["slots"]["verified_end_state"] else " (end state not verified)"))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark booking throughput under slot contention")
+    parser.add_argument("--base-url", default=os.getenv("LOAD_BASE_URL", "http://localhost:3000"))
+    parser.add_argument("--clients", type=int, default=200, help="concurrent booking clients")
+    parser.add_argument("--attempts", type=int, default=3, help="bookings each client attempts, back to back")
+    parser.add_argument("--overlap", type=float, default=0.5, help="share of attempts aimed at shared hot slots")
+    parser.add_argument("--hot-slots", type=int, default=20, help="number of shared hot slots")
+    parser.add_argument("--concurrency", type=int, default=200, help="max requests in flight")
+    parser.add_argument("--days-ahead", type=int, default=400, help="place the slots this far out")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=365)
+    parser.add_argument("--keep", action="store_true", help="don't cancel the bookings afterwards")
+    parser.add_argument("--no-verify", action="store_true", help="skip reading back the end state")
+    parser.add_argument("--label", default="booking_bench", help="report file name prefix")
+    parser.add_argument("--output", help="report path (default test_reports/<label>_<utc timestamp>.json)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    opts = parse_args(argv)
+    report = asyncio.run(run_bench(opts))
+    report["git_revision"] = git_revision()
+    report["base_url"] = opts.base_url
+    print_report(report)
+    print(f"\nReport written to {write_report(report, opts.output, opts.label)}")
+    return 1 if report["double_booked"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
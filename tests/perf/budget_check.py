@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Per-endpoint performance budgets.
+
+budgets.json (committed next to this file) lists the routes that matter for
+page loads, each with a p95 latency budget and a maximum response size:
+
+    {"name": "directory_list", "path": "/api/directory", "query": {"limit": "24"},
+     "p95_ms": 600, "max_bytes": 200000}
+
+measure() runs a short warm benchmark (a few discarded warmup requests, then
+`samples` timed ones per route) and compare() checks the results against
+both the budgets and the last *passing* report in test_reports/, so a route
+fails when it is over budget or has regressed past tolerance since the last
+good run, even while still under budget. Response size is the decoded body,
+so compression settings don't move it.
+
+tests/test_perf_budgets.py runs this as a pytest suite (one test per route,
+saving its report only with PERF_SAVE_REPORT=1); it can also be run directly:
+
+    python tests/perf/budget_check.py --base-url http://localhost:3000
+    python tests/perf/budget_check.py --baseline test_reports/perf_budget_20260101T000000Z.json
+"""
+import argparse
+import asyncio
+import glob
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from loadgen import REPO_ROOT, REPORT_DIR, _ms, git_revision, percentile, write_report  # noqa: E402
+
+BUDGETS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "budgets.json")
+REPORT_LABEL = "perf_budget"
+
+
+@dataclass
+class Violation:
+    name: str
+    kind: str  # status | p95_budget | bytes_budget | p95_regression | bytes_regression
+    actual: float
+    limit: float
+    detail: str = ""
+
+
+def load_budgets(path=BUDGETS_PATH):
+    with open(path, encoding="utf-8") as f:
+        budgets = json.load(f)
+    names = [e["name"] for e in budgets["endpoints"]]
+    if len(names) != len(set(names)):
+        raise ValueError(f"Duplicate endpoint names in {path}")
+    return budgets
+
+
+async def measure(budgets, base_url, transport=None, timeout=30.0):
+    """name -> {p50_ms, p95_ms, max_ms, max_bytes, statuses, samples}"""
+    defaults = budgets.get("defaults", {})
+    warmup, samples = defaults.get("warmup", 3), defaults.get("samples", 20)
+    semaphore = asyncio.Semaphore(defaults.get("concurrency", 4))
+    results = {}
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, transport=transport) as client:
+        async def timed(endpoint):
+            async with semaphore:
+                started = time.monotonic()
+                try:
+                    res = await client.request(endpoint.get("method", "GET"), endpoint["path"],
+                                               params=endpoint.get("query"))
+                    body = await res.aread()
+                    return time.monotonic() - started, res.status_code, len(body)
+                except httpx.HTTPError:
+                    return time.monotonic() - started, "transport", 0
+
+        for endpoint in budgets["endpoints"]:
+            for _ in range(warmup):
+                await timed(endpoint)
+            runs = await asyncio.gather(*(timed(endpoint) for _ in range(samples)))
+            latencies = [latency for latency, _, _ in runs]
+            statuses = sorted({str(status) for _, status, _ in runs})
+            results[endpoint["name"]] = {
+                "path": endpoint["path"],
+                "query": endpoint.get("query", {}),
+                "samples": len(runs),
+                "statuses": statuses,
+                "p50_ms": _ms(percentile(latencies, 50)),
+                "p95_ms": _ms(percentile(latencies, 95)),
+                "max_ms": _ms(max(latencies)),
+                "max_bytes": max(size for _, _, size in runs),
+            }
+    return results
+
+
+def compare(results, budgets, previous=None):
+    """Violations of the budgets, and regressions against `previous` (an earlier report's results)"""
+    defaults = budgets.get("defaults", {})
+    p95_tolerance = defaults.get("p95_tolerance", 1.25)
+    min_regression = defaults.get("min_p95_regression_ms", 25)
+    bytes_tolerance = defaults.get("bytes_tolerance", 1.1)
+    previous = previous or {}
+    violations = []
+
+    for endpoint in budgets["endpoints"]:
+        name = endpoint["name"]
+        result = results.get(name)
+        if result is None:
+            continue
+        expected = str(endpoint.get("status", 200))
+        if result["statuses"] != [expected]:
+            violations.append(Violation(name, "status", 0, 0, f"got {', '.join(result['statuses'])}, expected {expected}"))
+            continue
+        if result["p95_ms"] > endpoint["p95_ms"]:
+            violations.append(Violation(name, "p95_budget", result["p95_ms"], endpoint["p95_ms"]))
+        if result["max_bytes"] > endpoint["max_bytes"]:
+            violations.append(Violation(name, "bytes_budget", result["max_bytes"], endpoint["max_bytes"]))
+
+        before = previous.get(name)
+        if not before:
+            continue
+        p95_limit = round(before["p95_ms"] * p95_tolerance, 1)
+        if result["p95_ms"] > p95_limit and result["p95_ms"] - before["p95_ms"] > min_regression:
+            violations.append(Violation(name, "p95_regression", result["p95_ms"], p95_limit,
+                                        f"was {before['p95_ms']}ms"))
+        bytes_limit = int(before["max_bytes"] * bytes_tolerance)
+        if result["max_bytes"] > bytes_limit:
+            violations.append(Violation(name, "bytes_regression", result["max_bytes"], bytes_limit,
+                                        f"was {before['max_bytes']} bytes"))
+    return violations
+
+
+def previous_report(report_dir=REPORT_DIR, label=REPORT_LABEL):
+    """Most recent passing report, or None"""
+    for path in sorted(glob.glob(os.path.join(report_dir, f"{label}_*.json")), reverse=True):
+        try:
+            with open(path, encoding="utf-8") as f:
+                report = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if report.get("passed"):
+            report["path"] = path
+            return report
+    return None
+
+
+def format_diff(violations, results, previous=None):
+    """Table of every violating route: actual vs limit vs previous run"""
+    previous = previous or {}
+    lines = [f"{'endpoint':<24} {'check':<17} {'actual':>10} {'limit':>10} {'previous':>10}  note"]
+    for v in violations:
+        before = previous.get(v.name, {})
+        unit = "max_bytes" if "bytes" in v.kind else "p95_ms"
+        was = before.get(unit, "-") if v.kind != "status" else "-"
+        actual = results[v.name][unit] if v.kind != "status" else "-"
+        limit = v.limit if v.kind != "status" else "-"
+        lines.append(f"{v.name:<24} {v.kind:<17} {actual:>10} {limit:>10} {was:>10}  {v.detail}")
+    return "\n".join(lines)
+
+
+def build_report(results, violations, budgets_path, baseline=None):
+    return {
+        "label": REPORT_LABEL,
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "budgets": os.path.relpath(budgets_path, REPO_ROOT),
+        "baseline": baseline,
+        "passed": not violations,
+        "violations": [v.__dict__ for v in violations],
+        "results": results,
+    }
+
+
+def run_check(base_url, budgets_path=BUDGETS_PATH, baseline_path=None, report_dir=REPORT_DIR, transport=None,
+              save=True):
+    """Measure, compare and (optionally) write the report; returns (report, violations, previous results)"""
+    budgets = load_budgets(budgets_path)
+    if baseline_path:
+        with open(baseline_path, encoding="utf-8") as f:
+            previous = {**json.load(f), "path": baseline_path}
+    else:
+        previous = previous_report(report_dir)
+    previous_results = previous["results"] if previous else {}
+
+    results = asyncio.run(measure(budgets, base_url, transport))
+    violations = compare(results, budgets, previous_results)
+    report = build_report(results, violations, budgets_path, previous["path"] if previous else None)
+    report["base_url"] = base_url
+    if save:
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        path, n = os.path.join(report_dir, f"{REPORT_LABEL}_{stamp}.json"), 0
+        while os.path.exists(path):  # never overwrite a baseline written in the same second
+            n += 1
+            path = os.path.join(report_dir, f"{REPORT_LABEL}_{stamp}_{n}.json")
+        report["report_path"] = write_report(report, path)
+    return report, violations, previous_results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Check API routes against their performance budgets")
+    parser.add_argument("--base-url", default=os.getenv("PERF_BASE_URL", "http://localhost:3000"))
+    parser.add_argument("--budgets", default=BUDGETS_PATH)
+    parser.add_argument("--baseline", help="report to compare against (default: latest passing perf_budget report)")
+    parser.add_argument("--no-save", action="store_true", help="don't write a report")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    opts = parse_args(argv)
+    report, violations, previous = run_check(opts.base_url, opts.budgets, opts.baseline, save=not opts.no_save)
+    for name, result in report["results"].items():
+        print(f"{name:<24} p95 {result['p95_ms']:>8}ms  {result['max_bytes']:>9} bytes  {','.join(result['statuses'])}")
+    if violations:
+        print(f"\n{len(violations)} budget violations:\n{format_diff(violations, report['results'], previous)}")
+    else:
+        print("\nAll routes within budget" + (f" (compared with {report['baseline']})" if report["baseline"] else ""))
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
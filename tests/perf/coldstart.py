@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Cold-start profiler for the Python services.
+
+Starts the service from scratch, the way a new pod does, and breaks down where
+startup time goes:
+
+  imports          `python -X importtime` tree of the service module. The
+                   module's own self time is the app construction (FastAPI(),
+                   middleware, route decorators), listed separately.
+  port_bound_ms    from spawning `uvicorn <module>:app` until the port accepts
+                   connections (includes the lifespan startup)
+  health_ms        until GET /health returns 200
+  first_success_ms until the first real request succeeds (a proxied GET through
+                   a local upstream stub; one generated image from the fake provider)
+  background_ms    image service only: until /health reports every deferred
+                   import as loaded
+
+Each timing is the median of --runs fresh processes.
+
+Usage:
+    python tests/perf/coldstart.py --target proxy
+    python tests/perf/coldstart.py --target image --runs 5 --min-ms 5
+    python tests/perf/coldstart.py --target image --provider nano_banana   # real SDK import, needs EMERGENT_LLM_KEY
+
+The report is written to test_reports/coldstart_<target>_<stamp>.json.
+"""
+import argparse
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from loadgen import git_revision, write_report  # noqa: E402
+from soak import TARGETS, free_port, spawn  # noqa: E402
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)\s*$")
+
+# The request that proves each service is actually serving
+FIRST_REQUEST = {
+    "proxy": ("GET", "/api/soak/json", {"params": {"kb": "4"}}),
+    "image": ("POST", "/api/generate-image", {"json": {"prompt": "Cold start probe", "count": 1}}),
+}
+
+
+def parse_importtime(text):
+    """
+    Import tree from `-X importtime` stderr. Lines are printed post-order
+    (children before their parent), indented two spaces per level.
+    Returns the root nodes: {"name", "self_ms", "cumulative_ms", "children"}.
+    """
+    pending = {}
+    for line in text.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        depth = (len(indent) - 1) // 2
+        node = {"name": name, "self_ms": int(self_us) / 1000, "cumulative_ms": int(cumulative_us) / 1000,
+                "children": pending.pop(depth + 1, [])}
+        pending.setdefault(depth, []).append(node)
+    return pending.get(0, [])
+
+
+def flatten(nodes, min_ms=1.0, max_depth=4, depth=0):
+    """(depth, node) rows, biggest cumulative first, pruned below min_ms"""
+    rows = []
+    for node in sorted(nodes, key=lambda n: -n["cumulative_ms"]):
+        if node["cumulative_ms"] < min_ms:
+            continue
+        rows.append((depth, node))
+        if depth + 1 < max_depth:
+            rows += flatten(node["children"], min_ms, max_depth, depth + 1)
+    return rows
+
+
+def target_command(target):
+    """(app dir, module name) for `uvicorn --app-dir <dir> <module>:app`"""
+    path = TARGETS[target]["module"]
+    return os.path.dirname(path), os.path.splitext(os.path.basename(path))[0]
+
+
+def target_env(target, provider=None, upstream_url=None):
+    env = dict(os.environ)
+    for key, value in TARGETS[target]["env"].items():
+        env.setdefault(key, value)
+    if target == "image":
+        scratch = tempfile.mkdtemp(prefix="coldstart_image_")
+        env.update(IMAGE_PROVIDER=provider or env.get("IMAGE_PROVIDER", "fake"), FAKE_IMAGE_LATENCY="fixed:1",
+                   FAKE_IMAGE_NOISE="0", FAKE_IMAGE_ERROR_RATE="0")
+        env.setdefault("IMAGE_CACHE_DIR", os.path.join(scratch, "cache"))
+        env.setdefault("IMAGE_DERIVATIVES_DIR", os.path.join(scratch, "derivatives"))
+    if upstream_url:
+        env["NEXTJS_URL"] = upstream_url
+    return env
+
+
+def import_profile(target, env):
+    app_dir, module = target_command(target)
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=app_dir, env=env,
+                          capture_output=True, text=True, timeout=120)
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    roots = parse_importtime(proc.stderr)
+    own = next((n for n in roots if n["name"] == module), None)
+    return {
+        "total_ms": round(sum(n["cumulative_ms"] for n in roots), 1),
+        "module_ms": own and own["cumulative_ms"],
+        "app_construction_ms": own and own["self_ms"],
+        "tree": roots,
+    }
+
+
+def _wait(check, deadline, interval=0.005):
+    while time.monotonic() < deadline:
+        try:
+            if check():
+                return True
+        except (OSError, httpx.HTTPError):
+            pass
+        time.sleep(interval)
+    return False
+
+
+def cold_start(target, env, timeout=60.0):
+    """One fresh `uvicorn` process; milliseconds from spawn to each milestone"""
+    app_dir, module = target_command(target)
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    method, path, kwargs = FIRST_REQUEST[target]
+    started = time.monotonic()
+    proc = subprocess.Popen([sys.executable, "-m", "uvicorn", f"{module}:app", "--app-dir", app_dir,
+                             "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"], env=env)
+    deadline = started + timeout
+    timings = {}
+
+    def mark(name):
+        timings[name] = round((time.monotonic() - started) * 1000, 1)
+
+    def port_open():
+        with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+            return True
+
+    try:
+        with httpx.Client(base_url=base, timeout=30.0) as client:
+            if _wait(port_open, deadline):
+                mark("port_bound_ms")
+            if _wait(lambda: client.get("/health").status_code == 200, deadline):
+                mark("health_ms")
+            if _wait(lambda: client.request(method, path, **kwargs).is_success, deadline, interval=0.05):
+                mark("first_success_ms")
+            if target == "image":
+                def background_done():
+                    states = client.get("/health").json().get("deferred_imports", {})
+                    return all(s["state"] in ("loaded", "error") for s in states.values())
+                if _wait(background_done, deadline, interval=0.05):
+                    mark("background_ms")
+                timings["deferred_imports"] = client.get("/health").json().get("deferred_imports")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+    return timings
+
+
+def summarize(runs):
+    keys = [k for k in ("port_bound_ms", "health_ms", "first_success_ms", "background_ms")
+            if any(k in r for r in runs)]
+    return {k: statistics.median(r[k] for r in runs if k in r) for k in keys}
+
+
+def print_report(report, min_ms, depth):
+    imports = report["imports"]
+    print(f"Import of {report['module']}: {imports['module_ms']} ms "
+          f"(app construction {imports['app_construction_ms']} ms); interpreter total {imports['total_ms']} ms\n")
+    print(f"{'cumulative':>11} {'self':>8}  module")
+    for level, node in flatten(imports["tree"], min_ms, depth):
+        print(f"{node['cumulative_ms']:>9.1f}ms {node['self_ms']:>6.1f}ms  {'  ' * level}{node['name']}")
+    print(f"\nCold start over {len(report['runs'])} runs (median):")
+    for key, value in report["startup"].items():
+        print(f"  {key:<18} {value:>8.1f}")
+    deferred = report["runs"][-1].get("deferred_imports") if report["runs"] else None
+    for name, state in (deferred or {}).items():
+        print(f"  deferred {name}: {state['state']} in {state['seconds']} s{' (' + state['error'] + ')' if state['error'] else ''}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Profile imports and cold start of a Python service")
+    parser.add_argument("--target", choices=sorted(TARGETS), default="proxy")
+    parser.add_argument("--runs", type=int, default=3, help="fresh processes to time")
+    parser.add_argument("--provider", help="image target: IMAGE_PROVIDER for the run (default fake)")
+    parser.add_argument("--min-ms", type=float, default=2.0, help="hide imports cheaper than this")
+    parser.add_argument("--depth", type=int, default=4, help="levels of the import tree to print")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--output", help="report path (default test_reports/coldstart_<target>_<utc timestamp>.json)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    opts = parse_args(argv)
+    upstream = None
+    try:
+        upstream_url = None
+        if opts.target == "proxy":
+            upstream_port = free_port()
+            upstream = spawn(["--serve", "upstream", "--port", str(upstream_port)], upstream_port, "/docs")
+            upstream_url = f"http://127.0.0.1:{upstream_port}"
+        env = target_env(opts.target, opts.provider, upstream_url)
+        started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        imports = import_profile(opts.target, env)
+        runs = [cold_start(opts.target, env, opts.timeout) for _ in range(opts.runs)]
+    finally:
+        if upstream:
+            upstream.terminate()
+            upstream.wait(timeout=10)
+
+    report = {
+        "label": f"coldstart_{opts.target}",
+        "started_at": started_at,
+        "git_revision": git_revision(),
+        "target": opts.target,
+        "module": target_command(opts.target)[1],
+        "imports": imports,
+        "startup": summarize(runs),
+        "runs": runs,
+    }
+    print_report(report, opts.min_ms, opts.depth)
+    print(f"\nReport written to {write_report(report, opts.output, report['label'])}")
+    missing = [k for k in ("port_bound_ms", "health_ms", "first_success_ms") if k not in report["startup"]]
+    if missing:
+        print(f"Never reached: {', '.join(missing)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Asyncio load generator for the GreenLine365 API.
+
+Replays the requests harvested from the functional test suites (see
+request_catalog.py) against a running server at a fixed arrival rate (open
+loop, --rps) or as fast as --concurrency allows (closed loop, --rps 0), and
+writes p50/p95/p99 latency, status breakdown, error rate and throughput per
+endpoint as JSON into test_reports/, so each release gets a comparable
+capacity number.
+
+Latency is measured from the moment a request was *scheduled*, not when a
+connection became free, so a saturated server shows up as rising latency
+instead of a silently lower request rate (no coordinated omission);
+`service_ms` is the time on the wire alone.
+
+Error rate counts transport failures and 5xx. 4xx responses are reported per
+status but not counted as errors, since several suites probe 404/400 paths
+on purpose.
+
+Usage:
+    python tests/perf/loadgen.py --base-url http://localhost:3000 --rps 50 --duration 60
+    python tests/perf/loadgen.py --profile bookings --rps 0 --concurrency 16 --requests 500
+    python tests/perf/loadgen.py --list                       # show the harvested catalogue
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from request_catalog import REPO_ROOT, harvest, select  # noqa: E402
+
+REPORT_DIR = os.path.join(REPO_ROOT, "test_reports")
+
+# Endpoint regexes per named profile (matched against RequestDef.endpoint)
+PROFILES = {
+    # public directory: list/search/filters, slug pages, discover, guide, stats, public reviews
+    "directory": r"^GET /api/directory(\?|$|/(discover|guide|stats)|/reviews(\?listing_id)?$|/(?!my-listing$)[a-z0-9]+(-[a-z0-9]+)+$)",
+    "bookings": r"^(GET|POST) /api/bookings",
+    "reads": r"^GET /api/",
+}
+DEFAULT_PROFILE = "directory"
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile (pct in 0-100)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[k]
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+class EndpointStats:
+    def __init__(self):
+        self.latencies = []
+        self.service = []
+        self.statuses = Counter()
+        self.errors = 0
+
+    def record(self, latency, service, status):
+        self.latencies.append(latency)
+        self.service.append(service)
+        self.statuses[status] += 1
+        if status == "transport" or (isinstance(status, int) and status >= 500):
+            self.errors += 1
+
+    def summary(self, duration):
+        n = len(self.latencies)
+        return {
+            "requests": n,
+            "throughput_rps": round(n / duration, 2) if duration > 0 else None,
+            "error_rate": round(self.errors / n, 4) if n else 0.0,
+            "statuses": {str(k): v for k, v in sorted(self.statuses.items(), key=lambda kv: str(kv[0]))},
+            "p50_ms": _ms(percentile(self.latencies, 50)),
+            "p95_ms": _ms(percentile(self.latencies, 95)),
+            "p99_ms": _ms(percentile(self.latencies, 99)),
+            "max_ms": _ms(max(self.latencies)) if n else None,
+            "service_p50_ms": _ms(percentile(self.service, 50)),
+            "service_p95_ms": _ms(percentile(self.service, 95)),
+        }
+
+
+async def run_load(requests, base_url, rps=10.0, concurrency=32, duration=30.0, total=None,
+                   timeout=30.0, seed=365, transport=None, headers=None):
+    """
+    Drive `requests` (RequestDefs, picked uniformly at random) against
+    `base_url`. Stops after `total` requests, else after `duration` seconds.
+    Returns (per-endpoint EndpointStats, elapsed seconds).
+    """
+    if not requests:
+        raise ValueError("no requests to replay")
+    rng = random.Random(seed)
+    stats = {}
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits,
+                                 transport=transport, headers=headers) as client:
+        async def one(req, scheduled):
+            async with semaphore:
+                sent = time.monotonic()
+                try:
+                    res = await client.request(req.method, req.path, params=req.query or None, json=req.json)
+                    await res.aread()
+                    status = res.status_code
+                except httpx.HTTPError:
+                    status = "transport"
+                done = time.monotonic()
+            stats.setdefault(req.endpoint, EndpointStats()).record(done - scheduled, done - sent, status)
+
+        started = time.monotonic()
+        tasks = set()
+        i = 0
+        while (total is None or i < total) and (total is not None or time.monotonic() - started < duration):
+            req = rng.choice(requests)
+            if rps > 0:
+                scheduled = started + i / rps
+                delay = scheduled - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                task = asyncio.ensure_future(one(req, scheduled))
+            else:
+                # Closed loop: keep `concurrency` requests in flight
+                await semaphore.acquire()
+                semaphore.release()
+                task = asyncio.ensure_future(one(req, time.monotonic()))
+                await asyncio.sleep(0)
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            i += 1
+        await asyncio.gather(*tasks)
+        elapsed = time.monotonic() - started
+    return stats, elapsed
+
+
+def build_report(stats, elapsed, meta):
+    everything = EndpointStats()
+    for endpoint_stats in stats.values():
+        everything.latencies += endpoint_stats.latencies
+        everything.service += endpoint_stats.service
+        everything.statuses.update(endpoint_stats.statuses)
+        everything.errors += endpoint_stats.errors
+    return {
+        **meta,
+        "elapsed_s": round(elapsed, 3),
+        "overall": everything.summary(elapsed),
+        "endpoints": {endpoint: s.summary(elapsed) for endpoint, s in sorted(stats.items())},
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def write_report(report, path=None, label="load"):
+    if path is None:
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        path = os.path.join(REPORT_DIR, f"{label}_{stamp}.json")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+    return path
+
+
+def print_report(report):
+    print(f"{'endpoint':<58} {'n':>6} {'rps':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'err%':>6}")
+    rows = list(report["endpoints"].items()) + [("TOTAL", report["overall"])]
+    for endpoint, row in rows:
+        print(f"{endpoint[:58]:<58} {row['requests']:>6} {row['throughput_rps']:>7} {row['p50_ms']:>8} "
+              f"{row['p95_ms']:>8} {row['p99_ms']:>8} {row['error_rate'] * 100:>6.2f}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Replay the API test suites' requests under load")
+    parser.add_argument("--base-url", default=os.getenv("LOAD_BASE_URL", "http://localhost:3000"))
+    parser.add_argument("--profile", choices=sorted(PROFILES), default=DEFAULT_PROFILE)
+    parser.add_argument("--include", help="endpoint regex (overrides --profile)")
+    parser.add_argument("--exclude", help="endpoint regex to leave out")
+    parser.add_argument("--writes", action="store_true", help="also replay POST/PATCH/... definitions")
+    parser.add_argument("--rps", type=float, default=20.0, help="arrival rate; 0 = closed loop at --concurrency")
+    parser.add_argument("--concurrency", type=int, default=32, help="max requests in flight")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to run (ignored with --requests)")
+    parser.add_argument("--requests", type=int, help="stop after this many requests")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=365)
+    parser.add_argument("--label", default="load", help="report file name prefix")
+    parser.add_argument("--output", help="report path (default test_reports/<label>_<utc timestamp>.json)")
+    parser.add_argument("--list", action="store_true", help="print the selected request catalogue and exit")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    opts = parse_args(argv)
+    include = opts.include or PROFILES[opts.profile]
+    writes = opts.writes or opts.profile == "bookings"
+    requests = select(harvest(), include=include, exclude=opts.exclude, writes=writes)
+    if opts.list or not requests:
+        for req in requests:
+            print(f"{req.endpoint:<58} {req.path}  ({', '.join(req.sources[:2])})")
+        if not requests:
+            print("No requests match the selection")
+            return 1
+        return 0
+
+    started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    print(f"Replaying {len(requests)} request definitions against {opts.base_url} "
+          f"({'%g rps' % opts.rps if opts.rps > 0 else 'closed loop'}, concurrency {opts.concurrency})")
+    stats, elapsed = asyncio.run(run_load(
+        requests, opts.base_url, rps=opts.rps, concurrency=opts.concurrency, duration=opts.duration,
+        total=opts.requests, timeout=opts.timeout, seed=opts.seed))
+    meta = {
+        "label": opts.label,
+        "started_at": started_at,
+        "git_revision": git_revision(),
+        "base_url": opts.base_url,
+        "selection": {"include": include, "exclude": opts.exclude, "writes": writes, "definitions": len(requests)},
+        "load": {"rps": opts.rps, "concurrency": opts.concurrency, "duration_s": opts.duration,
+                 "requests": opts.requests, "seed": opts.seed},
+    }
+    report = build_report(stats, elapsed, meta)
+    print_report(report)
+    print(f"\nReport written to {write_report(report, opts.output, opts.label)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Response payload size audit for the public GET endpoints.
+
+Calls every GET endpoint the test suites use (one request per endpoint
+shape, from request_catalog.py). It reports bytes on the wire, bytes per
+item and bytes per field, recursing into nested objects and lists of
+objects (metadata.gl365_reviews[].text, ...). Endpoints that answer 401/403
+are listed as not public and skipped.
+
+Items that look like directory listings (business_name + slug) are checked
+against the listing card contract in backend/tests/test_bentley_ui_api.py
+(TestUIDataContract). That contract is the set of fields FeaturedCard and
+ListingCard render. Every other top-level field is flagged as unrendered,
+with its share of the payload. Spreading the whole row into each list item
+(`...listing` in applyPhotoGating) shows up here as metadata, ai_scraped_data
+and friends at the top of the list.
+
+Usage:
+    python tests/perf/payload_audit.py --base-url http://localhost:3000
+    python tests/perf/payload_audit.py --include '^GET /api/directory' --depth 2
+    python tests/perf/payload_audit.py --fail-over 0.5     # exit 1 if any card list is >50% unrendered bytes
+"""
+import argparse
+import ast
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from loadgen import PROFILES, git_revision, write_report  # noqa: E402
+from request_catalog import REPO_ROOT, harvest, select  # noqa: E402
+
+CONTRACT_FILE = os.path.join(REPO_ROOT, "backend", "tests", "test_bentley_ui_api.py")
+CONTRACT_CLASS = "TestUIDataContract"
+LISTING_KEYS = {"business_name", "slug"}
+NOT_PUBLIC = {401, 403}
+
+
+def load_card_contract(path=CONTRACT_FILE, class_name=CONTRACT_CLASS):
+    """Field names in the contract test: string lists (featured_card_fields, ...) and .get('field') calls"""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), path)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ClassDef) and node.name == class_name:
+            break
+    else:
+        raise ValueError(f"{class_name} not found in {path}")
+    fields = set()
+    for child in ast.walk(node):
+        if isinstance(child, ast.List) and child.elts and all(
+                isinstance(e, ast.Constant) and isinstance(e.value, str) for e in child.elts):
+            fields.update(e.value for e in child.elts)
+        elif (isinstance(child, ast.Call) and isinstance(child.func, ast.Attribute) and child.func.attr == "get"
+              and child.args and isinstance(child.args[0], ast.Constant) and isinstance(child.args[0].value, str)):
+            fields.add(child.args[0].value)
+    return fields
+
+
+def json_size(value):
+    """Bytes of value as compact UTF-8 JSON"""
+    return len(json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
+
+
+def records(body):
+    """
+    (path, items) for the record list in a response body: the body itself
+    when it's a list, else its largest list of objects ({"listings": [...]}),
+    else the body as a single record (detail endpoints).
+    """
+    if isinstance(body, list):
+        return "", [item for item in body if isinstance(item, dict)]
+    if isinstance(body, dict):
+        lists = [(key, value) for key, value in body.items()
+                 if isinstance(value, list) and value and all(isinstance(v, dict) for v in value)]
+        if lists:
+            return max(lists, key=lambda kv: json_size(kv[1]))
+        return "", [body]
+    return "", []
+
+
+def field_sizes(items, depth=3, prefix="", out=None):
+    """
+    path -> [bytes, occurrences] over a list of records. A field's bytes include its
+    quoted key, so the top-level fields of an item add up to the item's size (minus braces
+    and commas). Objects and lists of objects are broken down to `depth` levels.
+    """
+    out = {} if out is None else out
+    for item in items:
+        for key, value in item.items():
+            path = f"{prefix}{key}"
+            entry = out.setdefault(path, [0, 0])
+            entry[0] += json_size(key) + 1 + json_size(value)
+            entry[1] += 1
+            if depth > 1:
+                if isinstance(value, dict):
+                    field_sizes([value], depth - 1, f"{path}.", out)
+                elif isinstance(value, list) and value and all(isinstance(v, dict) for v in value):
+                    field_sizes(value, depth - 1, f"{path}[].", out)
+    return out
+
+
+def audit_body(body, contract, depth=3):
+    """Size breakdown of one response body"""
+    path, items = records(body)
+    total = json_size(body)
+    sizes = field_sizes(items, depth)
+    # Only lists are rendered as cards; a detail body (one record) feeds the full listing page
+    is_list = isinstance(body, list) or bool(path)
+    listing_card = is_list and bool(items) and all(LISTING_KEYS <= set(item) for item in items)
+    fields = []
+    for name, (size, present) in sorted(sizes.items(), key=lambda kv: -kv[1][0]):
+        top_level = "." not in name and "[]" not in name
+        fields.append({
+            "path": name,
+            "bytes": size,
+            "per_item": round(size / len(items), 1),
+            "share": round(size / total, 4) if total else 0.0,
+            "present": present,
+            "rendered": (name in contract) if listing_card and top_level else None,
+        })
+    unrendered = sum(f["bytes"] for f in fields if f["rendered"] is False)
+    return {
+        "records_path": path,
+        "items": len(items),
+        "bytes": total,
+        "bytes_per_item": round(json_size(items) / len(items), 1) if items else None,
+        "listing_card": listing_card,
+        "unrendered_bytes": unrendered if listing_card else None,
+        "unrendered_share": round(unrendered / total, 4) if listing_card and total else None,
+        "unrendered_fields": [f["path"] for f in fields if f["rendered"] is False],
+        "fields": fields,
+    }
+
+
+async def run_audit(requests, base_url, contract, depth=3, concurrency=4, timeout=60.0, transport=None,
+                    headers=None):
+    """One GET per distinct request; returns a result dict per request, in catalogue order"""
+    semaphore = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, transport=transport, headers=headers) as client:
+        async def one(req):
+            result = {"endpoint": req.endpoint, "path": req.path, "query": req.query}
+            async with semaphore:
+                try:
+                    res = await client.get(req.path, params=req.query or None)
+                except httpx.HTTPError as e:
+                    return {**result, "status": "transport", "error": str(e)}
+            # num_bytes_downloaded is the encoded (gzip/br) size; 0 when a mock transport hands over a body
+            result.update(status=res.status_code, wire_bytes=res.num_bytes_downloaded or len(res.content),
+                          content_encoding=res.headers.get("content-encoding"))
+            if res.status_code in NOT_PUBLIC:
+                return {**result, "public": False}
+            try:
+                body = res.json()
+            except ValueError:
+                return {**result, "public": True, "bytes": len(res.content), "error": "not JSON"}
+            return {**result, "public": True, **audit_body(body, contract, depth)}
+
+        return await asyncio.gather(*(one(req) for req in requests))
+
+
+def distinct(requests):
+    """First definition of each endpoint shape (method, path, query names)"""
+    seen, out = set(), []
+    for req in requests:
+        if req.endpoint not in seen:
+            seen.add(req.endpoint)
+            out.append(req)
+    return out
+
+
+def print_report(report, top=12):
+    results = [r for r in report["endpoints"] if r.get("public") and "items" in r]
+    print(f"{'endpoint':<58} {'status':>6} {'bytes':>10} {'wire':>10} {'items':>6} {'B/item':>9} {'unrendered':>10}")
+    for r in sorted(results, key=lambda r: -r["bytes"]):
+        share = f"{r['unrendered_share'] * 100:.0f}%" if r["unrendered_share"] is not None else "-"
+        print(f"{r['endpoint'][:58]:<58} {r['status']:>6} {r['bytes']:>10} {r['wire_bytes']:>10} {r['items']:>6} "
+              f"{r['bytes_per_item'] or '-':>9} {share:>10}")
+    skipped = [r["endpoint"] for r in report["endpoints"] if r.get("public") is False]
+    if skipped:
+        print(f"\nNot public (401/403), skipped: {', '.join(skipped)}")
+    failed = [f"{r['endpoint']} ({r.get('error') or r['status']})" for r in report["endpoints"]
+              if r["status"] == "transport" or r.get("error")]
+    if failed:
+        print("Not audited:")
+        for line in failed:
+            print(f"  {line}")
+
+    for r in sorted((r for r in results if r["listing_card"]), key=lambda r: -r["bytes"]):
+        print(f"\n{r['endpoint']}  ({r['items']} listings, {r['bytes_per_item']} B/item)")
+        for f in r["fields"][:top]:
+            mark = {True: "card", False: "UNRENDERED", None: ""}[f["rendered"]]
+            print(f"  {f['path'][:48]:<48} {f['per_item']:>10} B/item {f['share'] * 100:>6.1f}%  {mark}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Audit response sizes of the public GET endpoints")
+    parser.add_argument("--base-url", default=os.getenv("LOAD_BASE_URL", "http://localhost:3000"))
+    parser.add_argument("--include", default=PROFILES["reads"], help="endpoint regex (default: every GET)")
+    parser.add_argument("--exclude", help="endpoint regex to leave out")
+    parser.add_argument("--depth", type=int, default=3, help="levels of nested fields to break down")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--contract", default=CONTRACT_FILE, help="file holding the TestUIDataContract class")
+    parser.add_argument("--top", type=int, default=12, help="fields to print per listing endpoint")
+    parser.add_argument("--fail-over", type=float, help="exit 1 when a listing list's unrendered share exceeds this (0-1)")
+    parser.add_argument("--output", help="report path (default test_reports/payload_audit_<utc timestamp>.json)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    opts = parse_args(argv)
+    requests = distinct(select(harvest(), include=opts.include, exclude=opts.exclude))
+    if not requests:
+        print("No requests match the selection")
+        return 1
+    contract = load_card_contract(opts.contract)
+    started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    print(f"Auditing {len(requests)} GET endpoints on {opts.base_url}; card contract: {', '.join(sorted(contract))}\n")
+    results = asyncio.run(run_audit(requests, opts.base_url, contract, depth=opts.depth,
+                                    concurrency=opts.concurrency, timeout=opts.timeout))
+    report = {
+        "label": "payload_audit",
+        "started_at": started_at,
+        "git_revision": git_revision(),
+        "base_url": opts.base_url,
+        "contract": sorted(contract),
+        "endpoints": results,
+    }
+    print_report(report, opts.top)
+    print(f"\nReport written to {write_report(report, opts.output, report['label'])}")
+    if opts.fail_over is not None:
+        over = [r["endpoint"] for r in results if (r.get("unrendered_share") or 0) > opts.fail_over]
+        if over:
+            print(f"Unrendered share above {opts.fail_over:.0%}: {', '.join(over)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+"""
+Request catalogue harvested from the API test suites.
+
+The functional suites (backend/tests, tests, webapp/tests) spell out their
+requests inline, e.g.
+
+    response = requests.get(f"{BASE_URL}/api/directory/guide?destination=st-pete-beach")
+
+harvest() reads those modules with `ast` (nothing is imported or run) and
+collects every `requests.<method>(f"{BASE_URL}/...")` call whose URL, params
+and JSON body resolve to literals or module-level string constants, so the
+load generator replays exactly what the suites exercise and picks up new
+tests without a second list to maintain. Calls built from loop variables or
+runtime values are skipped.
+
+    catalog = harvest()
+    [r.endpoint for r in catalog]   # 'GET /api/directory?industry', 'GET /api/directory/stats', ...
+"""
+import ast
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+SUITES = ("backend/tests", "tests", "webapp/tests")
+METHODS = {"get", "post", "put", "patch", "delete"}
+READ_METHODS = {"GET"}
+# Names the suites use for the server root in their f-strings
+BASE_NAMES = {"BASE_URL", "API_URL", "base_url"}
+
+
+@dataclass
+class RequestDef:
+    method: str
+    path: str
+    query: Dict[str, str] = field(default_factory=dict)
+    json: Optional[dict] = None
+    sources: List[str] = field(default_factory=list)
+
+    @property
+    def endpoint(self) -> str:
+        """Grouping key: method, path and the query parameter names"""
+        keys = ",".join(sorted(self.query))
+        return f"{self.method} {self.path}" + (f"?{keys}" if keys else "")
+
+    def key(self):
+        return (self.method, self.path, tuple(sorted(self.query.items())), repr(self.json))
+
+
+class _Unresolved(Exception):
+    pass
+
+
+def _module_constants(tree) -> Dict[str, str]:
+    """Module-level NAME = "string" assignments (TEST_LISTING_ID, ...)"""
+    constants = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and isinstance(node.value, ast.Constant) and isinstance(node.value.value, str):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    constants[target.id] = node.value.value
+    return constants
+
+
+def _literal(node, names):
+    """Evaluate a literal / constant-name / simple f-string node, or raise _Unresolved"""
+    if isinstance(node, ast.Name) and node.id in names:
+        return names[node.id]
+    if isinstance(node, ast.JoinedStr):
+        parts = []
+        for value in node.values:
+            if isinstance(value, ast.Constant):
+                parts.append(str(value.value))
+            elif isinstance(value, ast.FormattedValue) and value.format_spec is None:
+                parts.append(str(_literal(value.value, names)))
+            else:
+                raise _Unresolved()
+        return "".join(parts)
+    if isinstance(node, ast.Dict):
+        if any(k is None for k in node.keys):
+            raise _Unresolved()
+        return {_literal(k, names): _literal(v, names) for k, v in zip(node.keys, node.values)}
+    if isinstance(node, (ast.List, ast.Tuple)):
+        return [_literal(v, names) for v in node.elts]
+    try:
+        return ast.literal_eval(node)
+    except ValueError:
+        raise _Unresolved() from None
+
+
+def _url_path(node, names):
+    """Path+query of f"{BASE_URL}/api/..." (None when the URL isn't based on the server root)"""
+    if not (isinstance(node, ast.JoinedStr) and node.values
+            and isinstance(node.values[0], ast.FormattedValue)
+            and isinstance(node.values[0].value, ast.Name) and node.values[0].value.id in BASE_NAMES):
+        return None
+    rest = ast.JoinedStr(values=node.values[1:])
+    return _literal(rest, names)
+
+
+def _local_dicts(func) -> Dict[str, ast.AST]:
+    """name -> dict node for `payload = {...}` assignments inside a test function"""
+    found = {}
+    for node in ast.walk(func):
+        if isinstance(node, ast.Assign) and isinstance(node.value, ast.Dict):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    found[target.id] = node.value
+    return found
+
+
+def _is_requests_call(node) -> Optional[str]:
+    if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr in METHODS):
+        return None
+    owner = node.func.value
+    name = owner.id if isinstance(owner, ast.Name) else owner.attr if isinstance(owner, ast.Attribute) else ""
+    return node.func.attr.upper() if name in ("requests", "session", "api_session", "client") else None
+
+
+def harvest_file(path, rel=None) -> List[RequestDef]:
+    rel = rel or os.path.relpath(path, REPO_ROOT)
+    with open(path, encoding="utf-8") as f:
+        try:
+            tree = ast.parse(f.read(), filename=path)
+        except SyntaxError:
+            return []
+    constants = _module_constants(tree)
+    found = []
+    functions = [n for n in ast.walk(tree) if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))]
+    for func in functions:
+        locals_ = _local_dicts(func)
+        for node in ast.walk(func):
+            method = _is_requests_call(node)
+            if not method or not node.args:
+                continue
+            try:
+                url = _url_path(node.args[0], constants)
+                if url is None:
+                    continue
+                parts = urlsplit(url)
+                query = dict(parse_qsl(parts.query, keep_blank_values=True))
+                body = None
+                for kw in node.keywords:
+                    if kw.arg == "params":
+                        query.update({k: str(v) for k, v in _literal(kw.value, constants).items()})
+                    elif kw.arg == "json":
+                        value = locals_.get(kw.value.id) if isinstance(kw.value, ast.Name) else kw.value
+                        if value is None:
+                            raise _Unresolved()
+                        body = _literal(value, constants)
+            except _Unresolved:
+                continue
+            found.append(RequestDef(method, parts.path, query, body, [f"{rel}:{node.lineno}"]))
+    return found
+
+
+def harvest(suites=SUITES, root=REPO_ROOT) -> List[RequestDef]:
+    """Unique request definitions across the suites, sources merged"""
+    merged = {}
+    for suite in suites:
+        directory = os.path.join(root, suite)
+        if not os.path.isdir(directory):
+            continue
+        for name in sorted(os.listdir(directory)):
+            if not (name.startswith("test_") and name.endswith(".py")):
+                continue
+            for req in harvest_file(os.path.join(directory, name), os.path.join(suite, name)):
+                if req.key() in merged:
+                    merged[req.key()].sources += req.sources
+                else:
+                    merged[req.key()] = req
+    return list(merged.values())
+
+
+def select(catalog, include=None, exclude=None, writes=False) -> List[RequestDef]:
+    """Filter by endpoint regexes; only reads unless `writes`"""
+    out = []
+    for req in catalog:
+        if not writes and req.method not in READ_METHODS:
+            continue
+        if include and not re.search(include, req.endpoint):
+            continue
+        if exclude and re.search(exclude, req.endpoint):
+            continue
+        out.append(req)
+    return out
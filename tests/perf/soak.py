@@ -0,0 +1,464 @@
+#!/usr/bin/env python3
+"""
+Soak test runner for the long-lived Python services.
+
+Starts the target in its own uvicorn process, drives mixed traffic at it for
+hours, and samples the server process itself at every interval. It flags any
+metric that keeps rising after warmup, so a leak shows up in CI or on a dev
+box before a pod is OOM-killed. Each sample records:
+
+  rss_kb     resident set size now (/proc/self/statm), not the ru_maxrss peak
+  fds        open file descriptors
+  tasks      asyncio tasks alive on the server loop
+  threads    Python threads (to_thread workers, provider pools)
+  traced_kb  tracemalloc total, with the top allocation sites that grew since the baseline
+
+Targets:
+  proxy  backend/server.py in front of a local stub of the Next.js API (JSON
+         bodies from 4 KB to 512 KB, echoes, slow responses, 4xx/5xx)
+  image  webapp/services/image_service.py with the fake provider and
+         photo-sized PNGs, so multi-megabyte base64 strings cross every request
+
+Sampling goes through GET /__soak/sample, which install_probe() adds to the
+target app. Samples are taken after a gc.collect(), so they measure retained
+memory rather than garbage that is waiting to be collected.
+
+Usage:
+    python tests/perf/soak.py --target proxy --duration 4h --interval 60
+    python tests/perf/soak.py --target image --duration 2h --interval 120 --rps 2
+
+The report is written to test_reports/soak_<target>_<stamp>.json. The exit
+status is 1 when any metric is flagged.
+"""
+import argparse
+import asyncio
+import gc
+import importlib.util
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from loadgen import git_revision, run_load, write_report  # noqa: E402
+from request_catalog import REPO_ROOT, RequestDef  # noqa: E402
+
+PROBE_PATH = "/__soak"
+TOP_ALLOCATORS = 15
+
+# Minimum growth (first to last window median) worth flagging, per metric
+THRESHOLDS = {
+    "rss_kb": 16 * 1024,
+    "traced_kb": 8 * 1024,
+    "fds": 8,
+    "tasks": 8,
+    "threads": 4,
+}
+
+TARGETS = {
+    "proxy": {
+        "module": os.path.join(REPO_ROOT, "backend", "server.py"),
+        "rps": 50.0,
+        "env": {},
+    },
+    "image": {
+        "module": os.path.join(REPO_ROOT, "webapp", "services", "image_service.py"),
+        "rps": 2.0,
+        "env": {
+            "IMAGE_PROVIDER": "fake",
+            "FAKE_IMAGE_LATENCY": "lognormal:300,0.5",
+            "FAKE_IMAGE_SIZE": "1024x576",
+            "FAKE_IMAGE_NOISE": "1",
+            "FAKE_IMAGE_ERROR_RATE": "0.05",
+        },
+    },
+}
+
+PROMPTS = [f"Soak test hero image {i}: Tampa Bay waterfront at golden hour" for i in range(12)]
+
+
+# ---------------------------------------------------------------------------
+# Probe (runs inside the target process)
+# ---------------------------------------------------------------------------
+
+def current_rss_kb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # peak, the best macOS offers without psutil
+
+
+def open_fds():
+    for path in ("/proc/self/fd", "/dev/fd"):
+        try:
+            return len(os.listdir(path))
+        except OSError:
+            continue
+    return None
+
+
+class Probe:
+    """Process metrics plus tracemalloc growth against a post-warmup baseline"""
+
+    FILTERS = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<frozen importlib._bootstrap*>")]
+
+    def __init__(self, top=TOP_ALLOCATORS):
+        self.top = top
+        self.baseline = None
+
+    def snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces(self.FILTERS)
+
+    def reset_baseline(self):
+        gc.collect()
+        self.baseline = self.snapshot() if tracemalloc.is_tracing() else None
+
+    def sample(self):
+        gc.collect()
+        sample = {
+            "rss_kb": current_rss_kb(),
+            "fds": open_fds(),
+            "tasks": len(asyncio.all_tasks()),
+            "threads": threading.active_count(),
+            "gc_objects": len(gc.get_objects()),
+            "traced_kb": None,
+            "top": [],
+        }
+        if tracemalloc.is_tracing():
+            sample["traced_kb"] = tracemalloc.get_traced_memory()[0] // 1024
+            snapshot = self.snapshot()
+            stats = snapshot.compare_to(self.baseline, "lineno") if self.baseline else snapshot.statistics("lineno")
+            for stat in stats[:self.top]:
+                frame = stat.traceback[0]
+                filename = frame.filename
+                if filename.startswith(REPO_ROOT):
+                    filename = os.path.relpath(filename, REPO_ROOT)
+                sample["top"].append({
+                    "where": f"{filename}:{frame.lineno}",
+                    "size_kb": round(stat.size / 1024, 1),
+                    "diff_kb": round(getattr(stat, "size_diff", stat.size) / 1024, 1),
+                    "count": stat.count,
+                })
+        return sample
+
+
+def install_probe(app, probe=None):
+    """Add GET {PROBE_PATH}/sample and POST {PROBE_PATH}/baseline to a FastAPI app"""
+    probe = probe or Probe()
+
+    async def sample():
+        return probe.sample()
+
+    async def baseline():
+        probe.reset_baseline()
+        return {"tracing": tracemalloc.is_tracing()}
+
+    app.add_api_route(f"{PROBE_PATH}/sample", sample, methods=["GET"])
+    app.add_api_route(f"{PROBE_PATH}/baseline", baseline, methods=["POST"])
+    return probe
+
+
+# ---------------------------------------------------------------------------
+# Targets and traffic
+# ---------------------------------------------------------------------------
+
+def create_upstream():
+    """Stand-in for the Next.js API behind the proxy"""
+    from fastapi import FastAPI, Request
+    from fastapi.responses import JSONResponse, Response
+
+    app = FastAPI(title="Soak upstream")
+    blobs = {}
+
+    @app.get("/api/soak/json")
+    async def json_body(kb: int = 4):
+        if kb not in blobs:
+            blobs[kb] = {"items": [{"id": i, "text": "x" * 1000} for i in range(kb)]}
+        return blobs[kb]
+
+    @app.post("/api/soak/echo")
+    async def echo(request: Request):
+        body = await request.body()
+        return Response(body, media_type=request.headers.get("content-type", "application/octet-stream"))
+
+    @app.get("/api/soak/slow")
+    async def slow(ms: int = 200):
+        await asyncio.sleep(ms / 1000)
+        return {"slept_ms": ms}
+
+    @app.get("/api/soak/status/{code}")
+    async def status(code: int):
+        return JSONResponse({"error": f"simulated {code}"}, status_code=code)
+
+    return app
+
+
+def load_target(name, upstream_url=None):
+    """Import the target's FastAPI app the way uvicorn would (env first, then the module)"""
+    spec = TARGETS[name]
+    for key, value in spec["env"].items():
+        os.environ.setdefault(key, value)
+    if name == "image":
+        scratch = tempfile.mkdtemp(prefix="soak_image_")
+        os.environ.setdefault("IMAGE_CACHE_DIR", os.path.join(scratch, "cache"))
+        os.environ.setdefault("IMAGE_DERIVATIVES_DIR", os.path.join(scratch, "derivatives"))
+    module_dir = os.path.dirname(spec["module"])
+    if module_dir not in sys.path:
+        sys.path.insert(0, module_dir)
+    loader = importlib.util.spec_from_file_location(f"soak_target_{name}", spec["module"])
+    module = importlib.util.module_from_spec(loader)
+    loader.loader.exec_module(module)
+    if upstream_url:
+        module.NEXTJS_URL = upstream_url
+    return module.app
+
+
+def traffic(target):
+    """Weighted request mix for a target (repeat = weight); the simulated 502s count toward err%"""
+    if target == "proxy":
+        return (
+            [RequestDef("GET", "/api/soak/json", {"kb": "4"})] * 6
+            + [RequestDef("GET", "/api/soak/json", {"kb": "512"})]
+            + [RequestDef("POST", "/api/soak/echo", json={"blob": "y" * 65536})] * 2
+            + [RequestDef("GET", "/api/soak/slow", {"ms": "250"})]
+            + [RequestDef("GET", "/api/soak/status/404"), RequestDef("GET", "/api/soak/status/502")]
+        )
+    if target == "image":
+        return (
+            [RequestDef("POST", "/api/generate-image", json={"prompt": p, "count": 3}) for p in PROMPTS]
+            + [RequestDef("POST", "/api/generate-image", json={"prompt": p, "count": 2, "reuse_cached": True})
+               for p in PROMPTS[:4]]
+            + [RequestDef("POST", "/generate", json={"prompt": p}) for p in PROMPTS[:4]]
+            + [RequestDef("GET", "/health")]
+        )
+    raise ValueError(f"unknown target {target!r}")
+
+
+# ---------------------------------------------------------------------------
+# Analysis
+# ---------------------------------------------------------------------------
+
+def _slope(points):
+    """Least-squares slope of (t, value) points"""
+    n = len(points)
+    mean_t = sum(t for t, _ in points) / n
+    mean_v = sum(v for _, v in points) / n
+    var = sum((t - mean_t) ** 2 for t, _ in points)
+    return sum((t - mean_t) * (v - mean_v) for t, v in points) / var if var else 0.0
+
+
+def find_growth(samples, windows=4, min_ratio=0.05, thresholds=THRESHOLDS):
+    """
+    Per metric: medians of `windows` consecutive slices of the post-warmup
+    samples. Flagged when the medians never fall and the first-to-last rise
+    beats both the metric's absolute threshold and min_ratio of the start.
+    Medians keep a GC sawtooth or one slow request from reading as a trend.
+    """
+    findings = []
+    for metric, min_growth in thresholds.items():
+        points = [(s["t"], s[metric]) for s in samples if s.get(metric) is not None]
+        if len(points) < windows * 2:
+            continue
+        size = len(points) / windows
+        medians = [statistics.median(v for _, v in points[int(i * size):int((i + 1) * size)]) for i in range(windows)]
+        growth = medians[-1] - medians[0]
+        monotonic = growth > 0 and all(b >= a for a, b in zip(medians, medians[1:]))
+        findings.append({
+            "metric": metric,
+            "start": medians[0],
+            "end": medians[-1],
+            "growth": growth,
+            "per_hour": round(_slope(points) * 3600, 1),
+            "window_medians": medians,
+            "monotonic": monotonic,
+            "flagged": monotonic and growth >= max(min_growth, min_ratio * abs(medians[0])),
+        })
+    return findings
+
+
+# ---------------------------------------------------------------------------
+# Driver
+# ---------------------------------------------------------------------------
+
+async def soak(base_url, requests, duration, interval=60.0, warmup=60.0, rps=10.0, concurrency=32,
+               timeout=120.0, seed=365, transport=None, on_sample=None):
+    """
+    Warm up, reset the probe baseline, then alternate `interval` seconds of
+    traffic with a probe sample until `duration` has passed. Returns the samples,
+    each carrying the window's request count, error rate and p95.
+    """
+    samples = []
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, transport=transport) as probe:
+        if warmup > 0:
+            await run_load(requests, base_url, rps=rps, concurrency=concurrency, duration=warmup,
+                           timeout=timeout, seed=seed, transport=transport)
+        (await probe.post(f"{PROBE_PATH}/baseline")).raise_for_status()
+        started = time.monotonic()
+        window = 0
+        while time.monotonic() - started < duration:
+            stats, elapsed = await run_load(requests, base_url, rps=rps, concurrency=concurrency,
+                                            duration=min(interval, duration - (time.monotonic() - started)),
+                                            timeout=timeout, seed=seed + window, transport=transport)
+            res = await probe.get(f"{PROBE_PATH}/sample")
+            res.raise_for_status()
+            n = sum(len(s.latencies) for s in stats.values())
+            latencies = [l for s in stats.values() for l in s.latencies]
+            sample = {
+                "t": round(time.monotonic() - started, 1),
+                "requests": n,
+                "error_rate": round(sum(s.errors for s in stats.values()) / n, 4) if n else 0.0,
+                "p95_ms": round(sorted(latencies)[int(0.95 * (len(latencies) - 1))] * 1000, 1) if latencies else None,
+                **res.json(),
+            }
+            samples.append(sample)
+            if on_sample:
+                on_sample(sample)
+            window += 1
+    return samples
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def spawn(args, port, ready_path, timeout=60.0):
+    """Start `soak.py <args>` in its own process and wait until ready_path answers"""
+    proc = subprocess.Popen([sys.executable, os.path.abspath(__file__), *args], cwd=REPO_ROOT)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"{' '.join(args)} exited with {proc.returncode}")
+        try:
+            httpx.get(f"http://127.0.0.1:{port}{ready_path}", timeout=2.0)
+            return proc
+        except httpx.HTTPError:
+            time.sleep(0.25)
+    proc.terminate()
+    raise RuntimeError(f"{' '.join(args)} not ready after {timeout:g}s")
+
+
+def parse_duration(value):
+    """'4h', '90m', '30s' or plain seconds"""
+    units = {"h": 3600, "m": 60, "s": 1}
+    value = str(value).strip().lower()
+    if value and value[-1] in units:
+        return float(value[:-1]) * units[value[-1]]
+    return float(value)
+
+
+def print_sample(sample):
+    traced = "-" if sample["traced_kb"] is None else f"{sample['traced_kb'] / 1024:.1f} MB"
+    print(f"t={sample['t']:>8.0f}s  rss {sample['rss_kb'] / 1024:>8.1f} MB  fds {sample['fds']!s:>4}  "
+          f"tasks {sample['tasks']:>4}  threads {sample['threads']:>3}  traced {traced:>9}  "
+          f"req {sample['requests']:>6}  err {sample['error_rate'] * 100:>5.1f}%  p95 {sample['p95_ms']} ms", flush=True)
+
+
+def print_findings(findings, samples):
+    if not findings:
+        print(f"\nOnly {len(samples)} samples: too few to judge growth (need 2 per window; raise --duration)")
+        return
+    print(f"\n{'metric':<10} {'start':>12} {'end':>12} {'per hour':>12}  verdict")
+    for f in findings:
+        verdict = "GROWING" if f["flagged"] else ("rising (below threshold)" if f["monotonic"] else "stable")
+        print(f"{f['metric']:<10} {f['start']:>12} {f['end']:>12} {f['per_hour']:>12}  {verdict}")
+    top = samples[-1]["top"] if samples else []
+    if top:
+        print("\nTop allocation growth since baseline:")
+        for stat in top[:10]:
+            print(f"  {stat['diff_kb']:>+10.1f} KB  {stat['count']:>8}  {stat['where']}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Soak a service and flag memory, FD and task growth")
+    parser.add_argument("--target", choices=sorted(TARGETS), default="proxy")
+    parser.add_argument("--duration", type=parse_duration, default="1h", help="e.g. 4h, 90m, 600 (seconds)")
+    parser.add_argument("--interval", type=parse_duration, default="60", help="traffic between samples")
+    parser.add_argument("--warmup", type=parse_duration, default="120", help="traffic before the baseline")
+    parser.add_argument("--rps", type=float, help="arrival rate (default per target)")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--tracemalloc-frames", type=int, default=1, help="0 disables tracemalloc in the target")
+    parser.add_argument("--seed", type=int, default=365)
+    parser.add_argument("--output", help="report path (default test_reports/soak_<target>_<utc timestamp>.json)")
+    # Internal: child processes started by the driver
+    parser.add_argument("--serve", choices=sorted(TARGETS) + ["upstream"], help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--upstream-url", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def serve(opts):
+    import uvicorn
+
+    if opts.serve == "upstream":
+        app = create_upstream()
+    else:
+        if opts.tracemalloc_frames > 0:
+            tracemalloc.start(opts.tracemalloc_frames)
+        app = load_target(opts.serve, opts.upstream_url)
+        install_probe(app)
+    uvicorn.run(app, host="127.0.0.1", port=opts.port, log_level="warning")
+    return 0
+
+
+def main(argv=None):
+    opts = parse_args(argv)
+    if opts.serve:
+        return serve(opts)
+
+    rps = opts.rps if opts.rps is not None else TARGETS[opts.target]["rps"]
+    children = []
+    try:
+        target_args = ["--serve", opts.target, "--tracemalloc-frames", str(opts.tracemalloc_frames)]
+        if opts.target == "proxy":
+            upstream_port = free_port()
+            children.append(spawn(["--serve", "upstream", "--port", str(upstream_port)], upstream_port, "/docs"))
+            target_args += ["--upstream-url", f"http://127.0.0.1:{upstream_port}"]
+        port = free_port()
+        children.append(spawn([*target_args, "--port", str(port)], port, f"{PROBE_PATH}/sample"))
+        target_pid = children[-1].pid
+
+        started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        print(f"Soaking {opts.target} (pid {target_pid}) at {rps:g} rps for {opts.duration:g}s, "
+              f"sampling every {opts.interval:g}s after {opts.warmup:g}s warmup")
+        samples = asyncio.run(soak(
+            f"http://127.0.0.1:{port}", traffic(opts.target), opts.duration, interval=opts.interval,
+            warmup=opts.warmup, rps=rps, concurrency=opts.concurrency, seed=opts.seed, on_sample=print_sample))
+    finally:
+        for child in reversed(children):
+            child.terminate()
+            child.wait(timeout=10)
+
+    findings = find_growth(samples)
+    print_findings(findings, samples)
+    report = {
+        "label": f"soak_{opts.target}",
+        "started_at": started_at,
+        "git_revision": git_revision(),
+        "target": opts.target,
+        "load": {"rps": rps, "concurrency": opts.concurrency, "duration_s": opts.duration,
+                 "interval_s": opts.interval, "warmup_s": opts.warmup, "seed": opts.seed},
+        "findings": findings,
+        "flagged": [f["metric"] for f in findings if f["flagged"]],
+        "samples": samples,
+    }
+    print(f"\nReport written to {write_report(report, opts.output, report['label'])}")
+    if report["flagged"]:
+        print(f"Growth flagged: {', '.join(report['flagged'])}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Synthetic directory dataset generator for scale testing.
+
+Generates realistic directory_listings (with directory_badges,
+directory_feedback and crm_leads to match) at any scale, so routes that are
+fine at a few hundred listings - /api/directory/stats reads every row's
+industry/city/tags, /api/directory/guide pulls up to 300 listings with
+badges - can be measured at 50k-500k before real data gets there.
+
+Listings are spread over destinations with a Zipf-like skew (a few big
+metros, a long tail of small towns, Florida first and then beyond), carry
+destination:/tourism: tags mapped from their industry, tiers and claim rates
+from --tiers, gallery images by tier, lat/lng near their destination
+(columns and metadata.latitude/longitude, as the geocoder writes them) and
+Google rating metadata. The output is deterministic for a given --seed.
+
+Output is either a fixtures directory for the local PostgREST stand-in
+
+    python tests/perf/synth_directory.py --listings 50000 --out /tmp/directory-50k
+    python tests/local_supabase/server.py --fixtures /tmp/directory-50k
+
+or rows POSTed in batches into a running stand-in (or any PostgREST):
+
+    python tests/perf/synth_directory.py --listings 200000 --load-url http://localhost:54321
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import sys
+import time
+import uuid
+
+import httpx
+
+# (slug, city, state, lat, lng); order sets the Zipf rank, so earlier = bigger
+DESTINATIONS = [
+    ("miami", "Miami", "FL", 25.7617, -80.1918), ("orlando", "Orlando", "FL", 28.5384, -81.3789),
+    ("tampa", "Tampa", "FL", 27.9506, -82.4572), ("jacksonville", "Jacksonville", "FL", 30.3322, -81.6557),
+    ("st-pete-beach", "St. Pete Beach", "FL", 27.7253, -82.7412), ("sarasota", "Sarasota", "FL", 27.3364, -82.5307),
+    ("key-west", "Key West", "FL", 24.5551, -81.7800), ("daytona", "Daytona Beach", "FL", 29.2108, -81.0228),
+    ("ybor-city", "Tampa", "FL", 27.9601, -82.4367), ("clearwater", "Clearwater", "FL", 27.9659, -82.8001),
+    ("naples", "Naples", "FL", 26.1420, -81.7948), ("destin", "Destin", "FL", 30.3935, -86.4958),
+    ("atlanta", "Atlanta", "GA", 33.7490, -84.3880), ("nashville", "Nashville", "TN", 36.1627, -86.7816),
+    ("austin", "Austin", "TX", 30.2672, -97.7431), ("new-orleans", "New Orleans", "LA", 29.9511, -90.0715),
+    ("charleston", "Charleston", "SC", 32.7765, -79.9311), ("savannah", "Savannah", "GA", 32.0809, -81.0912),
+    ("asheville", "Asheville", "NC", 35.5951, -82.5515), ("myrtle-beach", "Myrtle Beach", "SC", 33.6891, -78.8867),
+    ("gulf-shores", "Gulf Shores", "AL", 30.2460, -87.7008), ("san-diego", "San Diego", "CA", 32.7157, -117.1611),
+    ("scottsdale", "Scottsdale", "AZ", 33.4942, -111.9261), ("denver", "Denver", "CO", 39.7392, -104.9903),
+    ("portland", "Portland", "OR", 45.5152, -122.6784), ("chicago", "Chicago", "IL", 41.8781, -87.6298),
+    ("boston", "Boston", "MA", 42.3601, -71.0589), ("outer-banks", "Nags Head", "NC", 35.9574, -75.6241),
+]
+
+# industry -> (weight, tourism categories, name nouns, subcategories)
+INDUSTRIES = {
+    "services": (30, ["everyday-essentials"], ["Plumbing", "Electric", "HVAC", "Roofing", "Locksmith", "Pest Control"],
+                 ["Plumbing", "Electrical", "HVAC", "Roofing", "Locksmith"]),
+    "dining": (22, ["eat-drink", "quick-eats"], ["Grill", "Cafe", "Kitchen", "Bistro", "Taqueria", "Oyster Bar"],
+               ["Seafood", "Cuban", "Brunch", "Pizza", "Tacos"]),
+    "health-wellness": (10, ["everyday-essentials"], ["Yoga", "Chiropractic", "Dental", "Med Spa", "Fitness"],
+                        ["Yoga", "Dentist", "Chiropractor", "Gym"]),
+    "style-shopping": (8, ["shopping"], ["Boutique", "Surf Shop", "Outfitters", "Market", "Vintage"],
+                       ["Boutiques", "Surf Shops", "Gifts"]),
+    "nightlife": (6, ["nightlife"], ["Lounge", "Tap Room", "Social Club", "Rooftop", "Jazz Bar"],
+                  ["Cocktail Bars", "Breweries", "Live Music"]),
+    "family-entertainment": (6, ["family-fun", "things-to-do"], ["Fun Park", "Arcade", "Mini Golf", "Aquarium"],
+                             ["Arcades", "Mini Golf", "Water Parks"]),
+    "destinations": (5, ["things-to-do", "beaches-nature"], ["Tours", "Charters", "Kayak Co", "Nature Preserve"],
+                     ["Boat Tours", "Kayaking", "Snorkeling"]),
+    "hotels-lodging": (7, ["stay"], ["Inn", "Resort", "Suites", "Beach House", "Motel"], ["Hotels", "Vacation Rentals"]),
+    "professional-services": (6, ["everyday-essentials", "getting-around"], ["Law Group", "CPA", "Realty", "Rentals"],
+                              ["Attorneys", "Accountants", "Real Estate", "Car Rentals"]),
+}
+PREFIXES = ["Harbor", "Palm", "Sunset", "Coastal", "Old Town", "Magnolia", "Bayfront", "Pelican", "Seaside", "Cypress",
+            "Main Street", "Riverside", "Heron", "Golden", "Blue Water", "Oak", "Lighthouse", "Sandbar", "Mango", "Tidewater"]
+BADGES = [("top_rated", "Top Rated", "#FFD700"), ("verified_pro", "Verified Pro", "#39FF14"),
+          ("community_favorite", "Community Favorite", "#00BFFF"), ("local_legend", "Local Legend", "#39FF14"),
+          ("fast_response", "Fast Response", "#FF6B35")]
+FEEDBACK = ["Great service, would recommend.", "Friendly staff and fair prices.", "Took a while but worth it.",
+            "Not what I expected.", "Five stars, will be back!", "Solid experience overall."]
+GALLERY_BY_TIER = {"free": (1, 3), "pro": (3, 8), "premium": (6, 15)}
+CLAIM_RATE = {"free": 0.15, "pro": 1.0, "premium": 1.0}
+CRM_USER_ID = "677b536d-6521-4ac8-a0a5-98278b35f4cc"
+TABLES = ("directory_listings", "directory_badges", "directory_feedback", "crm_leads")
+DEFAULT_OUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".data", "directory")
+
+
+def parse_weights(text):
+    """'free=0.8,pro=0.15,premium=0.05' -> {'free': 0.8, ...}"""
+    weights = {}
+    for part in text.split(","):
+        name, _, value = part.partition("=")
+        weights[name.strip()] = float(value)
+    if not weights or any(w < 0 for w in weights.values()) or not sum(weights.values()):
+        raise ValueError(f"bad weights: {text}")
+    return weights
+
+
+def slugify(text):
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+
+class DirectoryGenerator:
+    """Yields (table, row) for one listing and its related rows at a time"""
+
+    def __init__(self, opts):
+        self.opts = opts
+        self.rng = random.Random(opts.seed)
+        self.namespace = uuid.UUID(int=opts.seed)
+        destinations = DESTINATIONS[:opts.destinations] if opts.destinations else DESTINATIONS
+        # Zipf: rank r gets weight 1 / r^skew
+        self.destinations = destinations
+        self.destination_weights = [1 / (rank ** opts.destination_skew) for rank in range(1, len(destinations) + 1)]
+        self.industries = list(INDUSTRIES)
+        self.industry_weights = [INDUSTRIES[name][0] for name in self.industries]
+        tiers = parse_weights(opts.tiers)
+        self.tiers, self.tier_weights = list(tiers), list(tiers.values())
+
+    def uid(self, kind, n):
+        return str(uuid.uuid5(self.namespace, f"{kind}:{n}"))
+
+    def stamp(self, days_back):
+        """ISO timestamp `days_back` (fractional) days before the fixed dataset epoch"""
+        seconds = int(self.opts.epoch - days_back * 86400)
+        return time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime(seconds))
+
+    def listing(self, n):
+        rng = self.rng
+        slug_d, city, state, lat, lng = rng.choices(self.destinations, self.destination_weights)[0]
+        industry = rng.choices(self.industries, self.industry_weights)[0]
+        _, tourism, nouns, subcategories = INDUSTRIES[industry]
+        tier = rng.choices(self.tiers, self.tier_weights)[0]
+        claimed = rng.random() < CLAIM_RATE.get(tier, 0.15)
+        name = f"{rng.choice(PREFIXES)} {rng.choice(nouns)}"
+        slug = f"{slugify(name)}-{slug_d}-{n}"
+        domain = f"{slugify(name).replace('-', '')}{n}.example.com"
+        # Within ~15km of the destination centre
+        latitude = round(lat + rng.uniform(-0.13, 0.13), 6)
+        longitude = round(lng + rng.uniform(-0.13, 0.13) / max(0.2, math.cos(math.radians(lat))), 6)
+        low, high = GALLERY_BY_TIER.get(tier, (1, 3))
+        gallery = [f"https://images.example.com/{slug}/{i}.jpg" for i in range(rng.randint(low, high))]
+        trust = max(0, min(100, int(rng.gauss(45 + 20 * (tier != "free") + 10 * claimed, 15))))
+        tags = [f"destination:{slug_d}"] + [f"tourism:{t}" for t in rng.sample(tourism, rng.randint(1, len(tourism)))]
+        created = self.stamp(rng.uniform(30, 900))
+        return {
+            "id": self.uid("listing", n), "business_name": name, "slug": slug, "industry": industry,
+            "subcategories": rng.sample(subcategories, rng.randint(1, min(2, len(subcategories)))),
+            "description": f"{name} serving {city}, {state}. {rng.choice(subcategories)} and more.",
+            "phone": f"({rng.randint(201, 989)}) 555-{rng.randint(0, 9999):04d}", "email": f"hello@{domain}",
+            "website": f"https://{domain}", "address_line1": f"{rng.randint(1, 9999)} {rng.choice(PREFIXES)} St",
+            "city": city, "state": state, "zip_code": f"{rng.randint(10000, 99999)}",
+            "latitude": latitude, "longitude": longitude,
+            "logo_url": None, "cover_image_url": gallery[0] if gallery else None, "gallery_images": gallery,
+            "business_hours": {}, "ai_scraped_data": {}, "tier": tier, "is_claimed": claimed,
+            "trust_score": trust, "total_feedback_count": 0, "avg_feedback_rating": 0,
+            "is_published": rng.random() >= self.opts.unpublished,
+            "metadata": {"latitude": latitude, "longitude": longitude,
+                         "google_rating": round(rng.uniform(3.2, 5.0), 1),
+                         "google_review_count": int(rng.expovariate(1 / 120))},
+            "tags": tags, "created_at": created, "updated_at": self.stamp(rng.uniform(0, 30)),
+        }
+
+    def related(self, n, listing):
+        rng = self.rng
+        boost = {"free": 0.5, "pro": 1.0, "premium": 1.6}.get(listing["tier"], 1.0)
+        for b in rng.sample(BADGES, min(len(BADGES), self._poisson(self.opts.badges * boost))):
+            active = rng.random() < 0.9
+            yield "directory_badges", {
+                "id": self.uid(f"badge:{b[0]}", n), "listing_id": listing["id"], "badge_type": b[0],
+                "badge_label": b[1], "badge_color": b[2], "badge_icon": None, "earned_via": "feedback",
+                "earned_details": {}, "earned_at": listing["created_at"], "expires_at": None, "is_active": active,
+                "feedback_threshold_met": active, "created_at": listing["created_at"],
+            }
+        ratings = []
+        for i in range(self._poisson(self.opts.feedback * boost)):
+            rating = min(5, max(1, round(rng.gauss(4.2, 0.9))))
+            ratings.append(rating)
+            yield "directory_feedback", {
+                "id": self.uid("feedback", f"{n}:{i}"), "listing_id": listing["id"], "rating": rating,
+                "feedback_text": rng.choice(FEEDBACK), "feedback_type": "general", "categories": {},
+                "is_red_flag": rating == 1 and rng.random() < 0.3, "submitter_name": None,
+                "ai_sentiment": "positive" if rating >= 4 else "neutral" if rating == 3 else "negative",
+                "source": "qr", "created_at": self.stamp(rng.uniform(0, 365)),
+            }
+        if ratings:
+            listing["total_feedback_count"] = len(ratings)
+            listing["avg_feedback_rating"] = round(sum(ratings) / len(ratings), 2)
+        if rng.random() < self.opts.leads:
+            yield "crm_leads", {
+                "id": self.uid("lead", n), "email": listing["email"], "user_id": CRM_USER_ID,
+                "name": listing["business_name"], "phone": listing["phone"], "company": listing["business_name"],
+                "source": "gl365_directory", "status": "new", "priority": "medium",
+                "tags": [listing["industry"], listing["city"], listing["state"], "directory_import"],
+                "notes": f"Industry: {listing['industry']} | Web: {listing['website']}",
+                "created_at": listing["created_at"], "updated_at": listing["updated_at"],
+            }
+
+    def _poisson(self, mean):
+        # Knuth; means here are small
+        limit, k, p = math.exp(-mean), 0, 1.0
+        while True:
+            p *= self.rng.random()
+            if p <= limit:
+                return k
+            k += 1
+
+    def rows(self):
+        """(table, row) pairs; each listing comes before its related rows"""
+        for n in range(self.opts.listings):
+            listing = self.listing(n)
+            related = list(self.related(n, listing))  # fills in the feedback aggregates
+            yield "directory_listings", listing
+            yield from related
+
+
+class FixtureWriter:
+    """Streams rows into <out>/<table>.json arrays without holding them in memory"""
+
+    def __init__(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        self.files = {t: open(os.path.join(directory, f"{t}.json"), "w", encoding="utf-8") for t in TABLES}
+        self.counts = dict.fromkeys(TABLES, 0)
+
+    def write(self, table, row):
+        f = self.files[table]
+        f.write(("[\n" if not self.counts[table] else ",\n") + json.dumps(row, separators=(",", ":")))
+        self.counts[table] += 1
+
+    def close(self):
+        for table, f in self.files.items():
+            f.write("\n]\n" if self.counts[table] else "[]\n")
+            f.close()
+
+
+async def load_rest(rows, base_url, batch_size=1000, concurrency=4, transport=None, headers=None):
+    """POST rows to <base_url>/rest/v1/<table> in batches; listings are sent before their children"""
+    counts = dict.fromkeys(TABLES, 0)
+    pending = {t: [] for t in TABLES}
+    semaphore = asyncio.Semaphore(concurrency)
+    headers = {"Prefer": "return=minimal", "apikey": "local", "Authorization": "Bearer local", **(headers or {})}
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, transport=transport, headers=headers) as client:
+        async def post(table, batch):
+            async with semaphore:
+                res = await client.post(f"/rest/v1/{table}", json=batch)
+            if res.status_code >= 300:
+                raise RuntimeError(f"{table}: HTTP {res.status_code} {res.text[:200]}")
+            counts[table] += len(batch)
+
+        async def flush(tables):
+            batches = [(table, pending[table]) for table in tables if pending[table]]
+            for table, _ in batches:
+                pending[table] = []
+            # Parents first so foreign keys resolve on a real database, then the children in parallel
+            for table, batch in batches:
+                if table == "directory_listings":
+                    await post(table, batch)
+            await asyncio.gather(*(post(table, batch) for table, batch in batches if table != "directory_listings"))
+
+        for table, row in rows:
+            pending[table].append(row)
+            if len(pending["directory_listings"]) >= batch_size:
+                await flush(TABLES)
+            elif len(pending[table]) >= batch_size:
+                await flush(("directory_listings", table))
+        await flush(TABLES)
+    return counts
+
+
+def generate(opts, transport=None):
+    """Write or load the dataset; returns rows per table"""
+    rows = DirectoryGenerator(opts).rows()
+    if opts.load_url:
+        return asyncio.run(load_rest(rows, opts.load_url, opts.batch_size, opts.concurrency, transport))
+    writer = FixtureWriter(opts.out)
+    try:
+        for table, row in rows:
+            writer.write(table, row)
+    finally:
+        writer.close()
+    return writer.counts
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic directory dataset for scale testing")
+    parser.add_argument("--listings", type=int, default=10000)
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--out", default=DEFAULT_OUT, help="fixtures directory to write")
+    target.add_argument("--load-url", help="POST into this PostgREST base URL instead (e.g. http://localhost:54321)")
+    parser.add_argument("--destinations", type=int, default=0, help="use only the first N destinations (0 = all)")
+    parser.add_argument("--destination-skew", type=float, default=1.1, help="Zipf exponent; 0 = uniform")
+    parser.add_argument("--tiers", default="free=0.8,pro=0.15,premium=0.05", help="tier weights")
+    parser.add_argument("--badges", type=float, default=0.8, help="mean badges per listing (scaled by tier)")
+    parser.add_argument("--feedback", type=float, default=2.5, help="mean feedback rows per listing (scaled by tier)")
+    parser.add_argument("--leads", type=float, default=0.3, help="share of listings that also get a CRM lead")
+    parser.add_argument("--unpublished", type=float, default=0.03, help="share of unpublished listings")
+    parser.add_argument("--seed", type=int, default=365)
+    parser.add_argument("--epoch", type=float, default=1790000000, help="timestamps are generated before this")
+    parser.add_argument("--batch-size", type=int, default=1000, help="rows per POST with --load-url")
+    parser.add_argument("--concurrency", type=int, default=4, help="parallel POSTs with --load-url")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    opts = parse_args(argv)
+    started = time.monotonic()
+    counts = generate(opts)
+    where = opts.load_url or opts.out
+    print(f"{', '.join(f'{t} {n}' for t, n in counts.items())} -> {where} in {time.monotonic() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""
+Pooled API Session Tests (offline)
+Module-level requests.* calls reuse one keep-alive connection once installed,
+and per-run cleanup only touches the run's own reviews
+"""
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend', 'tests'))
+
+requests = pytest.importorskip("requests")
+import api_session
+
+
+class CountingHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    connections = set()
+
+    def do_GET(self):
+        CountingHandler.connections.add(self.client_address)
+        body = json.dumps({"path": self.path}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Set-Cookie", "sb-access-token=abc; Path=/")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    CountingHandler.connections = set()
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), CountingHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+class TestPooledSession:
+    """install() routes requests.get & co. through one keep-alive session"""
+
+    def test_module_level_calls_share_one_connection(self, server):
+        for i in range(10):
+            requests.get(f"{server}/api/unpooled/{i}")
+        unpooled = len(CountingHandler.connections)
+
+        CountingHandler.connections = set()
+        session = api_session.make_session()
+        undo = api_session.install(session)
+        try:
+            for i in range(10):
+                assert requests.get(f"{server}/api/pooled/{i}").json() == {"path": f"/api/pooled/{i}"}
+        finally:
+            undo()
+            session.close()
+        assert unpooled == 10 and len(CountingHandler.connections) == 1
+        assert not session.cookies  # Set-Cookie from one test never leaks into the next
+        assert requests.api.request.__module__ == "requests.api"
+        print(f"✓ 10 calls: {unpooled} connections unpooled, 1 pooled")
+
+
+class TestRunData:
+    """Per-run names and the cleanup they enable"""
+
+    def test_prefix_is_unique_per_worker(self, monkeypatch):
+        monkeypatch.setenv("PYTEST_XDIST_WORKER", "gw3")
+        monkeypatch.setenv("PYTEST_XDIST_TESTRUNUID", "0123456789abcdef")
+        assert api_session.run_prefix() == "TEST_gw3_01234567_"
+        monkeypatch.delenv("PYTEST_XDIST_WORKER")
+        monkeypatch.delenv("PYTEST_XDIST_TESTRUNUID")
+        assert api_session.run_prefix().startswith("TEST_main_") and api_session.run_prefix() != api_session.run_prefix()
+
+        data = api_session.RunData("TEST_gw3_01234567_")
+        assert data.reviewer("listing-1", "Boundary_5") == "TEST_gw3_01234567_Boundary_5"
+        assert data.review_listings == {"listing-1"}
+        assert data.upload_folder() == "test-uploads/TEST_gw3_01234567"
+        print("✓ Run prefixes")
+
+    def test_strip_reviews_keeps_other_runs_and_real_reviews(self):
+        prefix = "TEST_gw0_aaaa_"
+        metadata = {
+            "review_settings": {"auto_respond": False},
+            "gl365_reviews": [
+                {"id": "rev_1", "reviewer_name": "Maria", "rating": 5},
+                {"id": "rev_2", "reviewer_name": f"{prefix}Boundary_1", "rating": 1},
+                {"id": "rev_3", "reviewer_name": "TEST_gw1_aaaa_Long_Reviewer", "rating": 4},
+            ],
+            "review_activity_log": [{"type": "review_submitted", "review_id": r} for r in ("rev_1", "rev_2", "rev_3")],
+        }
+        patch = api_session.strip_reviews(metadata, prefix)
+        assert [r["id"] for r in patch["metadata"]["gl365_reviews"]] == ["rev_1", "rev_3"]
+        assert [e["review_id"] for e in patch["metadata"]["review_activity_log"]] == ["rev_1", "rev_3"]
+        assert patch["metadata"]["review_settings"] == {"auto_respond": False}
+        assert patch["avg_feedback_rating"] == 4.5 and patch["total_feedback_count"] == 2
+        assert api_session.strip_reviews(patch["metadata"], prefix) is None
+        print("✓ Cleanup drops only this run's reviews")
@@ -0,0 +1,111 @@
+"""
+Booking Contention Benchmark Tests (offline)
+Runs the benchmark against an in-process fake of /api/bookings, once with a
+check-then-insert race and once with the slot check serialized
+"""
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'perf'))
+
+httpx = pytest.importorskip("httpx")
+import booking_bench
+
+
+class FakeBookingsAPI:
+    """Just enough of /api/bookings: POST with a slot check, GET, PUT to cancel"""
+
+    def __init__(self, locked):
+        self.locked = locked
+        self.lock = asyncio.Lock()
+        self.bookings = []
+        self.forwarded_for = set()
+
+    async def book(self, body):
+        started = asyncio.get_running_loop().time()
+        await asyncio.sleep(0.002)  # slot check query
+        taken = any(b["preferred_datetime"] == body["preferred_datetime"] and b["status"] != "cancelled"
+                    for b in self.bookings)
+        check_ms = (asyncio.get_running_loop().time() - started) * 1000
+        if taken:
+            return 409, {"error": "This time slot is already booked.", "code": "SLOT_TAKEN"}, check_ms
+        await asyncio.sleep(0.002)  # insert
+        booking = {**body, "id": f"b{len(self.bookings)}"}
+        self.bookings.append(booking)
+        return 201, {"success": True, "booking": booking}, check_ms
+
+    async def handler(self, request):
+        if request.method == "POST":
+            self.forwarded_for.add(request.headers["x-forwarded-for"])
+            body = json.loads(request.content)
+            if self.locked:
+                async with self.lock:
+                    status, payload, check_ms = await self.book(body)
+            else:
+                status, payload, check_ms = await self.book(body)
+            return httpx.Response(status, json=payload,
+                                  headers={"Server-Timing": f"slot_check;dur={check_ms:.1f}, insert;dur=2"})
+        if request.method == "PUT":
+            body = json.loads(request.content)
+            for booking in self.bookings:
+                if booking["id"] == body["id"]:
+                    booking["status"] = body["status"]
+            return httpx.Response(200, json={"booking": {}})
+        rows = [{**b, "preferred_datetime": b["preferred_datetime"] + "+00:00"} for b in self.bookings]
+        return httpx.Response(200, json={"bookings": rows})
+
+
+def make_opts(*args):
+    return booking_bench.parse_args(["--base-url", "http://test", "--clients", "40", "--attempts", "2",
+                                     "--hot-slots", "4", "--overlap", "0.5", *args])
+
+
+class TestBookingBenchmark:
+    """Throughput, conflict latency, lock wait and the double-booking check"""
+
+    def test_serialized_slot_check_has_no_double_bookings(self):
+        api = FakeBookingsAPI(locked=True)
+        report = asyncio.run(booking_bench.run_bench(make_opts(), httpx.MockTransport(api.handler)))
+
+        assert report["attempts"] == 80 and report["errors"] == 0
+        hot, distinct = report["slots"]["hot"], report["slots"]["distinct"]
+        assert report["accepted"] == hot + distinct
+        assert report["conflict_latency"]["n"] == 80 - report["accepted"] > 0
+        assert report["double_booked"] == [] and report["slots"]["verified_end_state"]
+        # hot-slot requests queue behind each other on the lock
+        assert report["lock_wait"]["slot_check_hot"]["p99_ms"] >= 2
+        assert report["accepted_per_s"] > 0
+        assert report["cancelled"] == report["accepted"]
+        assert all(b["status"] == "cancelled" for b in api.bookings)
+        assert len(api.forwarded_for) == 40
+        print(f"✓ {report['accepted']} accepted, {report['conflict_latency']['n']} conflicts, no doubles")
+
+    def test_check_then_insert_race_is_reported(self, tmp_path):
+        api = FakeBookingsAPI(locked=False)
+        report = asyncio.run(booking_bench.run_bench(make_opts("--keep"), httpx.MockTransport(api.handler)))
+
+        assert report["double_booked"]
+        slot = datetime.strptime(report["double_booked"][0], booking_bench.SLOT_FORMAT)
+        assert sum(booking_bench.normalize_slot(b["preferred_datetime"]) == slot for b in api.bookings) > 1
+        assert report["cancelled"] == 0
+
+        path = booking_bench.write_report(report, str(tmp_path / "bench.json"))
+        assert json.loads(open(path).read())["run"]["clients"] == 40
+        print(f"✓ Race detected on {len(report['double_booked'])} slots")
+
+    def test_plan_and_server_timing_parsing(self):
+        start = datetime(2027, 1, 4, 8)
+        plan = booking_bench.plan_attempts(10, 3, 1.0, 2, start)
+        assert len(plan) == 30 and {slot for _, slot, _ in plan} <= {start, datetime(2027, 1, 4, 8, 15)}
+        plan = booking_bench.plan_attempts(10, 3, 0.0, 2, start)
+        assert len({slot for _, slot, _ in plan}) == 30 and not any(hot for _, _, hot in plan)
+
+        assert booking_bench.parse_server_timing("slot_check;dur=12.5, insert;dur=30") == {
+            "slot_check": 12.5, "insert": 30.0}
+        assert booking_bench.normalize_slot("2027-01-04T08:00:00+00:00") == start
+        print("✓ Attempt plan and Server-Timing parsing")
@@ -0,0 +1,63 @@
+"""
+Cold-start Profiler Tests (offline)
+-X importtime parsing, and one real cold start of the image service with the
+fake provider
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'perf'))
+
+pytest.importorskip("httpx")
+pytest.importorskip("fastapi")
+import coldstart
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:      1500 |       1500 |       pydantic.main
+import time:       300 |       1800 |     pydantic
+import time:      2000 |       2000 |     starlette
+import time:       400 |       4200 |   fastapi
+import time:      9000 |      13320 | image_service
+import time:       700 |        700 | site
+"""
+
+
+class TestImportTree:
+    """Post-order importtime output becomes a tree"""
+
+    def test_parse_and_flatten(self):
+        roots = coldstart.parse_importtime(IMPORTTIME)
+        assert [r["name"] for r in roots] == ["image_service", "site"]
+        service = roots[0]
+        assert service["self_ms"] == 9.0 and service["cumulative_ms"] == 13.32
+        assert [c["name"] for c in service["children"]] == ["_io", "fastapi"]
+        fastapi = service["children"][1]
+        assert [c["name"] for c in fastapi["children"]] == ["pydantic", "starlette"]
+        assert fastapi["children"][0]["children"][0]["name"] == "pydantic.main"
+
+        rows = coldstart.flatten(roots, min_ms=1.0, max_depth=3)
+        assert [(depth, node["name"]) for depth, node in rows] == [
+            (0, "image_service"), (1, "fastapi"), (2, "starlette"), (2, "pydantic")]
+        print("✓ Import tree")
+
+
+class TestColdStart:
+    """A fresh uvicorn process reaches every milestone"""
+
+    def test_image_service_cold_start(self):
+        pytest.importorskip("uvicorn")
+        env = coldstart.target_env("image")
+        imports = coldstart.import_profile("image", env)
+        assert imports["module_ms"] > imports["app_construction_ms"] > 0
+        names = {row[1]["name"] for row in coldstart.flatten(imports["tree"], min_ms=0, max_depth=99)}
+        assert "image_dedupe" in names and "PIL.Image" not in names  # deferred until the first hash
+
+        timings = coldstart.cold_start("image", env, timeout=60)
+        assert timings["port_bound_ms"] <= timings["health_ms"] <= timings["first_success_ms"]
+        assert set(timings["deferred_imports"]) >= {"PIL.Image", "emergentintegrations.llm.chat"}
+        assert coldstart.summarize([timings])["health_ms"] == timings["health_ms"]
+        print(f"✓ Cold start: {coldstart.summarize([timings])}")
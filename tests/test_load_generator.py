@@ -0,0 +1,107 @@
+"""
+Load Generator Tests (offline)
+Request harvesting from the API suites and the asyncio load loop, against a
+mocked server
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'perf'))
+
+httpx = pytest.importorskip("httpx")
+import loadgen
+from request_catalog import RequestDef, harvest, harvest_file, select
+
+
+class TestRequestCatalog:
+    """Request definitions come from the existing suites"""
+
+    def test_harvests_directory_requests_from_suites(self):
+        catalog = harvest()
+        endpoints = {r.endpoint for r in select(catalog, include=loadgen.PROFILES["directory"])}
+        for expected in ("GET /api/directory?search", "GET /api/directory/stats",
+                         "GET /api/directory/guide?destination", "GET /api/directory/reviews?listing_id",
+                         "GET /api/directory/la-segunda-bakery"):
+            assert expected in endpoints
+        reviews = next(r for r in catalog if r.endpoint == "GET /api/directory/reviews?listing_id")
+        assert reviews.query["listing_id"] == "5813b912-d37f-4c2c-b5d8-17964e5a728a"  # module constant resolved
+        print(f"✓ {len(catalog)} request definitions harvested")
+
+    def test_skips_runtime_values(self, tmp_path):
+        source = tmp_path / "test_sample.py"
+        source.write_text(
+            'import requests\n'
+            'BASE_URL = "http://localhost:3000"\n'
+            'SLUG = "alpha-plumbing"\n'
+            'def test_a():\n'
+            '    requests.get(f"{BASE_URL}/api/directory/{SLUG}")\n'
+            '    payload = {"name": "TEST_x", "rating": 5}\n'
+            '    requests.post(f"{BASE_URL}/api/directory/reviews", json=payload)\n'
+            '    for limit in (1, 5):\n'
+            '        requests.get(f"{BASE_URL}/api/directory?limit={limit}")\n'
+            '    requests.get(f"{BASE_URL}/api/directory", params={"search": "plumbing"})\n')
+        found = harvest_file(str(source), "test_sample.py")
+        assert [r.endpoint for r in found] == [
+            "GET /api/directory/alpha-plumbing", "POST /api/directory/reviews", "GET /api/directory?search"]
+        assert found[1].json == {"name": "TEST_x", "rating": 5}
+        print("✓ Loop variables skipped, constants and payload dicts resolved")
+
+
+class TestLoadLoop:
+    """Pacing, per-endpoint stats and the JSON report"""
+
+    REQUESTS = [RequestDef("GET", "/api/directory", {"limit": "5"}),
+                RequestDef("GET", "/api/directory/stats"),
+                RequestDef("GET", "/api/directory/nonexistent-slug")]
+
+    async def handler(self, request):
+        await asyncio.sleep(0.01)
+        if request.url.path == "/api/directory/stats":
+            return httpx.Response(503, json={"error": "down"})
+        if request.url.path.endswith("nonexistent-slug"):
+            return httpx.Response(404, json={"error": "not found"})
+        assert request.url.params["limit"] == "5"
+        return httpx.Response(200, json={"listings": []})
+
+    def test_open_loop_rate_and_report(self, tmp_path):
+        started = time.monotonic()
+        stats, elapsed = asyncio.run(loadgen.run_load(
+            self.REQUESTS, "http://test", rps=200, concurrency=8, total=100,
+            transport=httpx.MockTransport(self.handler)))
+        assert 0.45 < time.monotonic() - started < 2.0  # 100 requests paced at 200 rps
+
+        report = loadgen.build_report(stats, elapsed, {"label": "unit"})
+        assert report["overall"]["requests"] == 100
+        stats_row = report["endpoints"]["GET /api/directory/stats"]
+        assert stats_row["error_rate"] == 1.0 and stats_row["statuses"] == {"503": stats_row["requests"]}
+        missing = report["endpoints"]["GET /api/directory/nonexistent-slug"]
+        assert missing["error_rate"] == 0.0  # 4xx reported, not counted as errors
+        listing = report["endpoints"]["GET /api/directory?limit"]
+        assert listing["p50_ms"] >= 10 and listing["p99_ms"] >= listing["p50_ms"]
+
+        path = loadgen.write_report(report, str(tmp_path / "load.json"))
+        assert json.loads(open(path).read())["overall"]["requests"] == 100
+        print(f"✓ 100 requests in {elapsed:.2f}s, p50 {listing['p50_ms']}ms")
+
+    def test_closed_loop_respects_concurrency(self):
+        in_flight, peak = 0, 0
+
+        async def handler(request):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.005)
+            in_flight -= 1
+            return httpx.Response(200, json={})
+
+        stats, _ = asyncio.run(loadgen.run_load(
+            self.REQUESTS[:1], "http://test", rps=0, concurrency=4, total=60,
+            transport=httpx.MockTransport(handler)))
+        assert len(stats["GET /api/directory?limit"].latencies) == 60
+        assert peak == 4
+        print("✓ Closed loop kept 4 requests in flight")
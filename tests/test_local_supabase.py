@@ -0,0 +1,150 @@
+"""
+Local Supabase Stand-in Tests (offline)
+The PostgREST subset used by the app routes and scripts, served in-process
+from the fixtures
+"""
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'local_supabase'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'webapp', 'scripts'))
+
+httpx = pytest.importorskip("httpx")
+pytest.importorskip("fastapi")
+from server import create_app
+
+LA_SEGUNDA_ID = "5813b912-d37f-4c2c-b5d8-17964e5a728a"
+LISTING_SELECT = ("id, business_name, slug, industry, tier, is_claimed, trust_score, tags, "
+                  "directory_badges(id, badge_type, badge_label, badge_color, is_active)")
+
+
+def run(coro_fn):
+    """Run coro_fn(client) against a fresh stand-in"""
+    async def main():
+        app = create_app()
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://local") as client:
+            return await coro_fn(client)
+    return asyncio.run(main())
+
+
+class TestReads:
+    """select/embeds, filters, order, paging and counts as supabase-js sends them"""
+
+    def test_directory_list_query(self):
+        async def go(client):
+            res = await client.get("/rest/v1/directory_listings", params={
+                "select": LISTING_SELECT, "is_published": "eq.true", "order": "trust_score.desc", "limit": "5"},
+                headers={"Prefer": "count=exact"})
+            assert res.status_code == 206 and res.headers["content-range"] == "0-4/12"
+            rows = res.json()
+            assert [r["trust_score"] for r in rows] == sorted((r["trust_score"] for r in rows), reverse=True)
+            top = rows[0]
+            assert top["slug"] == "la-segunda-bakery" and set(top) == {
+                "id", "business_name", "slug", "industry", "tier", "is_claimed", "trust_score", "tags", "directory_badges"}
+            assert {b["badge_type"] for b in top["directory_badges"]} == {"top_rated", "local_legend"}
+
+            res = await client.get("/rest/v1/directory_listings", params=[
+                ("select", "slug"), ("is_published", "eq.true"),
+                ("or", "(business_name.ilike.%plumbing%,description.ilike.%plumbing%,industry.ilike.%plumbing%)")])
+            assert [r["slug"] for r in res.json()] == ["bay-area-plumbing-pros"]
+
+            res = await client.get("/rest/v1/directory_listings", params=[
+                ("select", "slug"), ("tags", "cs.{destination:st-pete-beach,tourism:eat-drink}")])
+            assert [r["slug"] for r in res.json()] == ["sunset-grill-st-pete-beach"]
+
+            res = await client.get("/rest/v1/directory_listings", params=[
+                ("select", "slug"), ("is_claimed", "eq.true"), ("tier", "in.(premium,pro)"), ("city", "ilike.*tampa*"),
+                ("order", "slug.asc")])
+            assert [r["slug"] for r in res.json()] == ["la-segunda-bakery", "ybor-nights-lounge"]
+        run(go)
+        print("✓ Directory list: embeds, ilike/or, contains, in, order, count=exact")
+
+    def test_single_inner_embeds_and_embedded_filters(self):
+        async def go(client):
+            res = await client.get("/rest/v1/directory_listings", params={
+                "select": "*, directory_badges(badge_type, is_active), directory_feedback(rating, submitter_name)",
+                "slug": "eq.cheap-locksmith-tampa", "directory_badges.is_active": "eq.true"},
+                headers={"Accept": "application/vnd.pgrst.object+json"})
+            assert res.status_code == 200
+            listing = res.json()
+            assert listing["directory_badges"] == [] and len(listing["directory_feedback"]) == 2
+
+            res = await client.get("/rest/v1/directory_listings", params={"slug": "eq.nonexistent-slug-xyz123"},
+                                   headers={"Accept": "application/vnd.pgrst.object+json"})
+            assert res.status_code == 406 and res.json()["code"] == "PGRST116"
+
+            res = await client.get("/rest/v1/directory_listings", params={
+                "select": "slug, directory_badges!inner(badge_type)", "directory_badges.badge_type": "eq.top_rated"})
+            assert sorted(r["slug"] for r in res.json()) == ["la-segunda-bakery", "sunset-grill-st-pete-beach"]
+
+            res = await client.get("/rest/v1/directory_feedback", params={
+                "select": "rating, listing:directory_listings(slug)", "listing_id": f"eq.{LA_SEGUNDA_ID}",
+                "order": "created_at.desc", "limit": "1"})
+            assert res.json() == [{"rating": 4, "listing": {"slug": "la-segunda-bakery"}}]
+
+            res = await client.get("/rest/v1/no_such_table")
+            assert res.status_code == 404 and res.json()["code"] == "42P01"
+        run(go)
+        print("✓ .single(), !inner, to-one embeds and PostgREST error codes")
+
+    def test_keyset_sync_through_directory_index(self, monkeypatch):
+        import directory_index
+
+        monkeypatch.setattr(directory_index, "SUPABASE_URL", "http://local")
+        monkeypatch.setattr(directory_index, "PAGE_SIZE", 4)
+
+        async def go(client):
+            index = directory_index.DirectoryIndex(":memory:")
+            seen = await index.sync_async(directory_index.async_rest_getter(client))
+            return seen, index.counts()
+        seen, counts = run(go)
+        assert seen == {"directory_listings": 13, "crm_leads": 4}
+        assert counts["listings"] == 13 and counts["leads"] == 4
+        print(f"✓ Keyset paging (or/and/is.null filters) walked {seen}")
+
+
+class TestWrites:
+    """insert / upsert / update with return=representation"""
+
+    def test_insert_update_and_upsert(self):
+        async def go(client):
+            headers = {"Prefer": "return=representation"}
+            res = await client.post("/rest/v1/directory_feedback", headers=headers,
+                                    json={"listing_id": LA_SEGUNDA_ID, "rating": 5, "feedback_text": "TEST_local"})
+            assert res.status_code == 201
+            created = res.json()[0]
+            assert created["id"] and created["feedback_type"] == "general" and created["created_at"]
+
+            res = await client.patch("/rest/v1/directory_listings", params={"slug": "eq.la-segunda-bakery",
+                                                                             "select": "slug,total_feedback_count"},
+                                     headers=headers, json={"total_feedback_count": 4})
+            assert res.status_code == 200 and res.json() == [{"slug": "la-segunda-bakery", "total_feedback_count": 4}]
+
+            res = await client.post("/rest/v1/directory_listings", headers=headers,
+                                    json={"business_name": "Dup", "slug": "la-segunda-bakery", "industry": "dining"})
+            assert res.status_code == 409 and res.json()["code"] == "23505"
+
+            leads = [{"email": "hello@lasegundabakery.com", "name": "La Segunda Bakery (updated)"},
+                     {"email": "new-lead@example.com", "name": "New Lead"}]
+            upsert = {"Prefer": "resolution=ignore-duplicates,return=representation"}
+            res = await client.post("/rest/v1/crm_leads", params={"on_conflict": "email", "select": "email"},
+                                    headers=upsert, json=leads)
+            assert res.json() == [{"email": "new-lead@example.com"}]
+
+            upsert["Prefer"] = "resolution=merge-duplicates,return=representation"
+            res = await client.post("/rest/v1/crm_leads", params={"on_conflict": "email", "select": "email,name,status"},
+                                    headers=upsert, json=leads)
+            assert res.status_code == 201 and [r["name"] for r in res.json()] == ["La Segunda Bakery (updated)", "New Lead"]
+            assert res.json()[0]["status"] == "new"  # untouched columns kept
+
+            res = await client.get("/rest/v1/crm_leads", params={"select": "id"}, headers={"Prefer": "count=exact"})
+            assert res.headers["content-range"] == "0-4/5"
+
+            await client.post("/__reset")
+            res = await client.get("/rest/v1/crm_leads", params={"select": "id"}, headers={"Prefer": "count=exact"})
+            assert res.headers["content-range"] == "0-3/4"
+        run(go)
+        print("✓ Inserts with defaults, updates, unique violations, upserts and reset")
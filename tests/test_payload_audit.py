@@ -0,0 +1,95 @@
+"""
+Payload Size Audit Tests (offline)
+Per-item and per-field byte accounting, and the listing card contract check,
+against a mock API
+"""
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'perf'))
+
+httpx = pytest.importorskip("httpx")
+import payload_audit
+from request_catalog import RequestDef
+
+
+def gated_listing(i):
+    """A list item the way applyPhotoGating builds it: the whole row plus gating fields"""
+    return {
+        "id": f"id-{i}", "business_name": f"Business {i}", "slug": f"business-{i}", "industry": "dining",
+        "tier": "free", "city": "Tampa", "state": "FL", "description": "Cuban bread since 1915",
+        "has_property_intelligence": False, "cover_image_url": f"https://img.example/{i}.jpg",
+        "metadata": {"gl365_reviews": [{"id": f"rev_{i}_{n}", "text": "Great coffee! " * 40} for n in range(3)],
+                     "review_settings": {"auto_respond": False}},
+        "ai_scraped_data": {"raw_html_excerpt": "<div>" * 300},
+        "gallery_images": [], "search_weight": 1, "is_claimable": True,
+    }
+
+
+def mock_api(request):
+    path = request.url.path
+    if path == "/api/directory":
+        return httpx.Response(200, json=[gated_listing(i) for i in range(int(request.url.params.get("limit", 5)))])
+    if path == "/api/directory/la-segunda-bakery":
+        return httpx.Response(200, json=gated_listing(0))
+    if path == "/api/directory/reviews":
+        return httpx.Response(200, json={"reviews": [{"id": "r1", "text": "ok"}], "total": 1, "average_rating": 5})
+    if path == "/api/directory/my-listing":
+        return httpx.Response(401, json={"error": "Unauthorized"})
+    return httpx.Response(200, text="<html>not json</html>")
+
+
+class TestPayloadAudit:
+    """Byte accounting and the unrendered-field flags"""
+
+    def test_contract_is_read_from_the_ui_contract_test(self):
+        contract = payload_audit.load_card_contract()
+        assert {"id", "business_name", "slug", "has_property_intelligence", "cover_image_url"} <= contract
+        assert "metadata" not in contract
+        print(f"✓ Card contract: {sorted(contract)}")
+
+    def test_field_sizes_add_up_and_recurse(self):
+        item = gated_listing(1)
+        sizes = payload_audit.field_sizes([item], depth=3)
+        top = sum(size for path, (size, _) in sizes.items() if "." not in path and "[]" not in path)
+        # top-level fields + braces + one comma between each pair == the item's compact JSON
+        assert top + 2 + len(item) - 1 == payload_audit.json_size(item)
+        assert sizes["metadata.gl365_reviews[].text"][1] == 3
+        assert "metadata.gl365_reviews" in sizes and "metadata.review_settings.auto_respond" in sizes
+        assert "metadata.gl365_reviews[].text" not in payload_audit.field_sizes([item], depth=2)
+        print("✓ Field sizes")
+
+    def test_audit_flags_unrendered_listing_fields(self):
+        requests = payload_audit.distinct([
+            RequestDef("GET", "/api/directory", {"limit": "5"}),
+            RequestDef("GET", "/api/directory", {"limit": "20"}),  # same shape, audited once
+            RequestDef("GET", "/api/directory/la-segunda-bakery"),
+            RequestDef("GET", "/api/directory/reviews", {"listing_id": "x"}),
+            RequestDef("GET", "/api/directory/my-listing"),
+            RequestDef("GET", "/api/pricing-tiers"),
+        ])
+        assert len(requests) == 5
+        contract = payload_audit.load_card_contract()
+        results = asyncio.run(payload_audit.run_audit(requests, "http://api", contract,
+                                                      transport=httpx.MockTransport(mock_api)))
+        by_endpoint = {r["endpoint"]: r for r in results}
+
+        listings = by_endpoint["GET /api/directory?limit"]
+        assert listings["listing_card"] and listings["items"] == 5
+        assert listings["unrendered_fields"][:2] == ["metadata", "ai_scraped_data"]
+        assert "gallery_images" in listings["unrendered_fields"] and "slug" not in listings["unrendered_fields"]
+        assert listings["unrendered_share"] > 0.8
+        assert listings["wire_bytes"] == listings["bytes"]
+
+        detail = by_endpoint["GET /api/directory/la-segunda-bakery"]
+        assert not detail["listing_card"] and detail["unrendered_share"] is None
+        reviews = by_endpoint["GET /api/directory/reviews?listing_id"]
+        assert reviews["records_path"] == "reviews" and reviews["items"] == 1
+        assert by_endpoint["GET /api/directory/my-listing"]["public"] is False
+        assert by_endpoint["GET /api/pricing-tiers"]["error"] == "not JSON"
+        json.dumps(results)  # report-ready
+        print(f"✓ {listings['unrendered_share']:.0%} of the list payload is never rendered by the card")
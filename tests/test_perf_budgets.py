@@ -0,0 +1,125 @@
+"""
+Performance Budget Regression Tests
+Each route in tests/perf/budgets.json must stay under its p95 latency and
+response-size budget, and must not regress past tolerance against the last
+passing run in test_reports/. The live run is skipped when PERF_BASE_URL isn't
+reachable, and only writes its report (the next run's baseline) with
+PERF_SAVE_REPORT=1.
+"""
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'perf'))
+
+httpx = pytest.importorskip("httpx")
+import budget_check
+
+BASE_URL = os.getenv("PERF_BASE_URL", "http://localhost:3000")
+SAVE_REPORT = os.getenv("PERF_SAVE_REPORT") == "1"
+ENDPOINTS = [e["name"] for e in budget_check.load_budgets()["endpoints"]]
+
+
+@pytest.fixture(scope="module")
+def budget_run():
+    """One warm benchmark of every budgeted route, shared by the per-route tests"""
+    try:
+        httpx.get(BASE_URL, timeout=5)
+    except httpx.TransportError as exc:
+        pytest.skip(f"{BASE_URL} not reachable: {exc}")
+    report, violations, previous = budget_check.run_check(BASE_URL, save=SAVE_REPORT)
+    print(f"Perf budget report: {report.get('report_path', 'not saved')} (baseline {report['baseline']})")
+    return report, violations, previous
+
+
+class TestPerfBudgets:
+    """Live run against BASE_URL"""
+
+    @pytest.mark.parametrize("name", ENDPOINTS)
+    def test_route_within_budget(self, budget_run, name):
+        report, violations, previous = budget_run
+        mine = [v for v in violations if v.name == name]
+        assert not mine, "\n" + budget_check.format_diff(mine, report["results"], previous)
+        result = report["results"][name]
+        print(f"✓ {name}: p95 {result['p95_ms']}ms, {result['max_bytes']} bytes")
+
+
+def write_budgets(tmp_path, **defaults):
+    budgets = {
+        "defaults": {"warmup": 1, "samples": 10, "concurrency": 2, **defaults},
+        "endpoints": [
+            {"name": "list", "path": "/api/directory", "query": {"limit": "24"}, "p95_ms": 200, "max_bytes": 5000},
+            {"name": "stats", "path": "/api/directory/stats", "p95_ms": 200, "max_bytes": 500},
+        ],
+    }
+    path = tmp_path / "budgets.json"
+    path.write_text(json.dumps(budgets))
+    return str(path)
+
+
+class FakeDirectory:
+    def __init__(self):
+        self.listings = 10
+        self.delay = 0.001
+        self.requests = 0
+
+    async def handler(self, request):
+        self.requests += 1
+        await asyncio.sleep(self.delay)
+        if request.url.path == "/api/directory/stats":
+            return httpx.Response(200, json={"total": self.listings})
+        assert request.url.params["limit"] == "24"
+        return httpx.Response(200, json={"listings": [{"name": "x" * 20}] * self.listings})
+
+
+class TestBudgetComparison:
+    """Budget and regression checks against a fake server (offline)"""
+
+    def test_passing_run_becomes_the_baseline(self, tmp_path):
+        budgets = write_budgets(tmp_path)
+        api = FakeDirectory()
+        transport = httpx.MockTransport(api.handler)
+
+        report, violations, previous = budget_check.run_check("http://test", budgets, report_dir=str(tmp_path),
+                                                              transport=transport)
+        assert not violations and report["passed"] and report["baseline"] is None
+        assert api.requests == 2 * (1 + 10)  # warmup + samples per route
+        assert report["results"]["list"]["max_bytes"] > 0
+
+        # Payload grows 3x: still under budget, but a regression against the last passing run
+        api.listings = 30
+        report, violations, previous = budget_check.run_check("http://test", budgets, report_dir=str(tmp_path),
+                                                              transport=transport)
+        assert report["baseline"].endswith(".json")
+        assert [(v.name, v.kind) for v in violations] == [("list", "bytes_regression")]
+        diff = budget_check.format_diff(violations, report["results"], previous)
+        assert "bytes_regression" in diff and str(previous["list"]["max_bytes"]) in diff
+
+        # The failing run doesn't become the baseline
+        assert budget_check.previous_report(str(tmp_path))["passed"]
+        print(f"✓ Regression reported:\n{diff}")
+
+    def test_over_budget_and_latency_regression(self, tmp_path):
+        budgets = budget_check.load_budgets(write_budgets(tmp_path))
+        results = {
+            "list": {"statuses": ["200"], "p95_ms": 250.0, "max_bytes": 4000},
+            "stats": {"statuses": ["200", "500"], "p95_ms": 10.0, "max_bytes": 20},
+        }
+        previous = {"list": {"p95_ms": 150.0, "max_bytes": 4000}}
+        kinds = [(v.name, v.kind) for v in budget_check.compare(results, budgets, previous)]
+        assert kinds == [("list", "p95_budget"), ("list", "p95_regression"), ("stats", "status")]
+
+        # Small absolute moves on fast routes are noise, not regressions
+        results["list"]["p95_ms"] = 40.0
+        previous["list"]["p95_ms"] = 20.0
+        assert budget_check.compare(results, budgets, previous)[0].kind == "status"
+        print("✓ Budget, regression and status checks")
+
+    def test_repo_budgets_file(self):
+        budgets = budget_check.load_budgets()
+        assert {"directory_list", "directory_guide", "directory_stats"} <= set(ENDPOINTS)
+        assert all(e["p95_ms"] > 0 and e["max_bytes"] > 0 for e in budgets["endpoints"])
+        print(f"✓ {len(ENDPOINTS)} budgeted routes")
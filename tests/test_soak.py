@@ -0,0 +1,91 @@
+"""
+Soak Harness Tests (offline)
+Growth detection on synthetic series, and a short in-process soak of the
+image service with the fake provider
+"""
+import asyncio
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'perf'))
+
+httpx = pytest.importorskip("httpx")
+pytest.importorskip("fastapi")
+import soak
+
+
+def series(values, step=60):
+    return [{"t": i * step, "rss_kb": v, "fds": 12, "tasks": 3} for i, v in enumerate(values)]
+
+
+class TestGrowthDetection:
+    """Monotonic window medians above threshold are flagged; sawtooth and noise are not"""
+
+    def test_leak_is_flagged(self):
+        rng = random.Random(1)
+        leak = [200_000 + i * 2_000 + rng.randint(-3_000, 3_000) for i in range(40)]  # ~2 MB/min
+        findings = {f["metric"]: f for f in soak.find_growth(series(leak))}
+        assert findings["rss_kb"]["flagged"] and findings["rss_kb"]["per_hour"] > 100_000
+        assert not findings["fds"]["flagged"] and not findings["tasks"]["monotonic"]
+        print(f"✓ Leak flagged: {findings['rss_kb']['per_hour']} KB/h")
+
+    def test_sawtooth_and_small_drift_are_not(self):
+        sawtooth = [200_000 + (i % 5) * 20_000 for i in range(40)]  # allocator high-water marks that get released
+        assert not any(f["flagged"] for f in soak.find_growth(series(sawtooth)))
+        drift = [200_000 + i * 100 for i in range(40)]  # monotonic, but 4 MB over the run
+        rss = {f["metric"]: f for f in soak.find_growth(series(drift))}["rss_kb"]
+        assert rss["monotonic"] and not rss["flagged"]
+        assert soak.find_growth(series([1, 2, 3])) == []  # too few samples to judge
+        print("✓ Sawtooth and sub-threshold drift not flagged")
+
+    def test_parse_duration(self):
+        assert soak.parse_duration("4h") == 14400 and soak.parse_duration("90m") == 5400
+        assert soak.parse_duration("45") == 45.0
+        print("✓ Durations")
+
+
+class TestInProcessSoak:
+    """The driver, probe and traffic mix against the image service"""
+
+    def test_short_soak_samples_the_probe(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("FAKE_IMAGE_LATENCY", "fixed:1")
+        monkeypatch.setenv("FAKE_IMAGE_SIZE", "64x36")
+        monkeypatch.setenv("FAKE_IMAGE_NOISE", "0")
+        monkeypatch.setenv("FAKE_IMAGE_ERROR_RATE", "0")
+        monkeypatch.setenv("IMAGE_CACHE_DIR", str(tmp_path / "cache"))
+        monkeypatch.setenv("IMAGE_PROVIDER", "fake")
+        app = soak.load_target("image")
+        import image_dedupe
+        import image_providers
+        image_providers._instances.clear()
+        image_dedupe._cache = image_dedupe.ImageCache(str(tmp_path / "cache"))
+        soak.install_probe(app)
+
+        seen = []
+        samples = asyncio.run(soak.soak("http://soak", soak.traffic("image"), duration=1.2, interval=0.3,
+                                        warmup=0.2, rps=20, transport=httpx.ASGITransport(app=app),
+                                        on_sample=seen.append))
+        image_providers._instances.clear()
+        assert samples == seen and len(samples) >= 2
+        first = samples[0]
+        assert first["requests"] > 0 and first["error_rate"] == 0.0
+        assert first["rss_kb"] > 0 and first["tasks"] >= 1 and first["threads"] >= 1
+        assert first["traced_kb"] is None  # tracemalloc only runs in the spawned target
+        print(f"✓ {len(samples)} samples, {sum(s['requests'] for s in samples)} requests")
+
+    def test_upstream_stub_serves_the_proxy_mix(self):
+        async def go():
+            transport = httpx.ASGITransport(app=soak.create_upstream())
+            async with httpx.AsyncClient(transport=transport, base_url="http://upstream") as client:
+                results = []
+                for req in soak.traffic("proxy"):
+                    res = await client.request(req.method, req.path, params=req.query or None, json=req.json)
+                    results.append((req.path, res.status_code, len(res.content)))
+                return results
+        results = asyncio.run(go())
+        assert {(p, s) for p, s, _ in results} >= {("/api/soak/status/502", 502), ("/api/soak/echo", 200)}
+        assert max(n for _, _, n in results) > 500_000
+        print("✓ Upstream stub")
@@ -0,0 +1,102 @@
+"""
+Synthetic Directory Dataset Tests (offline)
+Generated fixtures load into the local PostgREST stand-in and answer the
+directory routes' queries
+"""
+import asyncio
+import os
+import sys
+from collections import Counter
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'perf'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'local_supabase'))
+
+httpx = pytest.importorskip("httpx")
+pytest.importorskip("fastapi")
+import synth_directory
+from server import create_app, load_fixtures
+
+
+def make_opts(tmp_path, *args):
+    return synth_directory.parse_args(["--listings", "400", "--out", str(tmp_path / "data"), *args])
+
+
+class TestSynthDirectory:
+    """Shape, distribution and determinism of the generated dataset"""
+
+    def test_fixtures_are_consistent_and_deterministic(self, tmp_path):
+        counts = synth_directory.generate(make_opts(tmp_path))
+        data = load_fixtures(str(tmp_path / "data"))
+        assert {t: len(rows) for t, rows in data.items()} == counts
+        listings = data["directory_listings"]
+        assert len(listings) == 400 and len({l["slug"] for l in listings}) == 400
+
+        ids = {l["id"] for l in listings}
+        assert all(b["listing_id"] in ids for b in data["directory_badges"])
+        assert all(f["listing_id"] in ids for f in data["directory_feedback"])
+        by_id = {l["id"]: l for l in listings}
+        per_listing = Counter(f["listing_id"] for f in data["directory_feedback"])
+        assert all(by_id[i]["total_feedback_count"] == n for i, n in per_listing.items())
+
+        tiers = Counter(l["tier"] for l in listings)
+        assert tiers["free"] > tiers["pro"] > tiers["premium"] > 0
+        destinations = Counter(t for l in listings for t in l["tags"] if t.startswith("destination:"))
+        assert destinations.most_common(1)[0][0] == "destination:miami"  # Zipf rank 1
+        assert all(any(t.startswith("tourism:") for t in l["tags"]) for l in listings)
+        first = listings[0]
+        assert first["metadata"]["latitude"] == first["latitude"] and first["gallery_images"]
+
+        synth_directory.generate(make_opts(tmp_path, "--out", str(tmp_path / "again")))
+        assert (tmp_path / "again" / "directory_listings.json").read_text() == \
+            (tmp_path / "data" / "directory_listings.json").read_text()
+        print(f"✓ {counts}, tiers {dict(tiers)}")
+
+    def test_loads_into_stand_in_and_serves_route_queries(self, tmp_path):
+        opts = make_opts(tmp_path, "--destinations", "5", "--destination-skew", "0")
+        synth_directory.generate(opts)
+        app = create_app(str(tmp_path / "data"))
+
+        async def go():
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://local") as client:
+                stats = await client.get("/rest/v1/directory_listings", params={"select": "industry, city, tags"},
+                                         headers={"Prefer": "count=exact"})
+                guide = await client.get("/rest/v1/directory_listings", params=[
+                    ("select", "id, slug, tier, tags, directory_badges(id, badge_type)"), ("is_published", "eq.true"),
+                    ("tags", "cs.{destination:st-pete-beach}"), ("order", "trust_score.desc"), ("limit", "300")])
+                return stats, guide
+        stats, guide = asyncio.run(go())
+        assert stats.headers["content-range"].endswith("/400") and len(stats.json()) == 400
+        rows = guide.json()
+        assert 40 < len(rows) < 140  # ~1/5 of the listings with a uniform spread over 5 destinations
+        assert all("destination:st-pete-beach" in r["tags"] for r in rows)
+        assert any(r["directory_badges"] for r in rows)
+
+        # Unpaged reads are cut at db-max-rows, as on Supabase, while count=exact still sees every row
+        capped = create_app(str(tmp_path / "data"), max_rows=150)
+
+        async def stats_capped():
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=capped), base_url="http://local") as client:
+                return await client.get("/rest/v1/directory_listings", params={"select": "industry, city, tags"},
+                                        headers={"Prefer": "count=exact"})
+        res = asyncio.run(stats_capped())
+        assert len(res.json()) == 150 and res.headers["content-range"] == "0-149/400"
+        print(f"✓ Guide query returned {len(rows)} listings from the generated set")
+
+    def test_load_url_posts_parents_before_children(self, tmp_path):
+        app = create_app(str(tmp_path))  # empty stand-in
+        opts = synth_directory.parse_args(["--listings", "120", "--load-url", "http://local", "--batch-size", "25"])
+        counts = synth_directory.generate(opts, transport=httpx.ASGITransport(app=app))
+
+        store = app.state.store
+        assert {t: len(store.tables[t]) for t in synth_directory.TABLES} == counts
+        ids = {l["id"] for l in store.tables["directory_listings"]}
+        assert len(ids) == 120 and all(b["listing_id"] in ids for b in store.tables["directory_badges"])
+        print(f"✓ Loaded {counts} over REST")
+
+    def test_weights_parsing(self):
+        assert synth_directory.parse_weights("free=0.8,pro=0.2") == {"free": 0.8, "pro": 0.2}
+        with pytest.raises(ValueError):
+            synth_directory.parse_weights("free=0")
+        print("✓ Tier weights")
@@ -13,6 +13,9 @@ function sanitizeInput(str: string | undefined): string {
     .replace(/\//g, '&#x2F;');
 }
 
+// Server-Timing is only for benchmarking (tests/perf/booking_bench.py); off in production
+const SERVER_TIMING = process.env.BOOKING_SERVER_TIMING === '1';
+
 // Validate email format
 function isValidEmail(email: string): boolean {
   const emailRegex = /^[^\s@]+@[^\s@]+\.[^\s@]+$/;
@@ -54,30 +57,44 @@ export async function POST(req: NextRequest) {
       return Response.json({ error: 'Email is too long' }, { status: 400 });
     }
 
+    // Per-step durations, reported as Server-Timing for the contention benchmark when enabled
+    const timings = { slot_check: 0, insert: 0 };
+    const timed = async <T>(step: keyof typeof timings, work: PromiseLike<T>): Promise<T> => {
+      const started = Date.now();
+      try {
+        return await work;
+      } finally {
+        timings[step] += Date.now() - started;
+      }
+    };
+    const serverTiming = (): Record<string, string> => SERVER_TIMING ? {
+      'Server-Timing': Object.entries(timings).map(([step, ms]) => `${step};dur=${ms}`).join(', '),
+    } : {};
+
     // **CRITICAL: Double-booking prevention**
     // Check if the datetime slot is already booked
-    const { data: existingBookings, error: checkError } = await supabase
+    const { data: existingBookings, error: checkError } = await timed('slot_check', supabase
       .from('bookings')
       .select('id, full_name, status')
       .eq('preferred_datetime', preferred_datetime)
       .neq('status', 'cancelled')
-      .limit(1);
+      .limit(1));
 
     if (checkError) {
       console.error('Error checking existing bookings:', checkError);
       // Don't fail silently - return error to prevent potential double booking
-      return Response.json({ error: 'Unable to verify slot availability. Please try again.' }, { status: 500 });
+      return Response.json({ error: 'Unable to verify slot availability. Please try again.' }, { status: 500, headers: serverTiming() });
     }
 
     if (existingBookings && existingBookings.length > 0) {
       return Response.json({ 
         error: 'This time slot is already booked. Please select a different time.',
         code: 'SLOT_TAKEN'
-      }, { status: 409 }); // 409 Conflict
+      }, { status: 409, headers: serverTiming() }); // 409 Conflict
     }
 
     // All validations passed - insert booking
-    const { data, error } = await supabase
+    const { data, error } = await timed('insert', supabase
       .from('bookings')
       .insert([{
         full_name: full_name,
@@ -96,7 +113,7 @@ export async function POST(req: NextRequest) {
         source: sanitizeInput(body.source) || 'unknown',
       }])
       .select()
-      .single();
+      .single());
 
     if (error) {
       console.error('Supabase error:', error);
@@ -105,12 +122,12 @@ export async function POST(req: NextRequest) {
         return Response.json({ 
           error: 'This time slot was just booked by someone else. Please select a different time.',
           code: 'SLOT_TAKEN'
-        }, { status: 409 });
+        }, { status: 409, headers: serverTiming() });
       }
-      return Response.json({ error: error.message }, { status: 400 });
+      return Response.json({ error: error.message }, { status: 400, headers: serverTiming() });
     }
 
-    return Response.json({ success: true, booking: data }, { status: 201 });
+    return Response.json({ success: true, booking: data }, { status: 201, headers: serverTiming() });
   } catch (error: unknown) {
     const message = error instanceof Error ? error.message : 'Server error';
     console.error('Booking API error:', message);
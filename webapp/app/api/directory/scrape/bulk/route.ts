@@ -1,65 +1,169 @@
 import { NextRequest, NextResponse } from 'next/server';
+import { createClient } from '@supabase/supabase-js';
 import { requireAuth } from '@/lib/api-auth';
+import { scrapeAndCreateListing, normalizeScrapeUrl, type ScrapeInput, type ScrapeOutcome } from '@/lib/directory-scrape';
 
-// POST /api/directory/scrape/bulk - Process multiple URLs
-// Body: { urls: ["https://example.com", ...], tier: "free" }
-// Returns results for each URL (success or error)
+const supabaseUrl = process.env.NEXT_PUBLIC_SUPABASE_URL!;
+const supabaseServiceKey = process.env.SUPABASE_SERVICE_ROLE_KEY!;
+
+const MAX_BATCH = 200;
+const DEFAULT_CONCURRENCY = 4;
+const MAX_CONCURRENCY = 8;
+// Minimum gap between two fetches of the same host, as the old per-URL polite delay
+const DEFAULT_DOMAIN_INTERVAL_MS = 1500;
+const MAX_DOMAIN_INTERVAL_MS = 10000;
+
+// POST /api/directory/scrape/bulk - Scrape a batch of URLs in one request
+// Body: { items: [{ url, fallback_name, fallback_industry, fallback_city, fallback_state }], tier, concurrency,
+//         domain_interval (seconds between fetches of one host, default 1.5) }
+//   or: { urls: ["https://example.com", ...], tier }
+// Auth: signed-in user, or `Authorization: Bearer $CRON_SECRET` for scripts.
+//
+// Auth and the Supabase client are set up once per batch and URLs are
+// processed by a small worker pool (one at a time per host, `domain_interval`
+// apart). With
+// `Accept: application/x-ndjson` each result is streamed as a line the
+// moment it finishes, followed by a summary line:
+//   {"type":"result","index":0,"url":"https://...","status":"ok"|"fallback"|"error","listing":{...},"error":null,
+//    "cache":"not_modified"|"hash"|"miss","action":"created"|"updated"|"unchanged",
+//    "timings":{"fetch_ms":N,"llm_ms":N,"db_ms":N}}
+//   {"type":"summary","total":N,"ok":N,"fallback":N,"errors":N,"unchanged":N,"llm_skipped":N,"elapsed_ms":N}
+// Re-scraped sites are checked conditionally (see lib/directory-scrape.ts):
+// "unchanged" results reused the previous extraction and left the listing as is.
+// Otherwise the aggregated JSON response is returned when the batch is done.
 export async function POST(request: NextRequest) {
-  const auth = await requireAuth();
-  if (auth.error) return auth.error;
+  const authHeader = request.headers.get('authorization');
+  const cronSecret = process.env.CRON_SECRET;
+  const isScript = cronSecret && authHeader === `Bearer ${cronSecret}`;
+  if (!isScript) {
+    const auth = await requireAuth();
+    if (auth.error) return auth.error;
+  }
 
   const body = await request.json();
   const { urls, tier } = body;
+  const items: ScrapeInput[] = Array.isArray(body.items)
+    ? body.items.filter((item: any) => item && typeof item.url === 'string' && item.url.trim())
+    : Array.isArray(urls) ? urls.filter((u: any) => typeof u === 'string' && u.trim()).map((url: string) => ({ url })) : [];
 
-  if (!urls || !Array.isArray(urls) || urls.length === 0) {
-    return NextResponse.json({ error: 'urls array required' }, { status: 400 });
+  if (items.length === 0) {
+    return NextResponse.json({ error: 'items or urls array required' }, { status: 400 });
   }
 
-  if (urls.length > 100) {
-    return NextResponse.json({ error: 'Maximum 100 URLs per batch' }, { status: 400 });
+  if (items.length > MAX_BATCH) {
+    return NextResponse.json({ error: `Maximum ${MAX_BATCH} URLs per batch` }, { status: 400 });
   }
 
-  const baseUrl = request.nextUrl.origin;
-  const results: any[] = [];
-  let successCount = 0;
-  let errorCount = 0;
-
-  // Process URLs sequentially to avoid rate limiting
-  for (let i = 0; i < urls.length; i++) {
-    const url = urls[i].trim();
-    if (!url) continue;
-
-    try {
-      const res = await fetch(`${baseUrl}/api/directory/scrape`, {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ url, tier: tier || 'free' }),
-      });
-
-      const data = await res.json();
-
-      if (res.ok) {
-        successCount++;
-        results.push({ url, status: 'success', business_name: data.listing?.business_name, id: data.listing?.id });
-      } else {
-        errorCount++;
-        results.push({ url, status: 'error', error: data.error });
+  const concurrency = Math.max(1, Math.min(Number(body.concurrency) || DEFAULT_CONCURRENCY, MAX_CONCURRENCY));
+  const requestedInterval = Number(body.domain_interval);
+  const domainIntervalMs = Number.isFinite(requestedInterval)
+    ? Math.max(0, Math.min(requestedInterval * 1000, MAX_DOMAIN_INTERVAL_MS))
+    : DEFAULT_DOMAIN_INTERVAL_MS;
+  const supabase = createClient(supabaseUrl, supabaseServiceKey);
+  const started = Date.now();
+
+  // Runs the batch, calling onResult as each URL finishes
+  async function runBatch(onResult: (index: number, outcome: ScrapeOutcome) => void) {
+    const hostChains = new Map<string, Promise<unknown>>();
+    const hostLastDone = new Map<string, number>();
+    let next = 0;
+
+    // Waits out the host's interval, then scrapes; runs inside the host's chain
+    const politeScrape = async (host: string, item: ScrapeInput) => {
+      const wait = (hostLastDone.get(host) ?? 0) + domainIntervalMs - Date.now();
+      if (wait > 0) await new Promise((resolve) => setTimeout(resolve, wait));
+      try {
+        return await scrapeAndCreateListing(supabase, { ...item, tier: item.tier || tier || 'free' });
+      } finally {
+        hostLastDone.set(host, Date.now());
+      }
+    };
+
+    const scrapeOne = (index: number) => {
+      const item = items[index];
+      let host = '';
+      try { host = new URL(normalizeScrapeUrl(item.url)).hostname.replace('www.', ''); } catch { /* bad URL: fails below */ }
+      const previous = hostChains.get(host) || Promise.resolve();
+      const run = previous.then(() => politeScrape(host, item));
+      hostChains.set(host, run.catch(() => undefined));
+      return run;
+    };
+
+    const worker = async () => {
+      while (next < items.length && !request.signal.aborted) {
+        const index = next++;
+        let outcome: ScrapeOutcome;
+        try {
+          outcome = await scrapeOne(index);
+        } catch (err: any) {
+          outcome = { status: 'error', url: items[index].url, error: err.message };
+        }
+        onResult(index, outcome);
       }
-    } catch (err: any) {
-      errorCount++;
-      results.push({ url, status: 'error', error: err.message });
-    }
-
-    // Small delay between requests to be polite
-    if (i < urls.length - 1) {
-      await new Promise(r => setTimeout(r, 1500));
-    }
+    };
+
+    await Promise.all(Array.from({ length: Math.min(concurrency, items.length) }, worker));
   }
 
+  const counts = { ok: 0, fallback: 0, errors: 0, unchanged: 0, llm_skipped: 0 };
+  const tally = (outcome: ScrapeOutcome) => {
+    if (outcome.status === 'error') counts.errors++;
+    else counts[outcome.status]++;
+    if (outcome.action === 'unchanged') counts.unchanged++;
+    if (outcome.cache && outcome.cache !== 'miss') counts.llm_skipped++;
+  };
+
+  if ((request.headers.get('accept') || '').includes('application/x-ndjson')) {
+    const encoder = new TextEncoder();
+    const stream = new ReadableStream({
+      async start(controller) {
+        const send = (line: object) => controller.enqueue(encoder.encode(JSON.stringify(line) + '\n'));
+        try {
+          await runBatch((index, outcome) => {
+            tally(outcome);
+            send({
+              type: 'result',
+              index,
+              url: outcome.url,
+              status: outcome.status,
+              listing: outcome.listing || null,
+              error: outcome.error || null,
+              cache: outcome.cache || null,
+              action: outcome.action || null,
+              timings: outcome.timings || null,
+            });
+          });
+          send({ type: 'summary', total: items.length, ...counts, elapsed_ms: Date.now() - started });
+        } catch (err: any) {
+          send({ type: 'error', error: err.message });
+        } finally {
+          controller.close();
+        }
+      },
+    });
+
+    return new Response(stream, {
+      headers: {
+        'Content-Type': 'application/x-ndjson; charset=utf-8',
+        'Cache-Control': 'no-cache',
+        'Transfer-Encoding': 'chunked',
+      },
+    });
+  }
+
+  const results: any[] = new Array(items.length);
+  await runBatch((index, outcome) => {
+    tally(outcome);
+    results[index] = outcome.status === 'error'
+      ? { url: outcome.url, status: 'error', error: outcome.error }
+      : { url: outcome.url, status: 'success', business_name: outcome.listing?.business_name, id: outcome.listing?.id, action: outcome.action };
+  });
+
   return NextResponse.json({
-    total: urls.length,
-    success: successCount,
-    errors: errorCount,
+    total: items.length,
+    success: counts.ok + counts.fallback,
+    errors: counts.errors,
+    unchanged: counts.unchanged,
     results,
   });
 }
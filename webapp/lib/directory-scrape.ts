@@ -0,0 +1,314 @@
+import { createHash } from 'crypto';
+import type { SupabaseClient } from '@supabase/supabase-js';
+
+/**
+ * Website scrape + AI extraction + listing insert, shared by
+ * /api/directory/scrape (one URL) and /api/directory/scrape/bulk (batches).
+ *
+ * Everything here takes its Supabase client from the caller, so a batch
+ * creates one client and pays auth once; fetches to target sites and to
+ * OpenRouter go through the runtime's pooled keep-alive connections, which
+ * a batch reuses across every URL it processes.
+ *
+ * Re-scrapes are conditional: directory_scrape_cache keeps each URL's ETag,
+ * Last-Modified, a hash of the normalized page text and the last extraction.
+ * A 304 or an unchanged hash reuses that extraction (no LLM call) and leaves
+ * the listing alone; a changed page updates the existing listing in place
+ * instead of inserting a duplicate. When a re-scrape's fetch fails or returns
+ * no content it is an error: neither the listing nor the cache is touched, so
+ * a flaky site can't blank a listing or poison the cached extraction. A first
+ * scrape of an unreachable site still creates a fallback listing from the
+ * caller's fallback_* fields.
+ */
+
+const openrouterKey = process.env.OPENROUTER_API_KEY!;
+
+export interface ScrapeInput {
+  url: string;
+  tier?: string;
+  fallback_name?: string;
+  fallback_industry?: string;
+  fallback_city?: string;
+  fallback_state?: string;
+}
+
+export type ScrapeStatus = 'ok' | 'fallback' | 'error';
+
+// How the page was answered: 304, same normalized text as last time, or a full extraction
+export type CacheResult = 'not_modified' | 'hash' | 'miss';
+
+export interface ScrapeOutcome {
+  status: ScrapeStatus;
+  url: string;
+  listing?: any;
+  extracted?: any;
+  error?: string;
+  cache?: CacheResult;
+  action?: 'created' | 'updated' | 'unchanged';
+  timings?: ScrapeTimings;
+}
+
+// Wall time per stage of one scrape, reported to callers for load tuning
+export interface ScrapeTimings {
+  fetch_ms: number;
+  llm_ms: number;
+  db_ms: number;
+}
+
+export interface PageFetch {
+  notModified: boolean;
+  text: string;
+  etag: string | null;
+  lastModified: string | null;
+}
+
+interface ScrapeCacheRow {
+  url: string;
+  listing_id: string | null;
+  etag: string | null;
+  last_modified: string | null;
+  content_hash: string | null;
+  extracted: any;
+  hits: number | null;
+}
+
+export function normalizeScrapeUrl(url: string): string {
+  let normalizedUrl = url.trim();
+  if (!normalizedUrl.startsWith('http')) normalizedUrl = 'https://' + normalizedUrl;
+  return normalizedUrl;
+}
+
+// Hash of the text the LLM would see, insensitive to case and whitespace
+export function contentHash(text: string): string {
+  return createHash('sha256').update(text.toLowerCase().replace(/\s+/g, ' ').trim()).digest('hex');
+}
+
+// Fetch a URL (conditionally when validators are given) and extract its text content
+export async function fetchPage(url: string, validators?: { etag?: string | null; lastModified?: string | null }): Promise<PageFetch> {
+  const empty: PageFetch = { notModified: false, text: '', etag: null, lastModified: null };
+  try {
+    const headers: Record<string, string> = {
+      'User-Agent': 'Mozilla/5.0 (compatible; GL365Bot/1.0)',
+      'Accept': 'text/html,application/xhtml+xml',
+    };
+    if (validators?.etag) headers['If-None-Match'] = validators.etag;
+    if (validators?.lastModified) headers['If-Modified-Since'] = validators.lastModified;
+
+    const res = await fetch(url, { headers, signal: AbortSignal.timeout(15000) });
+    const etag = res.headers.get('etag');
+    const lastModified = res.headers.get('last-modified');
+    if (res.status === 304) {
+      return { notModified: true, text: '', etag: etag || validators?.etag || null, lastModified: lastModified || validators?.lastModified || null };
+    }
+    const html = await res.text();
+
+    // Extract title
+    const titleMatch = html.match(/<title[^>]*>([^<]*)<\/title>/i);
+    const title = titleMatch ? titleMatch[1].trim() : '';
+
+    // Extract meta description
+    const metaMatch = html.match(/<meta[^>]*name=["']description["'][^>]*content=["']([^"']*)["']/i);
+    const metaDesc = metaMatch ? metaMatch[1].trim() : '';
+
+    // Extract og tags
+    const ogTitle = html.match(/<meta[^>]*property=["']og:title["'][^>]*content=["']([^"']*)["']/i)?.[1] || '';
+    const ogDesc = html.match(/<meta[^>]*property=["']og:description["'][^>]*content=["']([^"']*)["']/i)?.[1] || '';
+
+    // Strip HTML to text, keep useful content
+    const bodyText = html
+      .replace(/<script[^>]*>[\s\S]*?<\/script>/gi, '')
+      .replace(/<style[^>]*>[\s\S]*?<\/style>/gi, '')
+      .replace(/<nav[^>]*>[\s\S]*?<\/nav>/gi, '')
+      .replace(/<footer[^>]*>[\s\S]*?<\/footer>/gi, '')
+      .replace(/<[^>]+>/g, ' ')
+      .replace(/&nbsp;/g, ' ')
+      .replace(/&amp;/g, '&')
+      .replace(/\s+/g, ' ')
+      .trim()
+      .slice(0, 4000);
+
+    return {
+      notModified: false,
+      text: `TITLE: ${title}\nMETA: ${metaDesc}\nOG_TITLE: ${ogTitle}\nOG_DESC: ${ogDesc}\nBODY: ${bodyText}`,
+      etag,
+      lastModified,
+    };
+  } catch {
+    return empty;
+  }
+}
+
+// Scrape a URL and extract text content (unconditional)
+export async function scrapeWebsite(url: string): Promise<string> {
+  return (await fetchPage(url)).text;
+}
+
+// Use AI to extract business info from scraped text
+export async function extractBusinessInfo(scrapedText: string, url: string): Promise<any> {
+  const prompt = `You are a business data extraction AI. Given the following website text content, extract the business information and return it as JSON.
+
+Website URL: ${url}
+Website Content:
+${scrapedText}
+
+Return ONLY valid JSON with these fields (use null if not found):
+{
+  "business_name": "string",
+  "industry": "one of: hvac, plumbing, roofing, electrical, barbershop, bakery, gym, restaurant, spa, florist, boutique, cleaning, landscaping, security, painting, general",
+  "description": "2-3 sentence description of the business",
+  "phone": "phone number",
+  "email": "email address",
+  "address_line1": "street address",
+  "city": "city",
+  "state": "state abbreviation",
+  "zip_code": "zip code",
+  "website": "${url}",
+  "business_hours": {"mon": {"open": "9:00", "close": "17:00"}, "tue": {"open": "9:00", "close": "17:00"}},
+  "subcategories": ["array of subcategories or services offered"]
+}`;
+
+  const res = await fetch('https://openrouter.ai/api/v1/chat/completions', {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      'Authorization': `Bearer ${openrouterKey}`,
+    },
+    body: JSON.stringify({
+      model: 'google/gemini-2.0-flash-001',
+      messages: [{ role: 'user', content: prompt }],
+      temperature: 0.1,
+      response_format: { type: 'json_object' },
+    }),
+  });
+
+  const data = await res.json();
+  const content = data.choices?.[0]?.message?.content || '{}';
+
+  // Parse JSON from response
+  try {
+    const cleaned = content.replace(/```json\n?/g, '').replace(/```\n?/g, '').trim();
+    return JSON.parse(cleaned);
+  } catch {
+    return { business_name: null, industry: 'general', description: null };
+  }
+}
+
+// Listing columns derived from a scrape; tier and publish/claim state are only set on insert
+function listingFields(normalizedUrl: string, input: ScrapeInput, extracted: any) {
+  const businessName = extracted.business_name || input.fallback_name || new URL(normalizedUrl).hostname.replace('www.', '').split('.')[0];
+  return {
+    business_name: businessName,
+    industry: extracted.industry || input.fallback_industry || 'general',
+    subcategories: extracted.subcategories || [],
+    description: extracted.description || null,
+    phone: extracted.phone || null,
+    email: extracted.email || null,
+    website: normalizedUrl,
+    address_line1: extracted.address_line1 || null,
+    city: extracted.city || input.fallback_city || null,
+    state: extracted.state || input.fallback_state || null,
+    zip_code: extracted.zip_code || null,
+    business_hours: extracted.business_hours || {},
+    ai_scraped_data: extracted,
+    ai_scraped_at: new Date().toISOString(),
+  };
+}
+
+async function loadScrapeCache(supabase: SupabaseClient, url: string): Promise<ScrapeCacheRow | null> {
+  const { data, error } = await supabase
+    .from('directory_scrape_cache')
+    .select('url, listing_id, etag, last_modified, content_hash, extracted, hits')
+    .eq('url', url)
+    .maybeSingle();
+  return error ? null : data;
+}
+
+// Scrape one website and create (or refresh) its directory listing
+export async function scrapeAndCreateListing(supabase: SupabaseClient, input: ScrapeInput): Promise<ScrapeOutcome> {
+  const normalizedUrl = normalizeScrapeUrl(input.url);
+  const timings: ScrapeTimings = { fetch_ms: 0, llm_ms: 0, db_ms: 0 };
+  const timed = async <T>(stage: keyof ScrapeTimings, work: PromiseLike<T>): Promise<T> => {
+    const started = Date.now();
+    try {
+      return await work;
+    } finally {
+      timings[stage] += Date.now() - started;
+    }
+  };
+
+  try {
+    // Step 1: Conditionally fetch the website against the last scrape
+    const cache = await timed('db_ms', loadScrapeCache(supabase, normalizedUrl));
+    const page = await timed('fetch_ms', fetchPage(normalizedUrl, cache ? { etag: cache.etag, lastModified: cache.last_modified } : undefined));
+    if (!page.notModified && !page.text && cache?.listing_id) {
+      return { status: 'error', url: normalizedUrl, error: 'Website fetch failed or returned no content', timings };
+    }
+    const hash = page.text ? contentHash(page.text) : null;
+    const now = new Date().toISOString();
+
+    let extracted: any = {};
+    let cacheResult: CacheResult = 'miss';
+    if (cache && page.notModified) {
+      cacheResult = 'not_modified';
+    } else if (cache && hash && hash === cache.content_hash) {
+      cacheResult = 'hash';
+    }
+
+    if (cacheResult !== 'miss') {
+      extracted = cache!.extracted || {};
+    } else if (page.text && page.text.length > 50) {
+      // Step 2: AI extraction
+      extracted = await timed('llm_ms', extractBusinessInfo(page.text, normalizedUrl));
+    }
+
+    // Unchanged page with a live listing: nothing to write but the cache bookkeeping
+    if (cacheResult !== 'miss' && cache!.listing_id) {
+      const { data: listing } = await timed('db_ms', supabase.from('directory_listings').select('*').eq('id', cache!.listing_id).maybeSingle());
+      if (listing) {
+        await timed('db_ms', supabase.from('directory_scrape_cache').update({
+          etag: page.etag, last_modified: page.lastModified, checked_at: now, hits: (cache!.hits || 0) + 1,
+        }).eq('url', normalizedUrl));
+        return { status: extracted.business_name ? 'ok' : 'fallback', url: normalizedUrl, listing, extracted, cache: cacheResult, action: 'unchanged', timings };
+      }
+    }
+
+    // Step 3: Update the listing from the last scrape, or create one
+    const fields = listingFields(normalizedUrl, input, extracted);
+    const query = cache?.listing_id
+      ? supabase.from('directory_listings').update(fields).eq('id', cache.listing_id)
+      : supabase.from('directory_listings').insert({ ...fields, tier: input.tier || 'free', is_published: true, is_claimed: false });
+    let { data: listing, error } = await timed('db_ms', query.select().maybeSingle());
+    let action: ScrapeOutcome['action'] = cache?.listing_id ? 'updated' : 'created';
+
+    if (!error && !listing && cache?.listing_id) {
+      // Cached listing was deleted since; create a fresh one
+      ({ data: listing, error } = await timed('db_ms', supabase
+        .from('directory_listings')
+        .insert({ ...fields, tier: input.tier || 'free', is_published: true, is_claimed: false })
+        .select()
+        .single()));
+      action = 'created';
+    }
+
+    if (error || !listing) {
+      return { status: 'error', url: normalizedUrl, error: error?.message || 'listing write failed', extracted, timings };
+    }
+
+    await timed('db_ms', supabase.from('directory_scrape_cache').upsert({
+      url: normalizedUrl,
+      listing_id: listing.id,
+      etag: page.etag,
+      last_modified: page.lastModified,
+      // A 304 keeps the hash the cached extraction was made from; anything else stores its own
+      content_hash: page.notModified ? cache?.content_hash ?? null : hash,
+      extracted,
+      fetched_at: page.notModified ? undefined : now,
+      checked_at: now,
+      hits: cacheResult === 'miss' ? cache?.hits || 0 : (cache?.hits || 0) + 1,
+    }, { onConflict: 'url' }));
+
+    return { status: extracted.business_name ? 'ok' : 'fallback', url: normalizedUrl, listing, extracted, cache: cacheResult, action, timings };
+  } catch (err: any) {
+    return { status: 'error', url: normalizedUrl, error: `Scrape failed: ${err.message}`, timings };
+  }
+}
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Image Service Benchmark
+Drives POST /api/generate-image at a target concurrency and reports throughput,
+p50/p95/p99 latency, memory high-water mark and provider call counts.
+
+Usage:
+    # Spawn a local service with the offline fake provider (no Gemini quota)
+    python bench_image_service.py --spawn --concurrency 16 --requests 200
+
+    # Against an already running service
+    python bench_image_service.py --url http://localhost:8002 --concurrency 8 --requests 50
+
+With --spawn the FAKE_IMAGE_* env vars (see image_providers.FakeProvider) shape
+the simulated provider, e.g. FAKE_IMAGE_LATENCY=lognormal:1500,0.6.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+SERVICES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "services")
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile (pct in 0-100)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[k]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def read_hwm_kb(pid):
+    """Peak resident set size of a local process (Linux /proc)"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def spawn_service(port, provider):
+    env = {**os.environ, "IMAGE_PROVIDER": provider}
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "image_service:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=SERVICES_DIR,
+        env=env,
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"image service exited with code {proc.returncode}")
+        try:
+            if httpx.get(f"{url}/health", timeout=1).status_code == 200:
+                return proc, url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("image service did not become healthy within 30s")
+
+
+async def run_benchmark(url, concurrency, total, count, prompt, timeout):
+    latencies = []
+    outcomes = {"ok": 0, "failed": 0, "http_error": 0, "transport_error": 0}
+    images_requested = images_returned = 0
+    queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(i)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits) as client:
+
+        async def worker():
+            nonlocal images_requested, images_returned
+            while True:
+                try:
+                    i = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                payload = {"prompt": f"{prompt} #{i}", "count": count}
+                start = time.perf_counter()
+                try:
+                    res = await client.post("/api/generate-image", json=payload)
+                except httpx.HTTPError:
+                    outcomes["transport_error"] += 1
+                    continue
+                latencies.append(time.perf_counter() - start)
+                images_requested += count
+                if res.status_code != 200:
+                    outcomes["http_error"] += 1
+                    continue
+                data = res.json()
+                images_returned += len(data.get("images", []))
+                outcomes["ok" if data.get("success") else "failed"] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    ms = [l * 1000 for l in latencies]
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "images_per_request": count,
+        "elapsed_s": round(elapsed, 3),
+        "outcomes": outcomes,
+        "images_requested": images_requested,
+        "images_returned": images_returned,
+        "throughput": {
+            "requests_per_s": round(total / elapsed, 2) if elapsed else None,
+            "images_per_s": round(images_returned / elapsed, 2) if elapsed else None,
+        },
+        "latency_ms": {
+            "p50": round(percentile(ms, 50), 1) if ms else None,
+            "p95": round(percentile(ms, 95), 1) if ms else None,
+            "p99": round(percentile(ms, 99), 1) if ms else None,
+            "max": round(max(ms), 1) if ms else None,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the image generation service")
+    parser.add_argument("--url", default="http://localhost:8002")
+    parser.add_argument("--spawn", action="store_true", help="start a local image_service on a free port")
+    parser.add_argument("--provider", default="fake", help="IMAGE_PROVIDER for --spawn (default: fake)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--count", type=int, default=3, help="images per request (1-5)")
+    parser.add_argument("--prompt", default="Modern HVAC technician servicing a home AC unit")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--output", help="write the JSON report to this path")
+    parser.add_argument("--fail-p95-ms", type=float, help="exit 1 if p95 latency exceeds this")
+    args = parser.parse_args()
+
+    proc = None
+    url = args.url
+    if args.spawn:
+        proc, url = spawn_service(free_port(), args.provider)
+
+    try:
+        before = httpx.get(f"{url}/health", timeout=10).json()
+        report = asyncio.run(run_benchmark(url, args.concurrency, args.requests, args.count, args.prompt, args.timeout))
+        after = httpx.get(f"{url}/health", timeout=10).json()
+    finally:
+        hwm = read_hwm_kb(proc.pid) if proc else None
+        if proc:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+    stats_before = before.get("provider_stats", {})
+    stats_after = after.get("provider_stats", {})
+    report["provider"] = after.get("provider")
+    report["provider_calls"] = {
+        k: stats_after.get(k, 0) - stats_before.get(k, 0) for k in ("calls", "images", "errors")
+    }
+    report["memory_high_water_kb"] = hwm or after.get("max_rss_kb")
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    p95 = report["latency_ms"]["p95"]
+    if args.fail_p95_ms and p95 is not None and p95 > args.fail_p95_ms:
+        print(f"FAIL: p95 {p95}ms > {args.fail_p95_ms}ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
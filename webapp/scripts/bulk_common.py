@@ -0,0 +1,100 @@
+"""
+Shared helpers for the directory bulk loading scripts:
+Supabase REST config, URL/domain normalization and CRM lead construction.
+
+Config comes from the environment (webapp/.env.local is loaded if present):
+  SUPABASE_URL / NEXT_PUBLIC_SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY,
+  GL365_API_BASE (Next.js origin), GL365_CRM_USER_ID,
+  CRON_SECRET (bearer token for script-facing API routes such as /api/directory/scrape/bulk)
+"""
+import os
+from datetime import datetime, timezone
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".env.local"))
+except ImportError:
+    pass
+
+SUPABASE_URL = os.getenv("SUPABASE_URL") or os.getenv("NEXT_PUBLIC_SUPABASE_URL", "https://rawlqwjdfzicjepzmcng.supabase.co")
+SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY", "")
+API_BASE = os.getenv("GL365_API_BASE", "http://localhost:3000")
+USER_ID = os.getenv("GL365_CRM_USER_ID", "677b536d-6521-4ac8-a0a5-98278b35f4cc")
+API_SECRET = os.getenv("CRON_SECRET", "")
+
+
+def rest_headers(prefer="return=representation"):
+    headers = {
+        "apikey": SUPABASE_KEY,
+        "Authorization": f"Bearer {SUPABASE_KEY}",
+        "Content-Type": "application/json",
+    }
+    if prefer:
+        headers["Prefer"] = prefer
+    return headers
+
+
+def api_headers():
+    """Headers for calling the Next.js API from scripts"""
+    return {"Authorization": f"Bearer {API_SECRET}"} if API_SECRET else {}
+
+
+def normalize_url(url):
+    url = (url or "").strip()
+    if url and not url.startswith("http"):
+        url = "https://" + url
+    return url
+
+
+def normalize_domain(url):
+    """'https://www.Example.com/path' -> 'example.com'"""
+    return (url or "").strip().lower().replace("https://", "").replace("http://", "").replace("www.", "").split("/")[0]
+
+
+def site_key(url):
+    """Domain plus path, so 'milb.com/dunedin' and 'milb.com/tampa' stay distinct"""
+    rest = (url or "").strip().lower().replace("https://", "").replace("http://", "").replace("www.", "")
+    domain, _, path = rest.partition("/")
+    path = path.split("?")[0].split("#")[0].strip("/")
+    return f"{domain}/{path}" if path else domain
+
+
+def now_iso():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def crm_lead_for(biz, listing=None, tags=(), now=None):
+    """
+    Build a crm_leads row for a scraped business. Email falls back to the
+    listing's AI-scraped email, then info@<domain>. Returns None without one.
+    """
+    listing = listing or {}
+    website = normalize_url(biz.get("url") or listing.get("website"))
+    ai = listing.get("ai_scraped_data")
+    ai = ai if isinstance(ai, dict) else {}
+
+    email = listing.get("email") or ai.get("email")
+    if not email:
+        domain = normalize_domain(website)
+        if domain and "." in domain:
+            email = f"info@{domain}"
+    if not email:
+        return None
+
+    city = listing.get("city") or ai.get("city") or biz.get("city") or ""
+    state = listing.get("state") or ai.get("state") or biz.get("state") or ""
+    now = now or now_iso()
+    return {
+        "email": email.lower().strip(),
+        "user_id": USER_ID,
+        "name": biz["name"],
+        "phone": listing.get("phone") or ai.get("phone"),
+        "company": biz["name"],
+        "source": "gl365_directory",
+        "status": "new",
+        "tags": [t for t in [biz.get("industry"), city, state, "directory_import", *tags] if t],
+        "notes": f"Industry: {biz.get('industry')} | Web: {website}",
+        "first_contact_at": now,
+        "created_at": now,
+        "updated_at": now,
+    }
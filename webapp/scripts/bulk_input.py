@@ -0,0 +1,138 @@
+"""
+Streaming input for the bulk loader.
+
+Businesses are read from CSV or JSONL files (optionally gzipped) one row at a
+time and pass through a generator pipeline, so memory stays flat no matter
+how large the file is:
+
+    read_rows -> clean_rows (validate + normalize) -> shard_rows
+
+Columns: name, industry, url, city, state (header names are case-insensitive;
+industry defaults to "general", city/state fall back to the loader's --city/--state).
+Sharding hashes the site key, so `--shard 0/4` .. `--shard 3/4` split one file
+across four workers and the same business always lands on the same worker.
+"""
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+import zlib
+
+from bulk_common import site_key
+
+REQUIRED = ("name", "url")
+FIELDS = ("name", "industry", "url", "city", "state")
+
+
+def _open_text(path):
+    if path == "-":
+        return io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8-sig")
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8-sig", newline="")
+    return open(path, encoding="utf-8-sig", newline="")
+
+
+def input_format(path):
+    base = path[:-3] if path.endswith(".gz") else path
+    ext = os.path.splitext(base)[1].lower()
+    if ext == ".csv":
+        return "csv"
+    if ext in (".jsonl", ".ndjson", ".json") or path == "-":
+        return "jsonl"
+    raise ValueError(f"Unsupported input format: {path} (expected .csv or .jsonl)")
+
+
+def read_rows(path):
+    """Yield (line_no, raw dict) from a CSV or JSONL file; malformed JSON lines yield (line_no, None)"""
+    fmt = input_format(path)
+    with _open_text(path) as f:
+        if fmt == "csv":
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+            return
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield line_no, row if isinstance(row, dict) else None
+
+
+def clean_row(row):
+    """Normalize one raw row into a business dict; returns (biz, error)"""
+    if row is None:
+        return None, "malformed row"
+    fields = {str(k).strip().lower(): v for k, v in row.items() if k is not None}
+    biz = {}
+    for field in FIELDS:
+        value = fields.get(field)
+        value = "" if value is None else " ".join(str(value).split())
+        if value:
+            biz[field] = value
+    missing = [f for f in REQUIRED if f not in biz]
+    if missing:
+        return None, f"missing {', '.join(missing)}"
+    biz["url"] = biz["url"].strip("/")
+    if "." not in site_key(biz["url"]).split("/")[0]:
+        return None, f"bad url {biz['url']!r}"
+    biz["industry"] = biz.get("industry", "general").lower()
+    if "state" in biz:
+        biz["state"] = biz["state"].upper()
+    return biz, None
+
+
+def clean_rows(rows, rejects=None):
+    """Yield valid businesses; invalid rows are counted in `rejects` (a list of (line_no, reason))"""
+    for line_no, row in rows:
+        biz, error = clean_row(row)
+        if error:
+            if rejects is not None:
+                rejects.append((line_no, error))
+            continue
+        yield biz
+
+
+def shard_of(biz, count):
+    return zlib.crc32(site_key(biz["url"]).encode()) % count
+
+
+def shard_rows(businesses, index=0, count=1):
+    if count <= 1:
+        yield from businesses
+        return
+    for biz in businesses:
+        if shard_of(biz, count) == index:
+            yield biz
+
+
+def parse_shard(value):
+    """'2/4' -> (2, 4)"""
+    try:
+        index, count = (int(p) for p in value.split("/"))
+    except ValueError:
+        raise ValueError(f"--shard expects INDEX/COUNT, got {value!r}")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"--shard index must be in 0..{count - 1}")
+    return index, count
+
+
+def read_domain_list(path):
+    """One domain per line; blank lines and # comments ignored"""
+    with open(path, encoding="utf-8") as f:
+        return [d for d in (line.split("#")[0].strip() for line in f) if d]
+
+
+def iter_businesses(path, shard=(0, 1), rejects=None):
+    return shard_rows(clean_rows(read_rows(path), rejects), *shard)
+
+
+def count_businesses(path, shard=(0, 1)):
+    """Businesses iter_businesses() will yield, from a first pass over the file (None for stdin)"""
+    if path == "-":
+        return None
+    return sum(1 for _ in iter_businesses(path, shard))
@@ -0,0 +1,661 @@
+#!/usr/bin/env python3
+"""
+GL365 Directory Bulk Loader (async)
+Scrapes business websites into directory listings via /api/directory/scrape
+with bounded concurrency, per-domain politeness and an adaptive request rate
+that backs off on 429/5xx. Optionally pushes each listing into the CRM through
+the same ignore-duplicates upsert as push_to_crm.py, so a lead that already
+exists is counted as existing rather than failed.
+
+Businesses are streamed from a CSV/JSONL file (see bulk_input.py) through a
+bounded queue, so a 100k-row file loads in constant memory. The historical
+Tampa batches live in data/bulk/ and are available as --batch presets.
+
+URLs are sent --batch-size at a time to /api/directory/scrape/bulk, which
+reuses one server-side client across the batch and streams each result back
+as an NDJSON line as soon as it finishes; --batch-size 0 falls back to one
+/api/directory/scrape request per business. Per-domain politeness holds in
+both modes: businesses are routed to batch workers by domain, the API spaces
+same-host fetches within a batch by --domain-interval, and a worker waits out
+that interval before its next batch touches the same host.
+
+Re-scrapes are cheap: the server keeps each site's ETag/Last-Modified and a
+hash of its page text, and answers an unchanged site from the previous
+extraction without rewriting the listing (reported as "unchanged"). --refresh
+re-checks sites already in the directory instead of skipping them as dupes.
+
+Per-stage timings (dedupe, scrape request, the site fetch / LLM / database
+time reported by the API, CRM push) are tracked by load_stats.py; a progress
+line with the rolling rate, ETA and error rate is printed every
+--progress-interval seconds and a JSON summary with p50/p95 per stage is
+written at the end (.bulk_journal/<input>.stats.json by default).
+
+Every outcome is checkpointed to a JSONL journal (.bulk_journal/<input>.jsonl
+by default); rerunning the same input skips businesses that already finished
+and retries only failures (or only the CRM push when that is what failed).
+
+Scrapes and CRM pushes that still fail after the in-run retries go to the
+dead-letter store (dead_letters.py) with their error class and a scheduled
+retry; retry_dead_letters.py drains it and reports domains that keep failing.
+
+Usage:
+    python bulk_loader.py --batch batch5 --crm --dedupe
+    python bulk_loader.py --input data/bulk/batch1_2.csv --tag batch_1_2 --concurrency 16 --rate 8
+    python bulk_loader.py --input orlando.jsonl.gz --city Orlando --state FL --shard 0/4
+    python bulk_loader.py --batch batch5 --crm --fresh   # ignore the previous journal
+    python bulk_loader.py --batch batch5 --refresh --fresh   # re-check every site for changes
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+import zlib
+
+import httpx
+
+from bulk_common import (
+    API_BASE,
+    SUPABASE_URL,
+    api_headers,
+    crm_lead_for,
+    normalize_domain,
+    normalize_url,
+    rest_headers,
+    site_key,
+)
+from bulk_input import count_businesses, iter_businesses, parse_shard, read_domain_list
+from dead_letters import DEFAULT_PATH as DEFAULT_DEAD_LETTERS_PATH, DeadLetters, http_error_class
+from directory_index import DEFAULT_PATH as DEFAULT_INDEX_PATH, DirectoryIndex, async_rest_getter, name_city_key
+from load_stats import LoadStats
+from push_to_crm import LeadUpserter
+from scrape_journal import ScrapeJournal, listing_snapshot
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+JOURNAL_DIR = os.path.join(SCRIPTS_DIR, ".bulk_journal")
+DATA_DIR = os.path.join(SCRIPTS_DIR, "data", "bulk")
+
+# Presets for the batches that used to be hardcoded in bulk_scrape*.py
+BATCHES = {
+    "batch1_2": {"input": "batch1_2.csv", "tag": "batch_1_2"},
+    "batch3_4": {"input": "batch3_4.csv", "tag": "batch_3_4", "crm": True},
+    "batch5": {"input": "batch5.csv", "tag": "batch_5_ybor", "crm": True, "dedupe": True,
+               "skip_file": "batch5_known_dupes.txt"},
+}
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class AdaptiveRateLimiter:
+    """
+    Spaces request starts at `rate` per second. Additive increase on success,
+    multiplicative decrease on 429/5xx (honouring Retry-After when given).
+    """
+
+    def __init__(self, rate=4.0, min_rate=0.25, max_rate=20.0, increase=0.1):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self._next_slot = 0.0
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot, self._paused_until)
+            self._next_slot = slot + 1.0 / self.rate
+        delay = slot - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def on_success(self):
+        self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self, retry_after=None):
+        self.rate = max(self.min_rate, self.rate / 2)
+        if retry_after:
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+
+
+class DomainPoliteness:
+    """At most one in-flight request per target domain, `interval` seconds apart"""
+
+    def __init__(self, interval=2.0):
+        self.interval = interval
+        self._locks = {}
+        self._last = {}
+
+    async def __call__(self, domain, coro_fn):
+        lock = self._locks.setdefault(domain, asyncio.Lock())
+        async with lock:
+            wait = self._last.get(domain, 0.0) + self.interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                return await coro_fn()
+            finally:
+                self._last[domain] = time.monotonic()
+
+    async def wait_batch(self, domains):
+        """
+        Batch mode: wait until `interval` has passed since the last batch touching any
+        of `domains`. The scrape API spaces same-host fetches within a batch, and each
+        domain is owned by one batch worker, so batches never overlap on a host.
+        """
+        now = time.monotonic()
+        wait = max((self._last.get(d, 0.0) + self.interval - now for d in domains), default=0.0)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def batch_done(self, domains):
+        now = time.monotonic()
+        for domain in domains:
+            self._last[domain] = now
+
+
+def retry_after_seconds(response):
+    value = response.headers.get("retry-after")
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+async def sync_directory_index(client, opts):
+    """Bring the local directory index up to date; returns it (None without --dedupe)"""
+    if not opts.dedupe:
+        return None
+    index = DirectoryIndex(opts.index)
+    if opts.rebuild_index:
+        index.rebuild()
+    sources = ("directory_listings", "crm_leads") if opts.crm else ("directory_listings",)
+    pulled = await index.sync_async(async_rest_getter(client), sources)
+    print(f"Directory index synced ({pulled} changed rows): {index.counts()}")
+    return index
+
+
+class BulkLoader:
+    def __init__(self, client, opts, journal=None, known_emails=(), dead_letters=None, stats=None):
+        self.client = client
+        self.opts = opts
+        self.journal = journal
+        self.dead_letters = dead_letters
+        self.stats = stats or LoadStats()
+        self.known_emails = set(known_emails)
+        self.limiter = AdaptiveRateLimiter(rate=opts.rate, max_rate=opts.max_rate)
+        self.politeness = DomainPoliteness(interval=opts.domain_interval)
+
+    def _scrape_payload(self, biz):
+        return {
+            "url": normalize_url(biz["url"]),
+            "fallback_name": biz["name"],
+            "fallback_industry": biz["industry"],
+            "fallback_city": biz.get("city") or self.opts.city,
+            "fallback_state": biz.get("state") or self.opts.state,
+            "tier": "free",
+        }
+
+    async def _post_scrape(self, biz):
+        payload = self._scrape_payload(biz)
+        for attempt in range(1, self.opts.retries + 2):
+            await self.limiter.acquire()
+            try:
+                with self.stats.timer("scrape_http"):
+                    res = await self.client.post(f"{self.opts.api_base}/api/directory/scrape", json=payload)
+            except httpx.TransportError:
+                self.limiter.on_throttle()
+                if attempt > self.opts.retries:
+                    raise
+                await asyncio.sleep(random.uniform(0, 2 ** attempt))
+                continue
+
+            if res.status_code in RETRYABLE_STATUS and attempt <= self.opts.retries:
+                self.limiter.on_throttle(retry_after_seconds(res))
+                await asyncio.sleep(random.uniform(0, 2 ** attempt))
+                continue
+
+            if res.status_code in RETRYABLE_STATUS:
+                self.limiter.on_throttle(retry_after_seconds(res))
+            else:
+                self.limiter.on_success()
+            return res
+
+    async def push_crm(self, biz, listing):
+        biz = {**biz, "city": biz.get("city") or self.opts.city, "state": biz.get("state") or self.opts.state}
+        lead = crm_lead_for(biz, listing, tags=[self.opts.tag] if self.opts.tag else ())
+        if not lead:
+            return False
+        if lead["email"] in self.known_emails:
+            return "exists"
+        # ignore-duplicates upsert: a lead that already exists comes back as "existing", not a 409.
+        # One upserter per push, since two businesses on a domain can push the same email at once.
+        upserter = LeadUpserter(self.client, concurrency=1)
+        with self.stats.timer("crm"):
+            await upserter.upsert([lead])
+        email = lead["email"]
+        outcome, error = upserter.outcomes[email]
+        if outcome == "error":
+            self._dead_letter("crm", email, lead, upserter.error_classes.get(email, "upsert_failed"), error,
+                              normalize_domain(biz["url"]))
+            return False
+        self._resolve("crm", email)
+        return "exists" if outcome == "existing" else True
+
+    def _checkpoint(self, key, event, status, **fields):
+        if self.journal:
+            self.journal.record(key, event, status, **fields)
+
+    def _dead_letter(self, kind, key, payload, error_class, error, domain):
+        if self.dead_letters:
+            self.dead_letters.add(kind, key, payload, error_class, error, domain=domain)
+
+    def _resolve(self, kind, key):
+        if self.dead_letters:
+            self.dead_letters.resolve(kind, key)
+
+    def _retry_payload(self, biz):
+        """Input row as the dead-letter retry worker needs it to re-run this scrape"""
+        return {**biz, "city": biz.get("city") or self.opts.city, "state": biz.get("state") or self.opts.state,
+                "tag": self.opts.tag, "crm": bool(self.opts.crm)}
+
+    async def scrape(self, biz):
+        """Scrape one business; returns (result, listing)"""
+        try:
+            res = await self.politeness(normalize_domain(biz["url"]), lambda: self._post_scrape(biz))
+            data = res.json()
+        except Exception as e:
+            return {"status": "error", "name": biz["name"], "error": str(e)[:80], "error_class": type(e).__name__}, None
+
+        self.stats.add_api_timings(data.get("timings"))
+        listing = data.get("listing")
+        if data.get("success") and listing:
+            result = {"status": "ok", "name": listing.get("business_name") or biz["name"], "id": listing.get("id")}
+        elif listing:
+            result = {"status": "fallback", "name": biz["name"], "id": listing.get("id")}
+        else:
+            return {"status": "error", "name": biz["name"], "error": str(data.get("error", res.status_code))[:80],
+                    "error_class": http_error_class(res.status_code)}, None
+        if data.get("action") == "unchanged":
+            result["unchanged"] = True
+        return result, listing
+
+    async def scrape_batch(self, bizs):
+        """
+        Scrape a batch through /api/directory/scrape/bulk, yielding
+        (biz, result, listing) per business as the NDJSON results stream in.
+        A failed or cut-off request is retried for the businesses still pending.
+        """
+        pending = list(bizs)
+        last_error, last_class = "no result in batch stream", "missing_result"
+        for attempt in range(1, self.opts.retries + 2):
+            order, received, retryable = pending, set(), True
+            payload = {"items": [self._scrape_payload(b) for b in order], "tier": "free",
+                       "concurrency": self.opts.server_concurrency, "domain_interval": self.opts.domain_interval}
+            domains = {normalize_domain(b["url"]) for b in order}
+            await self.politeness.wait_batch(domains)
+            await self.limiter.acquire()
+            # Request time, less the time the consumer held us suspended at a yield
+            started, suspended = self.stats.clock(), 0.0
+            try:
+                async with self.client.stream(
+                    "POST", f"{self.opts.api_base}/api/directory/scrape/bulk", json=payload,
+                    headers={"Accept": "application/x-ndjson", **api_headers()},
+                ) as res:
+                    if res.status_code != 200:
+                        body = (await res.aread()).decode(errors="replace")
+                        last_error, last_class = f"{res.status_code}: {body[:60]}", http_error_class(res.status_code)
+                        retryable = res.status_code in RETRYABLE_STATUS
+                        if retryable:
+                            self.limiter.on_throttle(retry_after_seconds(res))
+                    else:
+                        self.limiter.on_success()
+                        async for line in res.aiter_lines():
+                            if not line.strip():
+                                continue
+                            msg = json.loads(line)
+                            if msg.get("type") != "result" or msg.get("index") in received:
+                                continue
+                            received.add(msg["index"])
+                            biz = order[msg["index"]]
+                            self.stats.add_api_timings(msg.get("timings"))
+                            result = self._batch_result(biz, msg)
+                            paused = self.stats.clock()
+                            yield (biz, *result)
+                            suspended += self.stats.clock() - paused
+            except (httpx.TransportError, ValueError) as e:
+                self.limiter.on_throttle()
+                last_error, last_class = str(e)[:80], type(e).__name__
+            finally:
+                self.stats.add("scrape_http", self.stats.clock() - started - suspended)
+                self.politeness.batch_done(domains)
+
+            pending = [biz for i, biz in enumerate(order) if i not in received]
+            if not pending or not retryable or attempt > self.opts.retries:
+                break
+            await asyncio.sleep(random.uniform(0, 2 ** attempt))
+
+        for biz in pending:
+            yield biz, {"status": "error", "name": biz["name"], "error": last_error, "error_class": last_class}, None
+
+    def _batch_result(self, biz, msg):
+        listing = msg.get("listing")
+        status = msg.get("status")
+        if status in ("ok", "fallback") and listing:
+            name = listing.get("business_name") if status == "ok" else None
+            result = {"status": status, "name": name or biz["name"], "id": listing.get("id")}
+            if msg.get("action") == "unchanged":
+                result["unchanged"] = True  # page matched the last scrape; listing left as is
+            return result, listing
+        return {"status": "error", "name": biz["name"], "error": str(msg.get("error") or "scrape failed")[:80],
+                "error_class": "scrape_failed"}, None
+
+    def _resumed(self, biz):
+        """Result for a business scraped in an earlier run, or None"""
+        key = site_key(biz["url"])
+        if not (self.journal and self.journal.scrape_done(key)):
+            return None, None
+        prior = self.journal.scrape_record(key)
+        listing = prior.get("listing")
+        result = {"status": prior["status"], "id": (listing or {}).get("id"),
+                  "name": (listing or {}).get("business_name") or biz["name"], "resumed": True}
+        return result, listing
+
+    async def process(self, biz):
+        result, listing = self._resumed(biz)
+        if result is None:
+            result, listing = await self.scrape(biz)
+            result = self._record_scrape(biz, result, listing)
+        return await self.finish(biz, result, listing)
+
+    async def process_batch(self, bizs):
+        """Like process() for a batch; yields each result as soon as it is ready"""
+        fresh = []
+        for biz in bizs:
+            result, listing = self._resumed(biz)
+            if result is None:
+                fresh.append(biz)
+            else:
+                yield await self.finish(biz, result, listing)
+        if fresh:
+            async for biz, result, listing in self.scrape_batch(fresh):
+                yield await self.finish(biz, self._record_scrape(biz, result, listing), listing)
+
+    def _record_scrape(self, biz, result, listing):
+        self._checkpoint(site_key(biz["url"]), "scrape", result["status"], name=biz["name"],
+                         listing=listing_snapshot(listing), error=result.get("error"))
+        return result
+
+    async def finish(self, biz, result, listing):
+        """CRM push (with --crm) for a scraped business; failures go to the dead-letter store"""
+        key = site_key(biz["url"])
+        if result["status"] == "error":
+            self._dead_letter("scrape", key, self._retry_payload(biz), result.get("error_class", "scrape_failed"),
+                              result.get("error"), normalize_domain(biz["url"]))
+            return result
+        self._resolve("scrape", key)
+        if self.opts.crm:
+            result["crm"] = await self.push_crm(biz, listing)
+            self._checkpoint(key, "crm", "pushed" if result["crm"] else "failed")
+        return result
+
+
+def report_line(i, total, result):
+    progress = f"{i}/{total}" if total else str(i)
+    icon = {"ok": "+", "fallback": "~"}.get(result["status"], "X")
+    crm = ""
+    if "crm" in result:
+        crm = {"exists": " [CRM=]", True: " [CRM+]"}.get(result["crm"], " [CRM-]")
+    resumed = " (resumed)" if result.get("resumed") else ""
+    unchanged = " (unchanged)" if result.get("unchanged") else ""
+    line = f"[{progress}] {icon} {result['name']}{crm}{resumed}{unchanged}"
+    if result["status"] == "error":
+        line += f"\n    ERROR: {result.get('error', '')}"
+    return line
+
+
+def journal_name(opts):
+    """Input file stem, plus the shard so parallel workers never share a journal"""
+    name = opts.batch or os.path.basename(opts.input).split(".")[0] or "stdin"
+    index, count = opts.shard
+    return f"{name}.shard{index}of{count}" if count > 1 else name
+
+
+def open_journal(opts):
+    if opts.no_journal:
+        return None
+    path = opts.journal or os.path.join(JOURNAL_DIR, f"{journal_name(opts)}.jsonl")
+    if opts.fresh and os.path.exists(path):
+        os.replace(path, f"{path}.{int(time.time())}.bak")
+    journal = ScrapeJournal(path)
+    if journal.replayed:
+        print(f"Resuming from {path}: {journal.summary()}")
+    return journal
+
+
+def stats_path(opts):
+    return opts.stats_json or os.path.join(JOURNAL_DIR, f"{journal_name(opts)}.stats.json")
+
+
+def open_dead_letters(opts):
+    return None if opts.no_dead_letters else DeadLetters(opts.dead_letters)
+
+
+async def run(items, opts, transport=None, dead_letters=None, total=None):
+    """
+    Load `items`; failures go to `dead_letters` (default: the store named by opts).
+    `total` is the number of items when they are streamed (len(items) otherwise),
+    for the progress count and ETA.
+    """
+    journal = open_journal(opts)
+    owned = dead_letters is None
+    if owned:
+        dead_letters = open_dead_letters(opts)
+    try:
+        return await _run(items, opts, journal, transport, dead_letters, total)
+    finally:
+        if journal:
+            journal.close()
+        if owned and dead_letters:
+            dead_letters.close()
+
+
+async def _run(items, opts, journal, transport, dead_letters, total=None):
+    limits = httpx.Limits(max_connections=opts.concurrency * 2, max_keepalive_connections=opts.concurrency * 2)
+    async with httpx.AsyncClient(timeout=opts.timeout, limits=limits, transport=transport) as client:
+        skip_domains = {normalize_domain(d) for d in opts.skip_domains}
+        seen, name_cities, emails = set(), set(), set()
+        index = await sync_directory_index(client, opts)
+        if index:
+            # Plain sets from here on: constant-time checks per streamed row
+            if not opts.refresh:
+                seen, name_cities = index.site_keys(), index.name_city_keys()
+            emails = index.emails() if opts.crm else set()
+            index.close()
+
+        if total is None and hasattr(items, "__len__"):
+            total = len(items)
+        stats = LoadStats(total=total)
+        loader = BulkLoader(client, opts, journal, known_emails=emails, dead_letters=dead_letters, stats=stats)
+        counts = {"ok": 0, "fallback": 0, "error": 0}
+        skipped = resumed = done = unchanged = 0
+        last_progress = time.monotonic()
+        if opts.batch_size:
+            # One queue per batch worker, by domain: a host only ever appears in one worker's batches
+            queues = [asyncio.Queue(maxsize=max(4, 2 * opts.batch_size)) for _ in range(opts.concurrency)]
+        else:
+            queues = [asyncio.Queue(maxsize=opts.concurrency * 4)]
+
+        def queue_for(biz):
+            return queues[zlib.crc32(normalize_domain(biz["url"]).encode()) % len(queues)]
+
+        async def produce():
+            try:
+                for biz in items:
+                    with stats.timer("dedupe"):
+                        action = classify(biz)
+                    if action == "work":
+                        await queue_for(biz).put(biz)
+            finally:
+                for i in range(opts.concurrency):
+                    await queues[i % len(queues)].put(None)
+
+        def drop_from_total():
+            # Only scraped businesses are reported, so the ETA counts down what is left to scrape
+            if stats.total:
+                stats.total -= 1
+
+        def classify(biz):
+            """'work', 'resumed' or 'skipped' for one input row"""
+            nonlocal skipped, resumed
+            key = site_key(biz["url"])
+            if journal and journal.completed(key, crm=opts.crm):
+                resumed += 1
+                seen.add(key)
+                drop_from_total()
+                return "resumed"
+            if journal and journal.scrape_done(key):
+                seen.add(key)  # our own listing from an earlier run; CRM push still pending
+                return "work"
+            name_city = name_city_key(biz["name"], biz.get("city") or opts.city)
+            if key in seen or name_city in name_cities or normalize_domain(biz["url"]) in skip_domains:
+                print(f"  SKIP DUPE: {biz['name']} ({key})")
+                skipped += 1
+                drop_from_total()
+                return "skipped"
+            seen.add(key)  # prevent intra-batch dupes
+            if opts.dedupe and name_city:
+                name_cities.add(name_city)
+            return "work"
+
+        def report(result):
+            nonlocal done, unchanged, last_progress
+            done += 1
+            counts[result["status"]] += 1
+            unchanged += bool(result.get("unchanged"))
+            stats.finish(result)
+            print(report_line(done, stats.total, result))
+            if time.monotonic() - last_progress >= opts.progress_interval:
+                last_progress = time.monotonic()
+                print(stats.progress_line())
+
+        async def worker(work):
+            while True:
+                biz = await work.get()
+                if biz is None:
+                    return
+                report(await loader.process(biz))
+
+        async def batch_worker(work):
+            stop = False
+            while not stop:
+                batch = []
+                biz = await work.get()
+                while biz is not None:
+                    batch.append(biz)
+                    if len(batch) >= opts.batch_size:
+                        break
+                    try:
+                        biz = work.get_nowait()
+                    except asyncio.QueueEmpty:
+                        break
+                stop = biz is None
+                if batch:
+                    async for result in loader.process_batch(batch):
+                        report(result)
+
+        print(f"\nProcessing {'%d businesses' % total if total is not None else 'input stream'} "
+              f"with concurrency {opts.concurrency}...")
+        print("=" * 60)
+        started = time.monotonic()
+        workers = [batch_worker(queues[i]) if opts.batch_size else worker(queues[0]) for i in range(opts.concurrency)]
+        await asyncio.gather(produce(), *workers)
+        elapsed = time.monotonic() - started
+
+    print("=" * 60)
+    print(f"Done in {elapsed:.1f}s! {counts['ok'] + counts['fallback']} loaded "
+          f"({counts['fallback']} fallback, {unchanged} unchanged), {counts['error']} failed, {skipped} duplicates skipped, "
+          f"{resumed} already done "
+          f"(final rate {loader.limiter.rate:.2f} req/s)")
+    print(stats.stage_table())
+    if stats.bottleneck():
+        print(f"Most time spent in: {stats.bottleneck()}")
+    if not opts.no_stats:
+        path = stats_path(opts)
+        stats.write_json(path, skipped=skipped, resumed=resumed, unchanged=unchanged,
+                         options={"concurrency": opts.concurrency, "batch_size": opts.batch_size,
+                                  "server_concurrency": opts.server_concurrency,
+                                  "final_rate": round(loader.limiter.rate, 3)})
+        print(f"Stats written to {path}")
+    if dead_letters and counts["error"]:
+        print(f"Failures recorded in {dead_letters.path}; retry with retry_dead_letters.py")
+    return counts
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Async bulk loader for GL365 directory listings")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input", help="CSV or JSONL file of businesses (.gz ok, '-' for JSONL on stdin)")
+    source.add_argument("--batch", choices=sorted(BATCHES), help="preset for one of the historical Tampa batches")
+    parser.add_argument("--shard", type=parse_shard, default=(0, 1), metavar="INDEX/COUNT",
+                        help="only load this worker's share of the input, e.g. 0/4")
+    parser.add_argument("--api-base", default=API_BASE)
+    parser.add_argument("--concurrency", type=int, default=8, help="scrape requests (or batches) in flight")
+    parser.add_argument("--batch-size", type=int, default=25,
+                        help="businesses per /api/directory/scrape/bulk request (0: one request per business)")
+    parser.add_argument("--server-concurrency", type=int, default=4, help="URLs the server scrapes at once per batch")
+    parser.add_argument("--rate", type=float, default=4.0, help="initial scrape requests/second")
+    parser.add_argument("--max-rate", type=float, default=20.0)
+    parser.add_argument("--domain-interval", type=float, default=2.0, help="min seconds between hits on one domain")
+    parser.add_argument("--retries", type=int, default=3, help="retries on 429/5xx/transport errors")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--city", default="", help="fallback city for rows without one")
+    parser.add_argument("--state", default="", help="fallback state for rows without one")
+    parser.add_argument("--tag", help="extra CRM tag (default: batch preset)")
+    parser.add_argument("--skip-file", help="file of domains to skip, one per line")
+    parser.add_argument("--crm", action="store_true", help="push each listing into crm_leads")
+    parser.add_argument("--dedupe", action="store_true",
+                        help="skip sites / name+city pairs already in directory_listings (and known CRM emails with --crm)")
+    parser.add_argument("--refresh", action="store_true",
+                        help="with --dedupe: re-check sites already in the directory instead of skipping them")
+    parser.add_argument("--index", default=DEFAULT_INDEX_PATH, help="local directory index (SQLite)")
+    parser.add_argument("--rebuild-index", action="store_true", help="drop the local index and resync from scratch")
+    parser.add_argument("--journal", help="checkpoint journal path (default .bulk_journal/<input>.jsonl)")
+    parser.add_argument("--no-journal", action="store_true", help="don't checkpoint or resume")
+    parser.add_argument("--fresh", action="store_true", help="set the previous journal aside and start over")
+    parser.add_argument("--progress-interval", type=float, default=10.0,
+                        help="seconds between throughput / ETA lines")
+    parser.add_argument("--stats-json", help="JSON timing summary path (default .bulk_journal/<input>.stats.json)")
+    parser.add_argument("--no-stats", action="store_true", help="don't write the JSON timing summary")
+    parser.add_argument("--dead-letters", default=DEFAULT_DEAD_LETTERS_PATH, help="dead-letter store for failures (SQLite)")
+    parser.add_argument("--no-dead-letters", action="store_true", help="don't record failures for later retry")
+    opts = parser.parse_args(argv)
+
+    if opts.batch:
+        preset = BATCHES[opts.batch]
+        opts.input = os.path.join(DATA_DIR, preset["input"])
+        opts.tag = opts.tag or preset["tag"]
+        opts.crm = opts.crm or preset.get("crm", False)
+        opts.dedupe = opts.dedupe or preset.get("dedupe", False)
+        if preset.get("skip_file") and not opts.skip_file:
+            opts.skip_file = os.path.join(DATA_DIR, preset["skip_file"])
+    opts.skip_domains = read_domain_list(opts.skip_file) if opts.skip_file else []
+    return opts
+
+
+def main(argv=None):
+    opts = parse_args(argv)
+    rejects = []
+    total = count_businesses(opts.input, opts.shard)
+    counts = asyncio.run(run(iter_businesses(opts.input, opts.shard, rejects), opts, total=total))
+    if rejects:
+        print(f"{len(rejects)} invalid rows skipped:")
+        for line_no, reason in rejects[:20]:
+            print(f"  line {line_no}: {reason}")
+    return counts
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Durable dead-letter store for failed scrape and CRM operations.
+
+bulk_loader.py and push_to_crm.py record every operation that failed for
+good in their run (after in-run retries) instead of only printing it:
+
+    kind   'scrape' (payload: the input row) or 'crm' (payload: the crm_leads row)
+    key    site key / lead email, one entry per (kind, key)
+
+Each failure bumps the entry's attempt count and schedules its next retry
+with exponential backoff (BASE_DELAY * 2**(attempts-1), capped at
+MAX_DELAY); after MAX_ATTEMPTS it is abandoned. A later success resolves it.
+retry_dead_letters.py drains the entries that are due and reports the
+domains that keep failing.
+
+    dlq = DeadLetters()
+    dlq.add("scrape", "alpha.com", biz, "ReadTimeout", "timed out", domain="alpha.com")
+    dlq.due("scrape"), dlq.resolve("scrape", "alpha.com"), dlq.domain_report()
+"""
+import json
+import os
+import sqlite3
+import time
+
+DEFAULT_PATH = os.getenv("GL365_DEAD_LETTERS") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), ".cache", "dead_letters.sqlite3")
+BASE_DELAY = 300.0  # seconds before the first retry
+MAX_DELAY = 24 * 3600.0
+MAX_ATTEMPTS = 8
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dead_letters (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    domain TEXT,
+    payload TEXT NOT NULL,
+    error_class TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    first_failed_at REAL,
+    last_failed_at REAL,
+    next_retry_at REAL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    PRIMARY KEY (kind, key)
+);
+CREATE INDEX IF NOT EXISTS idx_dead_letters_due ON dead_letters(status, next_retry_at);
+CREATE INDEX IF NOT EXISTS idx_dead_letters_domain ON dead_letters(domain);
+"""
+
+
+def backoff(attempts):
+    """Seconds to wait before retrying an operation that has failed `attempts` times"""
+    return min(BASE_DELAY * 2 ** max(attempts - 1, 0), MAX_DELAY)
+
+
+def http_error_class(status_code):
+    """'http_429', 'http_503', ... for a failed response"""
+    return f"http_{status_code}"
+
+
+class DeadLetters:
+    def __init__(self, path=DEFAULT_PATH, max_attempts=MAX_ATTEMPTS):
+        self.path = path
+        self.max_attempts = max_attempts
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(SCHEMA)
+
+    def add(self, kind, key, payload, error_class, error=None, domain=None, now=None):
+        """Record a failure; returns the entry's status ('pending' or 'abandoned')"""
+        now = time.time() if now is None else now
+        row = self.db.execute("SELECT attempts, status FROM dead_letters WHERE kind = ? AND key = ?",
+                              (kind, key)).fetchone()
+        # A resolved entry failing again starts a fresh backoff
+        attempts = (row["attempts"] if row and row["status"] != "resolved" else 0) + 1
+        status = "abandoned" if attempts >= self.max_attempts else "pending"
+        with self.db:
+            self.db.execute(
+                """INSERT INTO dead_letters (kind, key, domain, payload, error_class, error, attempts,
+                                             first_failed_at, last_failed_at, next_retry_at, status)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (kind, key) DO UPDATE SET
+                       domain = excluded.domain, payload = excluded.payload,
+                       error_class = excluded.error_class, error = excluded.error,
+                       attempts = excluded.attempts, last_failed_at = excluded.last_failed_at,
+                       next_retry_at = excluded.next_retry_at, status = excluded.status,
+                       first_failed_at = CASE WHEN dead_letters.status = 'resolved'
+                                              THEN excluded.first_failed_at ELSE dead_letters.first_failed_at END""",
+                (kind, key, domain, json.dumps(payload), error_class, (error or "")[:500], attempts,
+                 now, now, now + backoff(attempts), status))
+        return status
+
+    def resolve(self, kind, key):
+        """Mark an entry as succeeded; a no-op for keys that never failed"""
+        with self.db:
+            self.db.execute("UPDATE dead_letters SET status = 'resolved', next_retry_at = NULL "
+                            "WHERE kind = ? AND key = ? AND status != 'resolved'", (kind, key))
+
+    def due(self, kind=None, now=None, limit=None):
+        """Pending entries whose next retry time has come, oldest first"""
+        now = time.time() if now is None else now
+        sql = "SELECT * FROM dead_letters WHERE status = 'pending' AND next_retry_at <= ?"
+        args = [now]
+        if kind:
+            sql += " AND kind = ?"
+            args.append(kind)
+        sql += " ORDER BY next_retry_at"
+        if limit:
+            sql += " LIMIT ?"
+            args.append(limit)
+        return [self._entry(row) for row in self.db.execute(sql, args)]
+
+    def next_due_at(self):
+        """Earliest next_retry_at among pending entries, or None"""
+        return self.db.execute("SELECT MIN(next_retry_at) FROM dead_letters WHERE status = 'pending'").fetchone()[0]
+
+    def get(self, kind, key):
+        row = self.db.execute("SELECT * FROM dead_letters WHERE kind = ? AND key = ?", (kind, key)).fetchone()
+        return self._entry(row) if row else None
+
+    def _entry(self, row):
+        entry = dict(row)
+        entry["payload"] = json.loads(entry["payload"])
+        return entry
+
+    def counts(self):
+        """{status: n} over all entries"""
+        return dict(self.db.execute("SELECT status, COUNT(*) FROM dead_letters GROUP BY status").fetchall())
+
+    def domain_report(self, min_failures=2):
+        """
+        Domains with at least `min_failures` unresolved entries or attempts,
+        worst first: [{domain, entries, attempts, abandoned, error_classes}]
+        """
+        rows = self.db.execute(
+            """SELECT domain, COUNT(*) AS entries, SUM(attempts) AS attempts,
+                      SUM(status = 'abandoned') AS abandoned, GROUP_CONCAT(DISTINCT error_class) AS error_classes
+               FROM dead_letters
+               WHERE status != 'resolved' AND domain IS NOT NULL
+               GROUP BY domain
+               HAVING SUM(attempts) >= ?
+               ORDER BY abandoned DESC, attempts DESC, domain""", (min_failures,)).fetchall()
+        return [{**dict(row), "error_classes": sorted((row["error_classes"] or "").split(","))} for row in rows]
+
+    def close(self):
+        self.db.close()
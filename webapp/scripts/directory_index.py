@@ -0,0 +1,236 @@
+"""
+Local SQLite index of what is already in Supabase, for duplicate detection
+in the bulk loading scripts.
+
+Tracks directory listings (site key, domain, normalized name+city) and CRM
+lead emails. Each sync pulls only rows changed since the last one, using an
+(updated_at, id) watermark and keyset pagination, so the first sync pages
+through everything once and later syncs cost a request or two.
+
+Rows deleted in Supabase are not seen by an incremental sync; use
+rebuild() (bulk_loader.py --rebuild-index) to start over.
+
+    index = DirectoryIndex()
+    index.sync(rest_getter(requests.Session()))            # or: await index.sync_async(async_rest_getter(client))
+    index.has_site("https://www.alpha.com/"), index.has_name_city("Alpha Plumbing LLC", "Tampa")
+"""
+import os
+import re
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+from bulk_common import SUPABASE_URL, normalize_domain, rest_headers, site_key
+
+DEFAULT_PATH = os.getenv("GL365_DIRECTORY_INDEX") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), ".cache", "directory_index.sqlite3")
+PAGE_SIZE = 1000
+# Re-read this far behind the watermark; catches rows whose transaction
+# committed after a later updated_at was already synced
+LOOKBACK = timedelta(minutes=5)
+
+_NAME_NOISE = {"the", "llc", "inc", "co", "company", "corp", "ltd", "and"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS listings (
+    id TEXT PRIMARY KEY,
+    site_key TEXT,
+    domain TEXT,
+    name_city TEXT,
+    updated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_listings_site_key ON listings(site_key);
+CREATE INDEX IF NOT EXISTS idx_listings_name_city ON listings(name_city);
+CREATE TABLE IF NOT EXISTS leads (
+    id TEXT PRIMARY KEY,
+    email TEXT,
+    updated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_leads_email ON leads(email);
+CREATE TABLE IF NOT EXISTS watermarks (
+    source TEXT PRIMARY KEY,
+    updated_at TEXT,
+    id TEXT,
+    synced_at REAL
+);
+"""
+
+
+def name_city_key(name, city):
+    """'The Alpha Plumbing, LLC' + 'Tampa' -> 'alpha plumbing|tampa'"""
+    words = [w for w in re.sub(r"[^a-z0-9]+", " ", (name or "").lower()).split() if w not in _NAME_NOISE]
+    if not words:
+        return None
+    return f"{' '.join(words)}|{' '.join((city or '').lower().split())}"
+
+
+def _listing_row(r):
+    website = r.get("website") or ""
+    return (r["id"], site_key(website) or None, normalize_domain(website) or None,
+            name_city_key(r.get("business_name"), r.get("city")), r.get("updated_at"))
+
+
+def _lead_row(r):
+    email = (r.get("email") or "").strip().lower() or None
+    return (r["id"], email, r.get("updated_at"))
+
+
+# Supabase table -> (columns to select, local table, row mapper)
+SOURCES = {
+    "directory_listings": ("id,website,business_name,city,updated_at", "listings", _listing_row),
+    "crm_leads": ("id,email,updated_at", "leads", _lead_row),
+}
+
+
+def _quote(value):
+    return '"' + str(value).replace('"', '\\"') + '"'
+
+
+def keyset_params(select, updated_at=None, last_id=None, limit=None):
+    """PostgREST params for the page after (updated_at, last_id) in (updated_at, id) order"""
+    params = {"select": select, "order": "updated_at.asc.nullsfirst,id.asc", "limit": limit or PAGE_SIZE}
+    if updated_at is not None and last_id is not None:
+        params["or"] = f"(updated_at.gt.{_quote(updated_at)},and(updated_at.eq.{_quote(updated_at)},id.gt.{last_id}))"
+    elif updated_at is not None:
+        params["updated_at"] = f"gte.{updated_at}"
+    elif last_id is not None:
+        params["or"] = f"(and(updated_at.is.null,id.gt.{last_id}),updated_at.not.is.null)"
+    return params
+
+
+def _rewind(updated_at):
+    try:
+        return (datetime.fromisoformat(updated_at.replace("Z", "+00:00")) - LOOKBACK).isoformat()
+    except (AttributeError, ValueError):
+        return updated_at
+
+
+def rest_getter(session):
+    """Page fetcher over a requests.Session / httpx.Client"""
+    def get(table, params):
+        res = session.get(f"{SUPABASE_URL}/rest/v1/{table}", params=params, headers=rest_headers(prefer=None))
+        res.raise_for_status()
+        return res.json()
+    return get
+
+
+def async_rest_getter(client):
+    """Page fetcher over an httpx.AsyncClient"""
+    async def get(table, params):
+        res = await client.get(f"{SUPABASE_URL}/rest/v1/{table}", params=params, headers=rest_headers(prefer=None))
+        res.raise_for_status()
+        return res.json()
+    return get
+
+
+class DirectoryIndex:
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+
+    # ---- sync ----
+
+    def watermark(self, source):
+        """Last (updated_at, id) synced for `source`, or (None, None)"""
+        row = self.db.execute("SELECT updated_at, id FROM watermarks WHERE source = ?", (source,)).fetchone()
+        return row or (None, None)
+
+    def set_watermark(self, source, updated_at, last_id):
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO watermarks VALUES (?, ?, ?, ?)",
+                            (source, updated_at, last_id, time.time()))
+
+    def resume_point(self, source):
+        """Where the next sync of `source` begins: (updated_at, last_id), rewound by LOOKBACK"""
+        updated_at, last_id = self.watermark(source)
+        if updated_at is None:
+            return None, last_id
+        return _rewind(updated_at), None
+
+    def _apply(self, source, rows):
+        _, table, mapper = SOURCES[source]
+        mapped = [mapper(r) for r in rows]
+        with self.db:
+            self.db.executemany(f"INSERT OR REPLACE INTO {table} VALUES ({', '.join('?' * len(mapped[0]))})", mapped)
+        last = rows[-1]
+        self.set_watermark(source, last.get("updated_at"), last["id"])
+        return last.get("updated_at"), last["id"]
+
+    def _pages(self, source):
+        """Drive keyset paging: yields params, receives rows, stops on a short page"""
+        select = SOURCES[source][0]
+        updated_at, last_id = self.resume_point(source)
+        while True:
+            rows = yield keyset_params(select, updated_at, last_id)
+            if rows:
+                updated_at, last_id = self._apply(source, rows)
+            if len(rows) < PAGE_SIZE:
+                return
+
+    def sync(self, get, sources=tuple(SOURCES)):
+        """Pull changes for each source with a blocking get(table, params); returns rows seen per source"""
+        seen = {}
+        for source in sources:
+            pages, seen[source] = self._pages(source), 0
+            params = next(pages)
+            try:
+                while True:
+                    rows = get(source, params)
+                    seen[source] += len(rows)
+                    params = pages.send(rows)
+            except StopIteration:
+                pass
+        return seen
+
+    async def sync_async(self, get, sources=tuple(SOURCES)):
+        """sync() with an async get(table, params)"""
+        seen = {}
+        for source in sources:
+            pages, seen[source] = self._pages(source), 0
+            params = next(pages)
+            try:
+                while True:
+                    rows = await get(source, params)
+                    seen[source] += len(rows)
+                    params = pages.send(rows)
+            except StopIteration:
+                pass
+        return seen
+
+    def rebuild(self):
+        with self.db:
+            for table in ("listings", "leads", "watermarks"):
+                self.db.execute(f"DELETE FROM {table}")
+
+    # ---- lookups ----
+
+    def _exists(self, sql, value):
+        return value is not None and self.db.execute(sql, (value,)).fetchone() is not None
+
+    def has_site(self, url):
+        return self._exists("SELECT 1 FROM listings WHERE site_key = ? LIMIT 1", site_key(url) or None)
+
+    def has_name_city(self, name, city):
+        return self._exists("SELECT 1 FROM listings WHERE name_city = ? LIMIT 1", name_city_key(name, city))
+
+    def has_email(self, email):
+        return self._exists("SELECT 1 FROM leads WHERE email = ? LIMIT 1", (email or "").strip().lower() or None)
+
+    def site_keys(self):
+        """All listing site keys as a set, for constant-time checks in hot loops"""
+        return {k for (k,) in self.db.execute("SELECT site_key FROM listings WHERE site_key IS NOT NULL")}
+
+    def name_city_keys(self):
+        return {k for (k,) in self.db.execute("SELECT name_city FROM listings WHERE name_city IS NOT NULL")}
+
+    def emails(self):
+        return {e for (e,) in self.db.execute("SELECT email FROM leads WHERE email IS NOT NULL")}
+
+    def counts(self):
+        return {table: self.db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in ("listings", "leads")}
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Manifest-driven generator for the site's static images (category tiles,
+directory heroes, ...). Replaces the one-off generate_category_images.py,
+generate_hero*.py and retry_images.py scripts.
+
+The manifest (JSON, or YAML when PyYAML is installed) lists each image's id,
+prompt and output path (relative to webapp/), plus optional named styles
+that carry the system message:
+
+    {"styles": {"hero": {"system_message": "..."}},
+     "images": [{"id": "hero-directory", "output": "public/images/hero-directory.png",
+                 "style": "hero", "prompt": "..."}]}
+
+All images are generated concurrently (bounded by --concurrency) through the
+shared image providers, with the per-error-class retries of image_retry and
+--retry-rounds further passes over whatever still failed, so regenerating the
+whole set takes about one provider round trip. Each output gets its
+responsive derivatives (image_derivatives) unless --no-derivatives.
+
+A lock file next to the manifest (<manifest>.lock.json, committed with the
+images) records the hash of every entry that was generated; entries whose
+hash is unchanged and whose output exists are skipped, and failed entries are
+picked up again by the next run.
+
+Usage:
+    python generate_images.py                                  # data/images/site_images.json
+    python generate_images.py --only dining,nightlife --force
+    python generate_images.py --provider fake --root /tmp/images-preview
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+WEBAPP_DIR = os.path.dirname(SCRIPTS_DIR)
+sys.path.insert(0, os.path.join(WEBAPP_DIR, "services"))
+
+from image_providers import PROVIDERS, NanoBananaProvider  # noqa: E402
+from image_retry import generate_with_retry  # noqa: E402
+
+DEFAULT_MANIFEST = os.path.join(SCRIPTS_DIR, "data", "images", "site_images.json")
+
+
+def load_manifest(path):
+    """Manifest dict from a .json or .yaml/.yml file, with each image's style resolved"""
+    with open(path, encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            import yaml  # optional: only needed for YAML manifests
+            manifest = yaml.safe_load(f)
+        else:
+            manifest = json.load(f)
+
+    styles = manifest.get("styles", {})
+    seen, images = set(), []
+    for entry in manifest.get("images", []):
+        missing = {"id", "output", "prompt"} - set(entry)
+        if missing:
+            raise ValueError(f"Manifest entry {entry.get('id', '?')} is missing {', '.join(sorted(missing))}")
+        if entry["id"] in seen:
+            raise ValueError(f"Duplicate image id '{entry['id']}' in {path}")
+        if entry.get("style") and entry["style"] not in styles:
+            raise ValueError(f"Image '{entry['id']}' uses unknown style '{entry['style']}'")
+        seen.add(entry["id"])
+        images.append({**styles.get(entry.get("style"), {}), **entry})
+    return images
+
+
+def entry_hash(entry, provider):
+    """Changes whenever anything that shapes the generated image changes"""
+    material = {k: entry.get(k) for k in ("prompt", "system_message", "output")}
+    material["provider"] = provider
+    return hashlib.sha256(json.dumps(material, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def lock_path(manifest_path):
+    return f"{os.path.splitext(manifest_path)[0]}.lock.json"
+
+
+def read_lock(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def write_lock(path, lock):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(dict(sorted(lock.items())), f, indent=2)
+        f.write("\n")
+    os.replace(tmp, path)
+
+
+def make_provider(name, system_message=None, concurrency=4):
+    """Provider instance for one system message (Gemini sessions carry it)"""
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown image provider '{name}' (available: {', '.join(PROVIDERS)})")
+    cls = PROVIDERS[name]
+    if issubclass(cls, NanoBananaProvider):
+        kwargs = {"concurrency": concurrency}
+        if system_message:
+            kwargs["system_message"] = system_message
+        return cls(**kwargs)
+    return cls()
+
+
+def write_atomic(path, data):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class ImageGenerator:
+    def __init__(self, opts, provider_factory=make_provider):
+        self.opts = opts
+        self.provider_factory = provider_factory
+        self.providers = {}  # system message -> provider
+        self.semaphore = asyncio.Semaphore(opts.concurrency)
+
+    def provider(self, system_message):
+        if system_message not in self.providers:
+            self.providers[system_message] = self.provider_factory(
+                self.opts.provider, system_message, self.opts.concurrency)
+        return self.providers[system_message]
+
+    async def generate(self, entry):
+        """Generate one image; returns its lock record"""
+        output = os.path.join(self.opts.root, entry["output"])
+        started = time.monotonic()
+        async with self.semaphore:
+            result, outcome = await generate_with_retry(self.provider(entry.get("system_message")), entry["prompt"])
+        record = {"attempts": outcome["attempts"], "seconds": round(time.monotonic() - started, 2)}
+        if not result:
+            return {**record, "status": "failed", "error_class": outcome["error_class"]}
+
+        image_bytes = base64.b64decode(result["data"])
+        write_atomic(output, image_bytes)
+        if not self.opts.no_derivatives:
+            from image_derivatives import build_derivatives
+            await asyncio.to_thread(build_derivatives, output)
+        return {**record, "status": "ok", "bytes": len(image_bytes)}
+
+    async def close(self):
+        for provider in self.providers.values():
+            await provider.close()
+
+
+def select(images, lock, opts):
+    """(entries to generate, ids skipped as unchanged)"""
+    only = set(opts.only.split(",")) if opts.only else None
+    todo, skipped = [], []
+    for entry in images:
+        if only is not None and entry["id"] not in only:
+            continue
+        prior = lock.get(entry["id"], {})
+        output = os.path.join(opts.root, entry["output"])
+        unchanged = (prior.get("hash") == entry_hash(entry, opts.provider) and prior.get("status") == "ok"
+                     and os.path.exists(output))
+        if unchanged and not opts.force:
+            skipped.append(entry["id"])
+        else:
+            todo.append(entry)
+    return todo, skipped
+
+
+async def run(opts, provider_factory=make_provider):
+    """Generate what changed; returns {"ok": [...], "failed": [...], "skipped": [...]}"""
+    images = load_manifest(opts.manifest)
+    lock_file = opts.lock or lock_path(opts.manifest)
+    lock = read_lock(lock_file)
+    todo, skipped = select(images, lock, opts)
+    print(f"{len(images)} images in {opts.manifest}: {len(todo)} to generate, {len(skipped)} unchanged")
+
+    generator = ImageGenerator(opts, provider_factory)
+    started = time.monotonic()
+    results = {"ok": [], "failed": [], "skipped": skipped}
+    try:
+        for round_no in range(opts.retry_rounds + 1):
+            if not todo:
+                break
+            if round_no:
+                print(f"Retry round {round_no}: {len(todo)} failed images")
+
+            async def one(entry):
+                record = await generator.generate(entry)
+                record.update(hash=entry_hash(entry, opts.provider), output=entry["output"],
+                              generated_at=datetime.now(timezone.utc).isoformat(timespec="seconds"))
+                lock[entry["id"]] = record
+                write_lock(lock_file, lock)
+                mark = "OK" if record["status"] == "ok" else f"FAILED ({record['error_class']})"
+                print(f"  {mark}: {entry['id']} -> {entry['output']} ({record['seconds']}s, {record['attempts']} attempts)")
+                return entry, record
+
+            done = await asyncio.gather(*(one(entry) for entry in todo))
+            results["ok"] += [entry["id"] for entry, record in done if record["status"] == "ok"]
+            todo = [entry for entry, record in done if record["status"] != "ok"]
+        results["failed"] = [entry["id"] for entry in todo]
+    finally:
+        await generator.close()
+        if not opts.no_derivatives:
+            from image_derivatives import shutdown_pool
+            shutdown_pool()
+
+    print(f"\nDone in {time.monotonic() - started:.1f}s: {len(results['ok'])} generated, "
+          f"{len(results['failed'])} failed, {len(skipped)} unchanged")
+    if results["failed"]:
+        print(f"Failed: {', '.join(results['failed'])} (rerun to retry just these)")
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the site's static images from a manifest")
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST, help="JSON or YAML image manifest")
+    parser.add_argument("--lock", help="lock file (default: <manifest>.lock.json)")
+    parser.add_argument("--root", default=WEBAPP_DIR, help="directory manifest output paths are relative to")
+    parser.add_argument("--provider", default=os.getenv("IMAGE_PROVIDER", NanoBananaProvider.name))
+    parser.add_argument("--concurrency", type=int, default=8, help="images generated at once")
+    parser.add_argument("--retry-rounds", type=int, default=1, help="extra passes over images that still failed")
+    parser.add_argument("--only", help="comma-separated image ids")
+    parser.add_argument("--force", action="store_true", help="regenerate even when unchanged")
+    parser.add_argument("--no-derivatives", action="store_true", help="skip the responsive WebP/AVIF derivatives")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    results = asyncio.run(run(parse_args(argv)))
+    return 1 if results["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""
+Per-stage timings, rolling throughput and error breakdown for bulk loads.
+
+bulk_loader.py feeds every stage duration and every finished business in;
+progress_line() is printed periodically during the run and summary() is
+written as JSON at the end, so it is visible whether scraping, the LLM
+extraction behind it or the CRM push is the bottleneck:
+
+    stats = LoadStats(total=5000)
+    with stats.timer("crm"):
+        ...
+    stats.add("llm", 0.84)          # durations reported by the scrape API
+    stats.finish(result)
+    print(stats.progress_line()); stats.write_json("batch5.stats.json")
+
+Stages recorded by the loader:
+    dedupe       local duplicate checks per input row
+    scrape_http  scrape API request (one per business, or one per batch)
+    site_fetch   target website fetch, as reported by the API
+    llm          LLM extraction, as reported by the API (0 when the page was unchanged)
+    db_write     Supabase reads/writes inside the API
+    crm          crm_leads upsert
+"""
+import json
+import math
+import os
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+
+WINDOW = 60.0  # seconds of completions behind the rolling rate
+
+# Scrape API timings field -> stage name
+API_STAGES = {"fetch_ms": "site_fetch", "llm_ms": "llm", "db_ms": "db_write"}
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(math.ceil(q / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def format_duration(seconds):
+    if seconds is None:
+        return "?"
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+class LoadStats:
+    def __init__(self, total=None, window=WINDOW, clock=time.monotonic):
+        self.total = total
+        self.window = window
+        self.clock = clock
+        self.started = clock()
+        self.samples = {}  # stage -> [seconds]
+        self.statuses = Counter()
+        self.error_classes = Counter()
+        self.crm = Counter()
+        self.done = 0
+        self._recent = deque()
+
+    # ---- recording ----
+
+    def add(self, stage, seconds):
+        self.samples.setdefault(stage, []).append(seconds)
+
+    @contextmanager
+    def timer(self, stage):
+        started = self.clock()
+        try:
+            yield
+        finally:
+            self.add(stage, self.clock() - started)
+
+    def add_api_timings(self, timings):
+        """Stage timings reported by the scrape API ({"fetch_ms", "llm_ms", "db_ms"})"""
+        for field, stage in API_STAGES.items():
+            if isinstance((timings or {}).get(field), (int, float)):
+                self.add(stage, timings[field] / 1000)
+
+    def finish(self, result):
+        """Count one finished business (a bulk_loader result dict)"""
+        now = self.clock()
+        self.done += 1
+        self.statuses[result["status"]] += 1
+        if result["status"] == "error":
+            self.error_classes[result.get("error_class", "unknown")] += 1
+        if "crm" in result:
+            self.crm[{True: "pushed", "exists": "exists"}.get(result["crm"], "failed")] += 1
+        self._recent.append(now)
+        while self._recent and self._recent[0] < now - self.window:
+            self._recent.popleft()
+
+    # ---- reporting ----
+
+    def elapsed(self):
+        return self.clock() - self.started
+
+    def rate(self):
+        """Businesses per second over the rolling window (or the whole run while it is shorter)"""
+        span = min(self.elapsed(), self.window)
+        return len(self._recent) / span if span > 0 else 0.0
+
+    def eta(self):
+        """Seconds until the total is done at the rolling rate, or None"""
+        rate = self.rate()
+        if self.total is None or rate <= 0:
+            return None
+        return max(self.total - self.done, 0) / rate
+
+    def error_rate(self):
+        return self.statuses["error"] / self.done if self.done else 0.0
+
+    def stage_summary(self):
+        """{stage: {count, total_s, mean_ms, p50_ms, p95_ms, max_ms}}"""
+        out = {}
+        for stage, values in self.samples.items():
+            ordered = sorted(values)
+            out[stage] = {
+                "count": len(ordered),
+                "total_s": round(sum(ordered), 3),
+                "mean_ms": round(sum(ordered) / len(ordered) * 1000, 1),
+                "p50_ms": round(percentile(ordered, 50) * 1000, 1),
+                "p95_ms": round(percentile(ordered, 95) * 1000, 1),
+                "max_ms": round(ordered[-1] * 1000, 1),
+            }
+        return out
+
+    def bottleneck(self):
+        """Stage with the most total time, or None"""
+        stages = {s: v for s, v in self.samples.items() if s != "dedupe"}
+        return max(stages, key=lambda s: sum(stages[s]), default=None)
+
+    def progress_line(self):
+        progress = f"{self.done}/{self.total}" if self.total else str(self.done)
+        eta = f" | ETA {format_duration(self.eta())}" if self.total else ""
+        return (f"--- {progress} done | {self.rate():.2f}/s over last {format_duration(min(self.elapsed(), self.window))}"
+                f"{eta} | errors {self.error_rate():.1%}")
+
+    def summary(self):
+        elapsed = self.elapsed()
+        return {
+            "total": self.total,
+            "done": self.done,
+            "elapsed_s": round(elapsed, 3),
+            "throughput_per_s": round(self.done / elapsed, 3) if elapsed > 0 else None,
+            "rolling_per_s": round(self.rate(), 3),
+            "statuses": dict(self.statuses),
+            "error_rate": round(self.error_rate(), 4),
+            "error_classes": dict(self.error_classes.most_common()),
+            "crm": dict(self.crm),
+            "stages": self.stage_summary(),
+            "bottleneck": self.bottleneck(),
+        }
+
+    def stage_table(self):
+        lines = [f"{'stage':<12} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'total s':>9}"]
+        for stage, row in sorted(self.stage_summary().items(), key=lambda kv: -kv[1]["total_s"]):
+            lines.append(f"{stage:<12} {row['count']:>7} {row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['total_s']:>9.1f}")
+        return "\n".join(lines)
+
+    def write_json(self, path, **extra):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({**self.summary(), **extra}, f, indent=2)
+            f.write("\n")
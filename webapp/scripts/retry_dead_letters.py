@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Retry worker for the dead-letter store (see dead_letters.py).
+
+Each pass takes the entries whose next retry time has come and re-runs them:
+scrapes go back through bulk_loader (same rate limiting and politeness, with
+the CRM push when the original run had --crm), CRM leads are upserted again
+with ignore-duplicates. Success resolves an entry; another failure bumps its
+attempt count and pushes the next retry out exponentially, until it is
+abandoned after MAX_ATTEMPTS.
+
+The report lists domains that keep failing; --write-skip-file saves them in
+the format bulk_loader.py --skip-file reads, so they can be excluded.
+
+Run from cron, or keep it running with --watch:
+
+    */30 * * * * cd /path/to/webapp/scripts && python retry_dead_letters.py >> dead_letters.log 2>&1
+
+Usage:
+    python retry_dead_letters.py                       # one pass over what is due
+    python retry_dead_letters.py --watch               # keep draining as entries come due
+    python retry_dead_letters.py --report --write-skip-file data/bulk/failing_domains.txt
+"""
+import argparse
+import asyncio
+import sys
+import time
+from collections import Counter
+
+import httpx
+
+import bulk_loader
+from bulk_common import API_BASE
+from dead_letters import DEFAULT_PATH, DeadLetters
+from push_to_crm import LeadUpserter, batches
+
+
+def loader_opts(opts, crm, tag):
+    """bulk_loader options for re-running dead-lettered scrapes"""
+    args = ["--input", "-", "--api-base", opts.api_base, "--concurrency", str(opts.concurrency),
+            "--timeout", str(opts.timeout), "--no-journal", "--no-stats"]
+    if crm:
+        args.append("--crm")
+    if tag:
+        args += ["--tag", tag]
+    return bulk_loader.parse_args(args)
+
+
+async def retry_scrapes(entries, dead_letters, opts, transport=None):
+    """Re-run due scrapes, grouped by the CRM/tag settings of the run they came from"""
+    groups = {}
+    for entry in entries:
+        payload = dict(entry["payload"])
+        groups.setdefault((payload.pop("crm", False), payload.pop("tag", None)), []).append(payload)
+
+    counts = Counter()
+    for (crm, tag), items in groups.items():
+        counts.update(await bulk_loader.run(items, loader_opts(opts, crm, tag), transport, dead_letters))
+    return counts
+
+
+async def retry_leads(entries, dead_letters, opts, transport=None):
+    """Upsert due CRM leads again; returns outcome counts"""
+    leads = [entry["payload"] for entry in entries]
+    async with httpx.AsyncClient(timeout=opts.timeout, transport=transport) as client:
+        upserter = LeadUpserter(client, concurrency=opts.concurrency)
+        await asyncio.gather(*(upserter.upsert(batch) for batch in batches(leads, opts.batch_size)))
+    upserter.record_dead_letters(dead_letters, leads)
+    return Counter(outcome for outcome, _ in upserter.outcomes.values())
+
+
+async def drain(dead_letters, opts, transport=None, now=None):
+    """One pass over the due entries; returns {"scrape": counts, "crm": counts}"""
+    results = {}
+    for kind, retry in (("scrape", retry_scrapes), ("crm", retry_leads)):
+        if opts.kind not in ("all", kind):
+            continue
+        entries = dead_letters.due(kind, now=now, limit=opts.limit)
+        if entries:
+            print(f"Retrying {len(entries)} dead-lettered {kind} operations")
+            results[kind] = await retry(entries, dead_letters, opts, transport)
+    return results
+
+
+def print_report(dead_letters, min_failures, top=20):
+    counts = dead_letters.counts()
+    print(f"Dead letters: {counts.get('pending', 0)} pending, {counts.get('abandoned', 0)} abandoned, "
+          f"{counts.get('resolved', 0)} resolved")
+    domains = dead_letters.domain_report(min_failures)
+    if domains:
+        print(f"Domains failing {min_failures}+ times:")
+        for row in domains[:top]:
+            print(f"  {row['domain']:<40} {row['attempts']:>3} failures over {row['entries']} operations"
+                  f"{' (abandoned)' if row['abandoned'] else ''}  {', '.join(row['error_classes'])}")
+    return domains
+
+
+def write_skip_file(path, domains):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("# Domains that keep failing (retry_dead_letters.py); use with bulk_loader.py --skip-file\n")
+        for row in domains:
+            f.write(f"{row['domain']}  # {row['attempts']} failures: {', '.join(row['error_classes'])}\n")
+    print(f"{len(domains)} domains written to {path}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Retry failed scrape / CRM operations from the dead-letter store")
+    parser.add_argument("--dead-letters", default=DEFAULT_PATH, help="dead-letter store (SQLite)")
+    parser.add_argument("--kind", choices=("all", "scrape", "crm"), default="all")
+    parser.add_argument("--limit", type=int, help="max entries of each kind per pass")
+    parser.add_argument("--watch", action="store_true", help="keep running, sleeping until the next entry is due")
+    parser.add_argument("--max-sleep", type=float, default=900.0, help="with --watch: longest sleep between passes")
+    parser.add_argument("--report", action="store_true", help="only print the failure report")
+    parser.add_argument("--min-failures", type=int, default=3, help="failures before a domain is reported")
+    parser.add_argument("--write-skip-file", help="write the reported domains to this --skip-file")
+    parser.add_argument("--api-base", default=API_BASE)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=200, help="CRM leads per upsert request")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    opts = parse_args(argv)
+    dead_letters = DeadLetters(opts.dead_letters)
+    try:
+        while not opts.report:
+            asyncio.run(drain(dead_letters, opts))
+            if not opts.watch:
+                break
+            next_due = dead_letters.next_due_at()
+            wait = opts.max_sleep if next_due is None else min(max(next_due - time.time(), 1.0), opts.max_sleep)
+            print(f"Next pass in {wait:.0f}s")
+            time.sleep(wait)
+        domains = print_report(dead_letters, opts.min_failures)
+        if opts.write_skip_file:
+            write_skip_file(opts.write_skip_file, domains)
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        dead_letters.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
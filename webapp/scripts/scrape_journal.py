@@ -0,0 +1,112 @@
+"""
+Append-only JSONL checkpoint journal for bulk scrape runs.
+
+Each line records one outcome for a business (keyed by site_key):
+  {"ts": ..., "key": "milb.com/dunedin", "name": ..., "event": "scrape",
+   "status": "ok" | "fallback" | "error", "listing": {...}, "error": ...}
+  {"ts": ..., "key": ..., "event": "crm", "status": "pushed" | "failed", "error": ...}
+
+Replaying the journal on start tells the loader which businesses are done,
+which only still need their CRM push, and which failed and must be retried.
+Lines are flushed as written and fsync'd in batches so durability does not
+cost one disk sync per business. A torn final line (crash mid-write) is ignored.
+"""
+import json
+import os
+import time
+
+# Listing fields kept in the journal so a resumed run can push to the CRM
+# without re-scraping
+LISTING_FIELDS = ("id", "business_name", "email", "phone", "city", "state", "website")
+
+SCRAPE_DONE = ("ok", "fallback")
+
+
+def listing_snapshot(listing):
+    if not listing:
+        return None
+    snap = {k: listing.get(k) for k in LISTING_FIELDS if listing.get(k) is not None}
+    ai = listing.get("ai_scraped_data")
+    if isinstance(ai, dict):
+        snap["ai_scraped_data"] = {k: ai[k] for k in ("email", "phone", "city", "state") if ai.get(k)}
+    return snap
+
+
+class ScrapeJournal:
+    def __init__(self, path, fsync_every=50, fsync_interval=1.0):
+        self.path = path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.entries = {}  # key -> {"scrape": record, "crm": record}
+        self.replayed = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.exists(path):
+            self._replay()
+        self._file = open(path, "a", encoding="utf-8")
+        if self._file.tell() and not self._ends_with_newline():
+            self._file.write("\n")  # terminate a torn line so the next record starts clean
+
+    def _replay(self):
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # torn write from a crash
+                self._apply(record)
+                self.replayed += 1
+
+    def _ends_with_newline(self):
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def _apply(self, record):
+        self.entries.setdefault(record["key"], {})[record["event"]] = record
+
+    def scrape_record(self, key):
+        return self.entries.get(key, {}).get("scrape")
+
+    def scrape_done(self, key):
+        record = self.scrape_record(key)
+        return bool(record and record["status"] in SCRAPE_DONE)
+
+    def crm_done(self, key):
+        record = self.entries.get(key, {}).get("crm")
+        return bool(record and record["status"] == "pushed")
+
+    def completed(self, key, crm=False):
+        return self.scrape_done(key) and (not crm or self.crm_done(key))
+
+    def record(self, key, event, status, **fields):
+        record = {"ts": round(time.time(), 3), "key": key, "event": event, "status": status, **fields}
+        self._apply(record)
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._file.flush()
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+            self.sync()
+
+    def sync(self):
+        if self._unsynced:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def summary(self):
+        counts = {}
+        for events in self.entries.values():
+            status = events.get("scrape", {}).get("status")
+            if status:
+                counts[status] = counts.get(status, 0) + 1
+            if events.get("crm", {}).get("status") == "pushed":
+                counts["crm_pushed"] = counts.get("crm_pushed", 0) + 1
+        return counts
+
+    def close(self):
+        self.sync()
+        self._file.close()
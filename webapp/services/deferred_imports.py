@@ -0,0 +1,89 @@
+"""
+Deferred Imports
+Heavy modules (the emergentintegrations SDK, Pillow) are kept off the startup
+path. The service's lifespan calls start_background_imports() and returns
+straight away, so uvicorn binds the port and answers /health while the SDKs
+import in a background thread. Code that needs a module either awaits
+.load() (async, never blocks the event loop) or calls .get() (sync; waits
+for an import already in flight thanks to the import lock).
+"""
+
+import asyncio
+import importlib
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, Optional
+
+
+class DeferredModule:
+    """A module imported on first use or in the background, whichever comes first"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.seconds: Optional[float] = None
+        self.error: Optional[str] = None
+        self._future: Optional[Future] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._future is not None and self._future.done() and self.error is None
+
+    def _import(self):
+        started = time.perf_counter()
+        try:
+            module = importlib.import_module(self.name)
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self.seconds = round(time.perf_counter() - started, 4)
+        return module
+
+    def start(self) -> Future:
+        """Begin importing in a daemon thread (idempotent)"""
+        with self._lock:
+            if self._future is None:
+                self._future = Future()
+
+                def run():
+                    try:
+                        self._future.set_result(self._import())
+                    except BaseException as e:
+                        self._future.set_exception(e)
+
+                threading.Thread(target=run, name=f"import-{self.name}", daemon=True).start()
+            return self._future
+
+    async def load(self):
+        """The module, importing it off the event loop if it isn't loaded yet"""
+        return await asyncio.wrap_future(self.start())
+
+    def get(self):
+        """The module, synchronously (for code already running in a worker thread)"""
+        return self.start().result()
+
+    def status(self) -> dict:
+        state = "error" if self.error else "loaded" if self.loaded else "loading" if self._future else "deferred"
+        return {"state": state, "seconds": self.seconds, "error": self.error}
+
+
+_registry: Dict[str, DeferredModule] = {}
+
+
+def deferred(name: str) -> DeferredModule:
+    """Shared DeferredModule for a module name"""
+    if name not in _registry:
+        _registry[name] = DeferredModule(name)
+    return _registry[name]
+
+
+def start_background_imports(*names: str):
+    """Kick off every registered module (or just `names`) in the background"""
+    for module in ([deferred(n) for n in names] if names else list(_registry.values())):
+        module.start()
+
+
+def import_status() -> Dict[str, dict]:
+    return {name: module.status() for name, module in _registry.items()}
@@ -0,0 +1,163 @@
+"""
+Image Deduplication
+Perceptual (difference) hashing for generated images, plus a small on-disk
+cache that remembers kept images and their hashes per prompt.
+
+Two images are near-duplicates when the Hamming distance between their
+64-bit dHashes is at or below IMAGE_DEDUPE_DISTANCE (default 6).
+"""
+
+import base64
+import io
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Iterable, List, Optional
+
+from deferred_imports import deferred
+
+PIL_IMAGE = deferred("PIL.Image")  # only needed once images arrive
+
+DEDUPE_DISTANCE = int(os.getenv("IMAGE_DEDUPE_DISTANCE", "6"))
+CACHE_DIR = os.getenv("IMAGE_CACHE_DIR", "/app/webapp/.cache/images")
+CACHE_MAX_ENTRIES = int(os.getenv("IMAGE_CACHE_MAX_ENTRIES", "500"))
+
+EXTENSIONS = {"image/png": "png", "image/jpeg": "jpg", "image/webp": "webp"}
+
+
+def image_hash(image_bytes: bytes, hash_size: int = 8) -> int:
+    """64-bit difference hash (dHash) of an encoded image"""
+    Image = PIL_IMAGE.get()
+    with Image.open(io.BytesIO(image_bytes)) as img:
+        small = img.convert("L").resize((hash_size + 1, hash_size), Image.LANCZOS)
+        pixels = small.tobytes()
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] < pixels[offset + col + 1])
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def is_near_duplicate(value: int, others: Iterable[int], distance: int = DEDUPE_DISTANCE) -> bool:
+    return any(hamming(value, other) <= distance for other in others)
+
+
+def hash_to_hex(value: int) -> str:
+    return f"{value:016x}"
+
+
+def prompt_key(prompt: str) -> str:
+    """Normalize a prompt so trivially different wordings share cache entries"""
+    words = re.findall(r"[a-z0-9]+", prompt.lower())
+    return " ".join(sorted(set(words)))
+
+
+class ImageCache:
+    """
+    Kept images and their perceptual hashes, keyed by normalized prompt.
+    Metadata lives in SQLite; image bytes are files next to it. Oldest
+    entries are evicted past `max_entries`.
+    """
+
+    def __init__(self, directory: str = CACHE_DIR, max_entries: int = CACHE_MAX_ENTRIES):
+        self.directory = directory
+        self.max_entries = max_entries
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(directory, "image_cache.sqlite3"), check_same_thread=False)
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS images (
+                id TEXT PRIMARY KEY,
+                prompt_key TEXT NOT NULL,
+                prompt TEXT NOT NULL,
+                phash TEXT NOT NULL,
+                mime_type TEXT NOT NULL,
+                path TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )"""
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_images_prompt_key ON images (prompt_key)")
+        self._db.commit()
+
+    def lookup(self, prompt: str, limit: int, distance: int = DEDUPE_DISTANCE) -> List[dict]:
+        """Up to `limit` mutually distinct cached images for a prompt"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, phash, mime_type, path FROM images WHERE prompt_key = ? ORDER BY created_at DESC",
+                (prompt_key(prompt),),
+            ).fetchall()
+
+        found: List[dict] = []
+        for image_id, phash, mime_type, path in rows:
+            value = int(phash, 16)
+            if is_near_duplicate(value, (f["hash"] for f in found), distance):
+                continue
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+            except OSError:
+                continue
+            found.append({
+                "id": image_id,
+                "data": base64.b64encode(data).decode("ascii"),
+                "mime_type": mime_type,
+                "hash": value,
+            })
+            if len(found) >= limit:
+                break
+        return found
+
+    def store(self, prompt: str, image_id: str, image_bytes: bytes, mime_type: str, value: int):
+        path = os.path.join(self.directory, f"{image_id}.{EXTENSIONS.get(mime_type, 'bin')}")
+        with open(path, "wb") as f:
+            f.write(image_bytes)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO images VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (image_id, prompt_key(prompt), prompt, hash_to_hex(value), mime_type, path, time.time()),
+            )
+            self._db.commit()
+            self._evict()
+
+    def _evict(self):
+        overflow = self._db.execute("SELECT COUNT(*) FROM images").fetchone()[0] - self.max_entries
+        if overflow <= 0:
+            return
+        stale = self._db.execute(
+            "SELECT id, path FROM images ORDER BY created_at ASC LIMIT ?", (overflow,)
+        ).fetchall()
+        self._db.executemany("DELETE FROM images WHERE id = ?", [(row[0],) for row in stale])
+        self._db.commit()
+        for _, path in stale:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+_cache: Optional[ImageCache] = None
+
+
+def get_image_cache() -> ImageCache:
+    global _cache
+    if _cache is None:
+        _cache = ImageCache()
+    return _cache
+
+
+def close_image_cache():
+    global _cache
+    if _cache is not None:
+        _cache.close()
+        _cache = None
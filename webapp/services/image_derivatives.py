@@ -0,0 +1,321 @@
+"""
+Responsive Image Derivatives
+Turns a generated PNG into WebP/AVIF widths plus a blurhash/LQIP placeholder
+and writes a manifest the front end can use to build srcset attributes.
+
+Usage:
+    python image_derivatives.py public/images/hero-directory.png [more.png ...]
+"""
+
+import base64
+import hashlib
+import io
+import json
+import math
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+from PIL import Image
+
+# Mirrors the /api/upload optimization defaults (MAX_WIDTH 1920, WEBP_QUALITY 80)
+DERIVATIVE_WIDTHS = (320, 640, 960, 1280, 1920)
+DERIVATIVE_FORMATS = ("avif", "webp")
+WEBP_QUALITY = 80
+AVIF_QUALITY = 55
+
+MIME_TYPES = {"avif": "image/avif", "webp": "image/webp"}
+
+# Generated-image derivative sets kept in the output directory (least recently used evicted)
+DERIVATIVES_MAX_ENTRIES = int(os.getenv("IMAGE_DERIVATIVES_MAX_ENTRIES", "500"))
+
+BLURHASH_COMPONENTS = (4, 3)
+LQIP_WIDTH = 16
+
+_BASE83 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~"
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """Shared process pool for encode jobs (created on first use)"""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=int(os.getenv("IMAGE_DERIVATIVE_WORKERS", "0")) or None)
+    return _pool
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True)
+        _pool = None
+
+
+# ---------------------------------------------------------------------------
+# Placeholders
+# ---------------------------------------------------------------------------
+
+def _encode83(value: int, length: int) -> str:
+    out = ""
+    for i in range(1, length + 1):
+        digit = (value // (83 ** (length - i))) % 83
+        out += _BASE83[digit]
+    return out
+
+
+def _srgb_to_linear(value: int) -> float:
+    v = value / 255.0
+    return v / 12.92 if v <= 0.04045 else ((v + 0.055) / 1.055) ** 2.4
+
+
+def _linear_to_srgb(value: float) -> int:
+    v = max(0.0, min(1.0, value))
+    if v <= 0.0031308:
+        return int(v * 12.92 * 255 + 0.5)
+    return int((1.055 * (v ** (1 / 2.4)) - 0.055) * 255 + 0.5)
+
+
+def _sign_pow(value: float, exp: float) -> float:
+    return math.copysign(abs(value) ** exp, value)
+
+
+def blurhash(img: Image.Image, components_x: int = 4, components_y: int = 3) -> str:
+    """Encode a blurhash string (https://blurha.sh) from a PIL image"""
+    small = img.convert("RGB")
+    small.thumbnail((32, 32))
+    width, height = small.size
+    raw = small.tobytes()
+    linear = [_srgb_to_linear(v) for v in range(256)]
+    pixels = [(linear[raw[i]], linear[raw[i + 1]], linear[raw[i + 2]]) for i in range(0, len(raw), 3)]
+
+    cos_x = [[math.cos(math.pi * i * x / width) for x in range(width)] for i in range(components_x)]
+    cos_y = [[math.cos(math.pi * j * y / height) for y in range(height)] for j in range(components_y)]
+
+    factors = []
+    for j in range(components_y):
+        for i in range(components_x):
+            norm = 1.0 if i == 0 and j == 0 else 2.0
+            r = g = b = 0.0
+            for y in range(height):
+                cy = cos_y[j][y]
+                row = y * width
+                for x in range(width):
+                    basis = cos_x[i][x] * cy
+                    pr, pg, pb = pixels[row + x]
+                    r += basis * pr
+                    g += basis * pg
+                    b += basis * pb
+            scale = norm / (width * height)
+            factors.append((r * scale, g * scale, b * scale))
+
+    dc, ac = factors[0], factors[1:]
+    result = _encode83((components_x - 1) + (components_y - 1) * 9, 1)
+
+    if ac:
+        actual_max = max(abs(v) for f in ac for v in f)
+        quant_max = max(0, min(82, int(math.floor(actual_max * 166 - 0.5))))
+        max_value = (quant_max + 1) / 166
+        result += _encode83(quant_max, 1)
+    else:
+        max_value = 1.0
+        result += _encode83(0, 1)
+
+    result += _encode83((_linear_to_srgb(dc[0]) << 16) + (_linear_to_srgb(dc[1]) << 8) + _linear_to_srgb(dc[2]), 4)
+
+    for factor in ac:
+        r, g, b = (max(0, min(18, int(math.floor(_sign_pow(v / max_value, 0.5) * 9 + 9.5)))) for v in factor)
+        result += _encode83(r * 19 * 19 + g * 19 + b, 2)
+
+    return result
+
+
+def lqip(img: Image.Image, width: int = LQIP_WIDTH) -> str:
+    """Tiny WebP data URI used as a low-quality placeholder"""
+    small = img.convert("RGB")
+    height = max(1, round(img.height * width / img.width))
+    small = small.resize((width, height), Image.BILINEAR)
+    buf = io.BytesIO()
+    small.save(buf, "WEBP", quality=40)
+    return "data:image/webp;base64," + base64.b64encode(buf.getvalue()).decode("ascii")
+
+
+# ---------------------------------------------------------------------------
+# Encoding
+# ---------------------------------------------------------------------------
+
+def _encode_variant(source: str, out_path: str, width: int, fmt: str) -> dict:
+    """Resize and encode one derivative (runs inside the process pool)"""
+    with Image.open(source) as img:
+        img = img.convert("RGBA" if img.mode in ("RGBA", "LA", "P") else "RGB")
+        if img.width > width:
+            height = max(1, round(img.height * width / img.width))
+            img = img.resize((width, height), Image.LANCZOS)
+        if fmt == "webp":
+            img.save(out_path, "WEBP", quality=WEBP_QUALITY, method=4)
+        else:
+            img.save(out_path, "AVIF", quality=AVIF_QUALITY)
+        return {
+            "width": img.width,
+            "height": img.height,
+            "bytes": os.path.getsize(out_path),
+        }
+
+
+def _placeholders(source: str) -> dict:
+    with Image.open(source) as img:
+        return {
+            "blurhash": blurhash(img, *BLURHASH_COMPONENTS),
+            "lqip": lqip(img),
+        }
+
+
+def _public_path(directory: str) -> str:
+    """URL path for a directory under webapp/public (falls back to its basename)"""
+    abs_dir = os.path.abspath(directory)
+    marker = os.sep + "public" + os.sep
+    rel = abs_dir.split(marker, 1)[1] if marker in abs_dir else os.path.basename(abs_dir)
+    return "/" + rel.replace(os.sep, "/")
+
+
+def derivative_widths(source_width: int, widths: Sequence[int] = DERIVATIVE_WIDTHS) -> List[int]:
+    """Widths to emit for a source image; never upscales past the original"""
+    chosen = sorted({w for w in widths if w < source_width})
+    chosen.append(min(source_width, max(widths)))
+    return sorted(set(chosen))
+
+
+def build_derivatives(
+    source: str,
+    output_dir: Optional[str] = None,
+    public_prefix: Optional[str] = None,
+    widths: Sequence[int] = DERIVATIVE_WIDTHS,
+    formats: Sequence[str] = DERIVATIVE_FORMATS,
+    pool: Optional[ProcessPoolExecutor] = None,
+) -> dict:
+    """
+    Encode every width/format derivative of `source` in the process pool and
+    write `<stem>.manifest.json` next to them. Returns the manifest.
+
+    `public_prefix` is the URL path the output directory is served from
+    (e.g. "/images/derivatives"); manifest `src` values are built from it.
+    """
+    stem = os.path.splitext(os.path.basename(source))[0]
+    output_dir = output_dir or os.path.join(os.path.dirname(source), "derivatives")
+    os.makedirs(output_dir, exist_ok=True)
+    if public_prefix is None:
+        public_prefix = _public_path(output_dir)
+    public_prefix = public_prefix.rstrip("/")
+
+    with Image.open(source) as img:
+        source_width, source_height = img.size
+
+    pool = pool or get_pool()
+    jobs = []
+    for fmt in formats:
+        for width in derivative_widths(source_width, widths):
+            filename = f"{stem}-{width}.{fmt}"
+            out_path = os.path.join(output_dir, filename)
+            jobs.append((fmt, filename, pool.submit(_encode_variant, source, out_path, width, fmt)))
+    placeholder_job = pool.submit(_placeholders, source)
+
+    sources: Dict[str, List[dict]] = {}
+    for fmt, filename, job in jobs:
+        info = job.result()
+        sources.setdefault(MIME_TYPES[fmt], []).append({"src": f"{public_prefix}/{filename}", **info})
+
+    manifest = {
+        "source": os.path.basename(source),
+        "width": source_width,
+        "height": source_height,
+        "placeholder": placeholder_job.result(),
+        "sources": sources,
+        "srcset": {
+            mime: ", ".join(f"{v['src']} {v['width']}w" for v in variants)
+            for mime, variants in sources.items()
+        },
+    }
+
+    with open(_manifest_path(output_dir, stem), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    return manifest
+
+
+def build_derivatives_from_bytes(image_bytes: bytes, name: str, output_dir: str, **kwargs) -> dict:
+    """Persist generated image bytes as PNG, then build its derivatives"""
+    os.makedirs(output_dir, exist_ok=True)
+    source = os.path.join(output_dir, f"{name}.png")
+    with open(source, "wb") as f:
+        f.write(image_bytes)
+    return build_derivatives(source, output_dir=output_dir, **kwargs)
+
+
+def _manifest_path(output_dir: str, stem: str) -> str:
+    return os.path.join(output_dir, f"{stem}.manifest.json")
+
+
+def prune_derivatives(output_dir: str, max_entries: int = DERIVATIVES_MAX_ENTRIES, keep: Sequence[str] = ()) -> int:
+    """
+    Delete the least recently used derivative sets (PNG, every width/format and
+    the manifest) past `max_entries`. A set's age is its manifest's mtime.
+    Returns the number of sets removed.
+    """
+    manifests = []
+    for filename in os.listdir(output_dir):
+        if filename.endswith(".manifest.json"):
+            stem = filename[:-len(".manifest.json")]
+            try:
+                manifests.append((os.path.getmtime(os.path.join(output_dir, filename)), stem))
+            except OSError:
+                continue
+    overflow = len(manifests) - max_entries
+    if overflow <= 0:
+        return 0
+
+    stale = [stem for _, stem in sorted(manifests) if stem not in keep][:overflow]
+    patterns = [re.compile(rf"{re.escape(stem)}(\.png|\.manifest\.json|-\d+\.[a-z]+)") for stem in stale]
+    for filename in os.listdir(output_dir):
+        if any(p.fullmatch(filename) for p in patterns):
+            try:
+                os.remove(os.path.join(output_dir, filename))
+            except OSError:
+                pass
+    return len(stale)
+
+
+def build_generated_derivatives(image_bytes: bytes, output_dir: str, max_entries: int = DERIVATIVES_MAX_ENTRIES,
+                                **kwargs) -> dict:
+    """
+    Derivatives for generated image bytes, named by content hash: an image
+    that was already built is served from its manifest, and the directory is
+    capped at `max_entries` sets.
+    """
+    stem = hashlib.sha256(image_bytes).hexdigest()[:32]
+    manifest_path = _manifest_path(output_dir, stem)
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        os.utime(manifest_path)  # mark as recently used
+        return manifest
+    except (OSError, ValueError):
+        pass
+
+    manifest = build_derivatives_from_bytes(image_bytes, stem, output_dir, **kwargs)
+    prune_derivatives(output_dir, max_entries, keep=(stem,))
+    return manifest
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python image_derivatives.py <image.png> [...]")
+        sys.exit(1)
+    try:
+        for path in sys.argv[1:]:
+            m = build_derivatives(path)
+            total = sum(v["bytes"] for variants in m["sources"].values() for v in variants)
+            print(f"OK: {m['source']} -> {sum(len(v) for v in m['sources'].values())} derivatives ({total} bytes)")
+    finally:
+        shutdown_pool()
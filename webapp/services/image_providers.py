@@ -0,0 +1,316 @@
+"""
+Image Providers
+Pluggable image generation backends used by the image service.
+
+A provider is created once per process and reused across requests, so SDK
+setup happens once rather than per image. Chat clients are not reused: an
+LlmChat keeps its session's history, so every image gets a fresh one. Only the
+provider configured from the environment is shared; a caller-supplied API key
+gets a short-lived provider that is closed when its request ends. The SDK
+itself is a deferred import (deferred_imports.py): it loads in the background
+after startup instead of holding up the port bind.
+Select one with IMAGE_PROVIDER (default: nano_banana; "fake" for offline load tests).
+"""
+
+import asyncio
+import base64
+import hashlib
+import os
+import random
+import struct
+import uuid
+import zlib
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Tuple, Type
+
+from deferred_imports import deferred
+
+EMERGENT_CHAT = deferred("emergentintegrations.llm.chat")
+
+DEFAULT_SYSTEM_MESSAGE = (
+    "You are an expert image generator. Create high-quality, professional images "
+    "for blog posts and marketing materials."
+)
+
+
+class ImageProvider:
+    """Base class for image generation backends"""
+
+    name = "base"
+
+    def __init__(self):
+        self.calls = 0
+        self.images = 0
+        self.errors = 0
+
+    @classmethod
+    def for_request(cls, api_key: str) -> "ImageProvider":
+        """Provider for a single request made with a caller-supplied key"""
+        return cls(api_key=api_key)
+
+    def stats(self) -> dict:
+        return {"provider": self.name, "calls": self.calls, "images": self.images, "errors": self.errors}
+
+    async def start(self):
+        """Warm up clients (called once at service startup)"""
+
+    async def close(self):
+        """Release clients (called once at service shutdown)"""
+
+    async def generate(self, prompt: str) -> Optional[dict]:
+        """
+        Generate one image. Returns {"data": <base64>, "mime_type", "text_response"}
+        or None when the provider answered without an image.
+        """
+        raise NotImplementedError
+
+
+class NanoBananaProvider(ImageProvider):
+    """Gemini image generation via emergentintegrations (Nano Banana)"""
+
+    name = "nano_banana"
+    model = ("gemini", "gemini-3-pro-image-preview")
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        system_message: str = DEFAULT_SYSTEM_MESSAGE,
+        concurrency: Optional[int] = None,
+    ):
+        super().__init__()
+        self.api_key = api_key or os.getenv("EMERGENT_LLM_KEY")
+        self.system_message = system_message
+        self.concurrency = concurrency or int(os.getenv("IMAGE_PROVIDER_CONCURRENCY", "8"))
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._sdk = None
+
+    @classmethod
+    def for_request(cls, api_key: str) -> "NanoBananaProvider":
+        # One request never needs more than one call in flight
+        return cls(api_key=api_key, concurrency=1)
+
+    def _new_client(self, LlmChat):
+        chat = LlmChat(
+            api_key=self.api_key,
+            session_id=f"img-{uuid.uuid4().hex[:8]}",
+            system_message=self.system_message,
+        )
+        chat.with_model(*self.model).with_params(modalities=["image", "text"])
+        return chat
+
+    async def start(self):
+        if self._sdk is not None:
+            return
+        if not self.api_key:
+            raise RuntimeError("EMERGENT_LLM_KEY not configured")
+
+        chat = await EMERGENT_CHAT.load()
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.concurrency)
+        self._sdk = (chat.LlmChat, chat.UserMessage)
+
+    async def close(self):
+        self._sdk = None
+
+    async def generate(self, prompt: str) -> Optional[dict]:
+        if self._sdk is None:
+            await self.start()
+
+        # Local references: close() may run while this call is in flight
+        (LlmChat, UserMessage), slots = self._sdk, self._slots
+        async with slots:
+            # A fresh chat per image so no prompt or image leaks into another request's history
+            chat = self._new_client(LlmChat)
+            self.calls += 1
+            try:
+                text_response, images = await chat.send_message_multimodal_response(UserMessage(text=prompt))
+            except Exception:
+                self.errors += 1
+                raise
+
+        if images:
+            img = images[0]
+            self.images += 1
+            return {
+                "data": img["data"],
+                "mime_type": img.get("mime_type", "image/png"),
+                "text_response": text_response,
+            }
+        return None
+
+
+def _png(width: int, height: int, rows: List[bytes]) -> bytes:
+    """Minimal RGB PNG encoder (keeps the fake provider free of Pillow)"""
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    raw = b"".join(b"\x00" + row for row in rows)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(raw, 6))
+        + chunk(b"IEND", b"")
+    )
+
+
+class FakeProviderError(Exception):
+    """Simulated provider failure; the message mimics the real upstream error"""
+
+
+class FakeProvider(ImageProvider):
+    """
+    Offline provider for load tests: returns deterministic synthetic PNGs
+    (same prompt -> same bytes) after a simulated latency.
+
+    Configured through env vars:
+      FAKE_IMAGE_LATENCY     fixed:<ms> | uniform:<min_ms>,<max_ms> | lognormal:<median_ms>,<sigma>
+      FAKE_IMAGE_ERROR_RATE  probability a call raises (0-1)
+      FAKE_IMAGE_ERRORS      comma list of error kinds to raise: rate_limit, timeout, refusal, transport
+      FAKE_IMAGE_EMPTY_RATE  probability a call returns text only (no image)
+      FAKE_IMAGE_SIZE        <width>x<height> of generated PNGs
+      FAKE_IMAGE_NOISE       1 to add low-bit noise so PNGs are photo-sized (MBs, not KBs)
+      FAKE_IMAGE_SEED        seed for latency/error sampling
+    """
+
+    name = "fake"
+
+    ERROR_MESSAGES = {
+        "rate_limit": "429 Too Many Requests: RESOURCE_EXHAUSTED (simulated)",
+        "timeout": "Request timed out (simulated)",
+        "refusal": "The response was blocked due to SAFETY (simulated)",
+        "transport": "Connection reset by peer (simulated)",
+    }
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        latency: Optional[str] = None,
+        error_rate: Optional[float] = None,
+        errors: Optional[str] = None,
+        empty_rate: Optional[float] = None,
+        size: Optional[str] = None,
+        noise: Optional[bool] = None,
+        seed: Optional[int] = None,
+    ):
+        super().__init__()
+        self.latency = self._parse_latency(latency or os.getenv("FAKE_IMAGE_LATENCY", "lognormal:2000,0.5"))
+        self.error_rate = float(error_rate if error_rate is not None else os.getenv("FAKE_IMAGE_ERROR_RATE", "0"))
+        self.error_kinds = [
+            k.strip() for k in (errors or os.getenv("FAKE_IMAGE_ERRORS", "rate_limit,timeout,transport")).split(",")
+            if k.strip()
+        ]
+        self.empty_rate = float(empty_rate if empty_rate is not None else os.getenv("FAKE_IMAGE_EMPTY_RATE", "0"))
+        width, height = (size or os.getenv("FAKE_IMAGE_SIZE", "1024x576")).lower().split("x")
+        self.width, self.height = int(width), int(height)
+        self.noise = noise if noise is not None else os.getenv("FAKE_IMAGE_NOISE", "0") == "1"
+        self._rng = random.Random(seed if seed is not None else int(os.getenv("FAKE_IMAGE_SEED", "365")))
+
+    @staticmethod
+    def _parse_latency(spec: str) -> Tuple[str, List[float]]:
+        kind, _, args = spec.partition(":")
+        params = [float(a) for a in args.split(",") if a]
+        if kind not in ("fixed", "uniform", "lognormal") or not params:
+            raise ValueError(f"Invalid FAKE_IMAGE_LATENCY '{spec}'")
+        return kind, params
+
+    def sample_latency(self) -> float:
+        """Seconds to wait before answering"""
+        kind, params = self.latency
+        if kind == "fixed":
+            ms = params[0]
+        elif kind == "uniform":
+            ms = self._rng.uniform(params[0], params[1])
+        else:
+            median, sigma = params[0], params[1] if len(params) > 1 else 0.5
+            ms = self._rng.lognormvariate(0, sigma) * median
+        return ms / 1000.0
+
+    def render(self, prompt: str) -> bytes:
+        """Deterministic PNG for a prompt: a 4x4 grid of prompt-derived colors"""
+        digest = hashlib.sha256(prompt.encode()).digest()
+        digest += hashlib.sha256(digest).digest()
+        palette = [digest[i * 3:i * 3 + 3] for i in range(16)]
+        cell_w, cell_h = -(-self.width // 4), -(-self.height // 4)
+        band_rows = []
+        for band in range(4):
+            row = b"".join(palette[band * 4 + (x // cell_w)] for x in range(self.width))
+            band_rows.append(row)
+        rows = [band_rows[min(y // cell_h, 3)] for y in range(self.height)]
+        if self.noise:
+            noise_rng = random.Random(digest)
+            row_len = self.width * 3
+            low_bits = bytes(range(16)) * 16  # translate table: keep the low 4 bits
+            rows = [
+                (int.from_bytes(row, "big") ^ int.from_bytes(noise_rng.randbytes(row_len).translate(low_bits), "big"))
+                .to_bytes(row_len, "big")
+                for row in rows
+            ]
+        return _png(self.width, self.height, rows)
+
+    async def generate(self, prompt: str) -> Optional[dict]:
+        self.calls += 1
+        await asyncio.sleep(self.sample_latency())
+
+        if self.error_kinds and self._rng.random() < self.error_rate:
+            self.errors += 1
+            kind = self._rng.choice(self.error_kinds)
+            if kind == "timeout":
+                raise asyncio.TimeoutError(self.ERROR_MESSAGES[kind])
+            raise FakeProviderError(self.ERROR_MESSAGES.get(kind, kind))
+
+        if self._rng.random() < self.empty_rate:
+            return None
+
+        png = await asyncio.to_thread(self.render, prompt)
+        self.images += 1
+        return {
+            "data": base64.b64encode(png).decode("ascii"),
+            "mime_type": "image/png",
+            "text_response": f"[fake] {prompt[:60]}",
+        }
+
+
+PROVIDERS: Dict[str, Type[ImageProvider]] = {
+    NanoBananaProvider.name: NanoBananaProvider,
+    FakeProvider.name: FakeProvider,
+}
+
+_instances: Dict[str, ImageProvider] = {}
+
+
+def get_provider(name: Optional[str] = None) -> ImageProvider:
+    """Shared provider instance for a name, configured from the environment"""
+    name = name or os.getenv("IMAGE_PROVIDER", NanoBananaProvider.name)
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown image provider '{name}' (available: {', '.join(PROVIDERS)})")
+
+    if name not in _instances:
+        _instances[name] = PROVIDERS[name]()
+    return _instances[name]
+
+
+@asynccontextmanager
+async def request_provider(api_key: Optional[str] = None, name: Optional[str] = None):
+    """
+    Provider for one request. Without an API key (or with the environment's
+    own key) this is the shared provider. Any other key gets its own provider,
+    closed on exit, so arbitrary keys in request bodies never pile up in
+    _instances.
+    """
+    shared = get_provider(name)
+    if not api_key or api_key == getattr(shared, "api_key", None):
+        yield shared
+        return
+
+    provider = type(shared).for_request(api_key)
+    try:
+        yield provider
+    finally:
+        await provider.close()
+
+
+async def close_providers():
+    for provider in list(_instances.values()):
+        await provider.close()
+    _instances.clear()
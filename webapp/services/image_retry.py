@@ -0,0 +1,172 @@
+"""
+Image Generation Retries
+Classifies provider failures, retries them with per-class policies and
+jittered exponential backoff, and optionally hedges slow calls with a
+duplicate request once they pass a latency percentile.
+
+Error classes: rate_limit, timeout, refusal, transport, empty (answered
+without an image), unknown.
+"""
+
+import asyncio
+import os
+import random
+import re
+import time
+from collections import Counter, deque
+from typing import Dict, Optional, Tuple
+
+PROVIDER_TIMEOUT = float(os.getenv("IMAGE_PROVIDER_TIMEOUT", "90"))
+MAX_TOTAL_ATTEMPTS = int(os.getenv("IMAGE_MAX_ATTEMPTS", "5"))
+# Hedge a call once it is slower than this percentile of recent successes (0 disables)
+HEDGE_PERCENTILE = float(os.getenv("IMAGE_HEDGE_PERCENTILE", "0"))
+HEDGE_MIN_SAMPLES = int(os.getenv("IMAGE_HEDGE_MIN_SAMPLES", "20"))
+
+_PATTERNS = [
+    ("rate_limit", re.compile(r"\b429\b|rate.?limit|too many requests|resource_exhausted|quota", re.I)),
+    ("refusal", re.compile(r"safety|blocked|refus|policy|prohibited|content filter", re.I)),
+    ("timeout", re.compile(r"timed? ?out|timeout|deadline", re.I)),
+    ("transport", re.compile(r"connect|reset by peer|broken pipe|\b50[234]\b|unavailable|network|eof", re.I)),
+]
+
+
+def classify_error(error: BaseException) -> str:
+    if isinstance(error, asyncio.TimeoutError):
+        return "timeout"
+    message = f"{type(error).__name__}: {error}"
+    for error_class, pattern in _PATTERNS:
+        if pattern.search(message):
+            return error_class
+    if isinstance(error, (ConnectionError, OSError)):
+        return "transport"
+    return "unknown"
+
+
+class RetryPolicy:
+    """How often to retry an error class and how long to back off"""
+
+    def __init__(self, max_attempts: int, base_delay: float = 0.5, max_delay: float = 10.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given (1-based) attempt"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+
+RETRY_POLICIES: Dict[str, RetryPolicy] = {
+    "rate_limit": RetryPolicy(max_attempts=4, base_delay=2.0, max_delay=20.0),
+    "timeout": RetryPolicy(max_attempts=2, base_delay=1.0, max_delay=5.0),
+    "transport": RetryPolicy(max_attempts=3, base_delay=0.5, max_delay=5.0),
+    "empty": RetryPolicy(max_attempts=2, base_delay=0.2, max_delay=1.0),
+    "refusal": RetryPolicy(max_attempts=1),  # same prompt will be refused again
+    "unknown": RetryPolicy(max_attempts=2, base_delay=1.0, max_delay=5.0),
+}
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies for one provider"""
+
+    def __init__(self, window: int = 200):
+        self.samples = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        k = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+        return ordered[k]
+
+    def hedge_delay(self) -> Optional[float]:
+        if HEDGE_PERCENTILE <= 0 or len(self.samples) < HEDGE_MIN_SAMPLES:
+            return None
+        return self.percentile(HEDGE_PERCENTILE)
+
+
+_trackers: Dict[str, LatencyTracker] = {}
+
+
+def get_latency_tracker(provider_name: str) -> LatencyTracker:
+    if provider_name not in _trackers:
+        _trackers[provider_name] = LatencyTracker()
+    return _trackers[provider_name]
+
+
+async def _timed_call(provider, prompt: str, timeout: float, tracker: LatencyTracker) -> Optional[dict]:
+    start = time.monotonic()
+    result = await asyncio.wait_for(provider.generate(prompt), timeout)
+    if result:
+        tracker.record(time.monotonic() - start)
+    return result
+
+
+async def _hedged_call(provider, prompt: str, timeout: float) -> Tuple[Optional[dict], bool]:
+    """
+    Run one call; if it outlives the hedge delay, race a duplicate against it
+    and take the first image. Returns (result, hedged).
+    """
+    tracker = get_latency_tracker(provider.name)
+    delay = tracker.hedge_delay()
+    primary = asyncio.ensure_future(_timed_call(provider, prompt, timeout, tracker))
+    if delay is None:
+        return await primary, False
+
+    done, _ = await asyncio.wait({primary}, timeout=delay)
+    if done:
+        return primary.result(), False
+
+    pending = {primary, asyncio.ensure_future(_timed_call(provider, prompt, timeout, tracker))}
+    error: Optional[BaseException] = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None:
+                    error = task.exception()
+                elif task.result():
+                    return task.result(), True
+    finally:
+        for task in pending:
+            task.cancel()
+    if error is not None:
+        raise error
+    return None, True
+
+
+async def generate_with_retry(provider, prompt: str, timeout: float = PROVIDER_TIMEOUT) -> Tuple[Optional[dict], dict]:
+    """
+    Generate one image, retrying per error class. Returns (result, outcome)
+    where outcome = {"attempts", "retries", "hedged", "error_class", "errors"}
+    and error_class is set only when every attempt failed.
+    """
+    outcome = {"attempts": 0, "retries": 0, "hedged": False, "error_class": None, "errors": Counter()}
+    per_class = Counter()
+
+    while True:
+        outcome["attempts"] += 1
+        try:
+            result, hedged = await _hedged_call(provider, prompt, timeout)
+            outcome["hedged"] = outcome["hedged"] or hedged
+            if result:
+                outcome["error_class"] = None
+                return result, outcome
+            error_class = "empty"
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            error_class = classify_error(e)
+            print(f"WARN: image generation failed ({error_class}, attempt {outcome['attempts']}): {e}")
+
+        outcome["error_class"] = error_class
+        outcome["errors"][error_class] += 1
+        per_class[error_class] += 1
+        policy = RETRY_POLICIES.get(error_class, RETRY_POLICIES["unknown"])
+        if per_class[error_class] >= policy.max_attempts or outcome["attempts"] >= MAX_TOTAL_ATTEMPTS:
+            return None, outcome
+
+        outcome["retries"] += 1
+        await asyncio.sleep(policy.delay(per_class[error_class]))
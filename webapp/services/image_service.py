@@ -1,27 +1,74 @@
 """
 Blog Image Generation Service
-Uses Nano Banana (Gemini) for AI image generation
+Single warm process serving both image endpoint shapes:
+  POST /api/generate-image  - multiple prompt variations (blog polish)
+  POST /generate            - single image (legacy Nano Banana service shape)
+Image backends live in image_providers.py and are shared across requests.
 """
 
 import asyncio
 import os
 import base64
+import resource
 import uuid
-from typing import List, Optional
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Tuple
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 
+from image_dedupe import (
+    DEDUPE_DISTANCE,
+    close_image_cache,
+    get_image_cache,
+    hash_to_hex,
+    image_hash,
+    is_near_duplicate,
+)
+from deferred_imports import import_status, start_background_imports
+from image_providers import NanoBananaProvider, close_providers, get_provider, request_provider
+from image_retry import generate_with_retry
+
 # Load environment variables
 load_dotenv('/app/webapp/.env.local')
 
-app = FastAPI(title="GreenLine365 Image Service")
+# Where responsive derivatives (WebP/AVIF widths + manifest) are written, named by
+# content hash and capped at IMAGE_DERIVATIVES_MAX_ENTRIES sets (image_derivatives.py)
+DERIVATIVES_DIR = os.getenv("IMAGE_DERIVATIVES_DIR", "/app/webapp/public/images/generated")
+
+# Extra generation rounds used to replace near-duplicate variations
+DEDUPE_REGENERATE = int(os.getenv("IMAGE_DEDUPE_REGENERATE", "1"))
+
+CORS_ORIGINS = os.getenv(
+    "IMAGE_SERVICE_CORS_ORIGINS", "http://localhost:3000,https://greenline365.com"
+).split(",")
+
+async def warm_provider():
+    try:
+        await get_provider().start()
+    except Exception as e:
+        print(f"WARN: image provider not ready at startup: {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Heavy SDK imports and provider warm-up run in the background so uvicorn
+    # binds the port (and /health answers) without waiting for them; a request
+    # that arrives first simply awaits the same import
+    start_background_imports()
+    warmup = asyncio.create_task(warm_provider())
+    yield
+    warmup.cancel()
+    await close_providers()
+    close_image_cache()
+
+app = FastAPI(title="GreenLine365 Image Service", lifespan=lifespan)
 
 # CORS for Next.js frontend
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["http://localhost:3000", "https://greenline365.com"],
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -31,111 +78,238 @@ class GenerateRequest(BaseModel):
     prompt: str
     count: int = 3
     style: str = "professional"
+    derivatives: bool = False  # also build WebP/AVIF srcset derivatives
+    reuse_cached: bool = False  # serve distinct cached images for this prompt before calling the provider
 
 class GeneratedImage(BaseModel):
     id: str
     data: str  # base64 encoded
     mime_type: str
     prompt: str
+    manifest: Optional[dict] = None  # srcset manifest when derivatives were requested
+    phash: Optional[str] = None  # 64-bit perceptual hash (hex)
+    cached: bool = False
+
+class GenerationStats(BaseModel):
+    requested: int = 0
+    returned: int = 0
+    retried: int = 0  # provider retries across all variations
+    failed: int = 0  # variations that produced no image after retries
+    hedged: int = 0  # variations that raced a hedged duplicate call
+    errors: Dict[str, int] = Field(default_factory=dict)  # error class -> occurrences (including retried ones)
 
 class GenerateResponse(BaseModel):
     success: bool
     images: List[GeneratedImage]
     message: Optional[str] = None
+    cached: int = 0  # images served from the image cache
+    duplicates_dropped: int = 0  # near-duplicate variations discarded
+    stats: GenerationStats = Field(default_factory=GenerationStats)
 
-async def generate_with_nano_banana(prompt: str) -> Optional[dict]:
-    """Generate a single image using Nano Banana"""
-    try:
-        from emergentintegrations.llm.chat import LlmChat, UserMessage
-        
-        api_key = os.getenv("EMERGENT_LLM_KEY")
-        if not api_key:
-            print("ERROR: EMERGENT_LLM_KEY not found")
-            return None
-        
-        # Create new chat instance for each generation
-        session_id = f"blog-img-{uuid.uuid4().hex[:8]}"
-        chat = LlmChat(
-            api_key=api_key,
-            session_id=session_id,
-            system_message="You are an expert image generator. Create high-quality, professional images for blog posts."
-        )
-        
-        # Configure for Nano Banana
-        chat.with_model("gemini", "gemini-3-pro-image-preview").with_params(modalities=["image", "text"])
-        
-        # Generate image
-        msg = UserMessage(text=prompt)
-        text_response, images = await chat.send_message_multimodal_response(msg)
-        
-        if images and len(images) > 0:
-            img = images[0]
-            return {
-                "id": uuid.uuid4().hex,
-                "data": img['data'][:50] + "..." if len(img['data']) > 50 else img['data'],  # Truncate for logging
-                "full_data": img['data'],
-                "mime_type": img.get('mime_type', 'image/png'),
-                "text_response": text_response
-            }
-        
-        return None
-        
-    except Exception as e:
-        print(f"ERROR generating image: {str(e)}")
-        return None
+class SingleGenerateRequest(BaseModel):
+    prompt: str
+    api_key: Optional[str] = None
+
+class SingleGenerateResponse(BaseModel):
+    success: bool
+    image: Optional[str] = None
+    mime_type: str = "image/png"
+    error: Optional[str] = None
+
+async def generate_single_image(prompt: str, api_key: Optional[str] = None) -> Tuple[Optional[dict], dict]:
+    """Generate a single image with the configured provider, retrying transient errors"""
+    async with request_provider(api_key) as provider:
+        result, outcome = await generate_with_retry(provider, prompt)
+    if result:
+        return {"id": uuid.uuid4().hex, **result}, outcome
+    print(f"ERROR generating image: gave up after {outcome['attempts']} attempts ({outcome['error_class']})")
+    return None, outcome
+
+async def build_image_derivatives(image: GeneratedImage) -> dict:
+    """Encode WebP/AVIF derivatives for a generated image off the event loop (reused for repeat images)"""
+    from image_derivatives import build_generated_derivatives
+
+    return await asyncio.to_thread(build_generated_derivatives, base64.b64decode(image.data), DERIVATIVES_DIR)
+
+def prompt_variations(prompt: str) -> List[str]:
+    """Slight prompt variations for different results"""
+    return [
+        prompt,
+        f"{prompt} Alternative composition.",
+        f"{prompt} Different angle or perspective.",
+        f"{prompt} More detailed version.",
+        f"{prompt} Simplified, cleaner version.",
+    ]
+
+# Appended when a variation comes back as a near-duplicate of one already kept
+REGENERATE_SUFFIXES = [
+    " Distinctly different color palette and composition.",
+    " Completely different viewpoint and framing.",
+    " Different time of day and lighting.",
+]
+
+def hash_images(results: List[dict]) -> List[Optional[int]]:
+    hashes = []
+    for result in results:
+        try:
+            hashes.append(image_hash(base64.b64decode(result['data'])))
+        except Exception as e:
+            print(f"WARN: could not hash image {result['id']}: {e}")
+            hashes.append(None)
+    return hashes
+
+def cache_images(prompt: str, images: List["GeneratedImage"]):
+    cache = get_image_cache()
+    for img in images:
+        cache.store(prompt, img.id, base64.b64decode(img.data), img.mime_type, int(img.phash, 16))
 
 @app.post("/api/generate-image", response_model=GenerateResponse)
 async def generate_images(request: GenerateRequest):
     """Generate multiple images from a prompt"""
-    
+
     if not request.prompt:
         raise HTTPException(status_code=400, detail="Prompt is required")
-    
+
     count = min(max(request.count, 1), 5)  # Limit to 1-5 images
-    
-    # Generate images concurrently
-    tasks = []
-    for i in range(count):
-        # Vary the prompt slightly for different results
-        variations = [
-            request.prompt,
-            f"{request.prompt} Alternative composition.",
-            f"{request.prompt} Different angle or perspective.",
-            f"{request.prompt} More detailed version.",
-            f"{request.prompt} Simplified, cleaner version.",
-        ]
-        prompt_variation = variations[i % len(variations)]
-        tasks.append(generate_with_nano_banana(prompt_variation))
-    
-    results = await asyncio.gather(*tasks, return_exceptions=True)
-    
-    images = []
-    for result in results:
-        if isinstance(result, dict) and result.get('full_data'):
+
+    images: List[GeneratedImage] = []
+    kept_hashes: List[int] = []
+    cached_count = 0
+
+    if request.reuse_cached:
+        for hit in await asyncio.to_thread(get_image_cache().lookup, request.prompt, count):
             images.append(GeneratedImage(
+                id=hit['id'],
+                data=hit['data'],
+                mime_type=hit['mime_type'],
+                prompt=request.prompt,
+                phash=hash_to_hex(hit['hash']),
+                cached=True,
+            ))
+            kept_hashes.append(hit['hash'])
+        cached_count = len(images)
+
+    variations = prompt_variations(request.prompt)
+    pending = [variations[i % len(variations)] for i in range(cached_count, count)]
+    duplicates = 0
+    fresh: List[GeneratedImage] = []
+    stats = GenerationStats(requested=count)
+    errors: Counter = Counter()
+
+    # Generate concurrently; near-duplicates of kept images are regenerated
+    # with a stronger variation for up to DEDUPE_REGENERATE extra rounds
+    for round_no in range(DEDUPE_REGENERATE + 1):
+        if not pending:
+            break
+        results = await asyncio.gather(*(generate_single_image(p) for p in pending))
+        completed = []
+        for result, outcome in results:
+            stats.retried += outcome['retries']
+            stats.hedged += int(outcome['hedged'])
+            errors.update(outcome['errors'])
+            if result and result.get('data'):
+                completed.append(result)
+            else:
+                stats.failed += 1
+        hashes = await asyncio.to_thread(hash_images, completed)
+
+        rejected = 0
+        for result, value in zip(completed, hashes):
+            if value is not None and is_near_duplicate(value, kept_hashes, DEDUPE_DISTANCE):
+                rejected += 1
+                continue
+            if value is not None:
+                kept_hashes.append(value)
+            fresh.append(GeneratedImage(
                 id=result['id'],
-                data=result['full_data'],
+                data=result['data'],
                 mime_type=result['mime_type'],
-                prompt=request.prompt
+                prompt=request.prompt,
+                phash=hash_to_hex(value) if value is not None else None,
             ))
-    
+
+        duplicates += rejected
+        pending = [
+            f"{request.prompt}{REGENERATE_SUFFIXES[(round_no + i) % len(REGENERATE_SUFFIXES)]}"
+            for i in range(rejected)
+        ]
+
+    if fresh:
+        try:
+            await asyncio.to_thread(cache_images, request.prompt, [img for img in fresh if img.phash])
+        except Exception as e:
+            print(f"WARN: image cache write failed: {e}")
+    images.extend(fresh)
+    stats.returned = len(images)
+    stats.errors = dict(errors)
+
+    if request.derivatives and images:
+        manifests = await asyncio.gather(
+            *(build_image_derivatives(img) for img in images), return_exceptions=True
+        )
+        for img, manifest in zip(images, manifests):
+            if isinstance(manifest, dict):
+                img.manifest = manifest
+            else:
+                print(f"ERROR building derivatives for {img.id}: {manifest}")
+
     if not images:
         return GenerateResponse(
             success=False,
             images=[],
-            message="Failed to generate images. Please try again."
+            message="Failed to generate images. Please try again.",
+            duplicates_dropped=duplicates,
+            stats=stats,
         )
-    
+
+    message = f"Generated {len(images)} images successfully"
+    if len(images) < count:
+        message = f"Generated {len(images)} of {count} images ({stats.failed} failed, {duplicates} duplicates dropped)"
+
     return GenerateResponse(
         success=True,
         images=images,
-        message=f"Generated {len(images)} images successfully"
+        message=message,
+        cached=cached_count,
+        duplicates_dropped=duplicates,
+        stats=stats,
+    )
+
+@app.post("/generate", response_model=SingleGenerateResponse)
+async def generate_image(request: SingleGenerateRequest):
+    """Generate one image (request/response shape of the old Nano Banana service)"""
+
+    async with request_provider(request.api_key) as provider:
+        if isinstance(provider, NanoBananaProvider) and not provider.api_key:
+            raise HTTPException(status_code=500, detail="API key not configured")
+        result, outcome = await generate_with_retry(provider, request.prompt)
+
+    if result:
+        return SingleGenerateResponse(
+            success=True,
+            image=result['data'],
+            mime_type=result['mime_type']
+        )
+
+    if outcome['error_class'] == "empty":
+        return SingleGenerateResponse(success=False, error="No image generated")
+    return SingleGenerateResponse(
+        success=False,
+        error=f"Image generation failed ({outcome['error_class']}) after {outcome['attempts']} attempts"
     )
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "service": "image-generation"}
+    provider = get_provider()
+    return {
+        "status": "healthy",
+        "service": "image-generation",
+        "provider": provider.name,
+        "provider_stats": provider.stats(),
+        "deferred_imports": import_status(),
+        "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,42 @@
+-- ============================================================
+-- GREENLINE365 — KEYSET SYNC INDEXES
+-- ============================================================
+-- The bulk loading scripts keep a local index of directory
+-- listings and CRM leads, synced incrementally with
+-- ORDER BY updated_at, id and an (updated_at, id) > watermark
+-- filter. These composite indexes keep each page an index range
+-- scan instead of a sort over the whole table.
+-- directory_listings also gets an updated_at trigger (crm_leads
+-- already has one) so every edit moves the row past the watermark.
+-- Safe to re-run: all IF NOT EXISTS.
+-- ============================================================
+
+DO $$ BEGIN
+  IF EXISTS (SELECT FROM pg_tables WHERE schemaname='public' AND tablename='directory_listings') THEN
+    CREATE INDEX IF NOT EXISTS idx_dir_listings_updated_id ON directory_listings(updated_at, id);
+  END IF;
+END $$;
+
+CREATE OR REPLACE FUNCTION update_directory_listings_updated_at()
+RETURNS TRIGGER AS $$
+BEGIN
+  NEW.updated_at = now();
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$ BEGIN
+  IF EXISTS (SELECT FROM pg_tables WHERE schemaname='public' AND tablename='directory_listings') THEN
+    DROP TRIGGER IF EXISTS trigger_directory_listings_updated_at ON directory_listings;
+    CREATE TRIGGER trigger_directory_listings_updated_at
+      BEFORE UPDATE ON directory_listings
+      FOR EACH ROW
+      EXECUTE FUNCTION update_directory_listings_updated_at();
+  END IF;
+END $$;
+
+DO $$ BEGIN
+  IF EXISTS (SELECT FROM pg_tables WHERE schemaname='public' AND tablename='crm_leads') THEN
+    CREATE INDEX IF NOT EXISTS idx_crm_leads_updated_id ON crm_leads(updated_at, id);
+  END IF;
+END $$;
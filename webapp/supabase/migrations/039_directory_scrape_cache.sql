@@ -0,0 +1,29 @@
+-- Migration 039: Per-URL scrape cache for conditional directory re-scrapes
+-- /api/directory/scrape(/bulk) keeps each website's HTTP validators (ETag,
+-- Last-Modified), a hash of the normalized page text and the last AI
+-- extraction. A re-scrape sends a conditional request; on 304 or an
+-- unchanged hash the cached extraction is reused (no LLM call) and the
+-- listing is left untouched.
+
+CREATE TABLE IF NOT EXISTS directory_scrape_cache (
+  url TEXT PRIMARY KEY,
+  listing_id UUID REFERENCES directory_listings(id) ON DELETE SET NULL,
+  etag TEXT,
+  last_modified TEXT,
+  content_hash TEXT,
+  extracted JSONB DEFAULT '{}'::jsonb,
+  fetched_at TIMESTAMPTZ,           -- last full (200) fetch
+  checked_at TIMESTAMPTZ DEFAULT NOW(),
+  hits INTEGER DEFAULT 0            -- re-scrapes answered from the cache
+);
+
+CREATE INDEX IF NOT EXISTS idx_directory_scrape_cache_listing
+  ON directory_scrape_cache(listing_id);
+
+ALTER TABLE directory_scrape_cache ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "service_role_full_access_directory_scrape_cache" ON directory_scrape_cache;
+CREATE POLICY "service_role_full_access_directory_scrape_cache"
+  ON directory_scrape_cache FOR ALL
+  USING (auth.role() = 'service_role')
+  WITH CHECK (auth.role() = 'service_role');
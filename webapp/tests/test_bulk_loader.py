@@ -0,0 +1,474 @@
+"""
+GreenLine365 Bulk Loader Tests (offline)
+Runs the async directory bulk loader against a mocked scrape API / Supabase
+"""
+
+import asyncio
+import gzip
+import json
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+httpx = pytest.importorskip("httpx")
+import bulk_input
+import bulk_loader
+from bulk_loader import AdaptiveRateLimiter, DomainPoliteness
+from load_stats import LoadStats
+from scrape_journal import ScrapeJournal
+
+
+def make_opts(**overrides):
+    opts = bulk_loader.parse_args(["--input", "businesses.csv", "--rate", "200", "--max-rate", "400",
+                                   "--domain-interval", "0", "--concurrency", "8"])
+    opts.city, opts.state, opts.tag, opts.skip_domains = "Tampa", "FL", "test_batch", []
+    opts.no_journal = True
+    opts.index = ":memory:"
+    opts.dead_letters = ":memory:"
+    opts.no_stats = True
+    opts.batch_size = 0  # one request per business unless a test opts into the bulk endpoint
+    for key, value in overrides.items():
+        setattr(opts, key, value)
+    return opts
+
+
+class FakeBackend:
+    """Scrape API + Supabase REST stand-in for httpx.MockTransport"""
+
+    def __init__(self, throttle_first=0, existing=(), fail_names=(), crm_down=False, emails=(), cut_stream_after=None,
+                 unchanged=()):
+        self.throttle_first = throttle_first
+        self.unchanged = set(unchanged)  # websites whose page matches the server's scrape cache
+        self.cut_stream_after = cut_stream_after
+        self.batches = []
+        self.existing = list(existing)
+        self.emails = list(emails)
+        self.fail_names = set(fail_names)
+        self.crm_down = crm_down
+        self.scrapes = []
+        self.leads = []
+        self.lead_prefers = []
+        self.in_flight = {}
+        self.max_in_flight_per_domain = 0
+        self.batch_domains = {}  # domain -> batches in flight that contain it
+        self.max_batches_per_domain = 0
+        self.domain_intervals = set()
+
+    def _listing(self, item):
+        self.scrapes.append(item)
+        return {"id": str(len(self.scrapes)), "business_name": item["fallback_name"], "website": item["url"]}
+
+    async def _stream(self, items, domains=()):
+        try:
+            async for line in self._lines(items):
+                yield line
+        finally:
+            for domain in domains:
+                self.batch_domains[domain] -= 1
+
+    async def _lines(self, items):
+        for index, item in enumerate(items):
+            if self.cut_stream_after is not None and index == self.cut_stream_after:
+                self.cut_stream_after = None
+                raise httpx.ReadError("connection reset mid-stream")
+            await asyncio.sleep(0.001)
+            if item["fallback_name"] in self.fail_names:
+                line = {"type": "result", "index": index, "status": "error", "listing": None, "error": "scrape failed"}
+            else:
+                line = {"type": "result", "index": index, "status": "ok", "listing": self._listing(item), "error": None,
+                        "cache": "hash" if item["url"] in self.unchanged else "miss",
+                        "action": "unchanged" if item["url"] in self.unchanged else "created",
+                        "timings": {"fetch_ms": 120, "llm_ms": 0 if item["url"] in self.unchanged else 900, "db_ms": 30}}
+            yield (json.dumps(line) + "\n").encode()
+        yield (json.dumps({"type": "summary", "total": len(items)}) + "\n").encode()
+
+    async def handler(self, request):
+        if request.url.path == "/api/directory/scrape/bulk":
+            body = json.loads(request.content)
+            assert request.headers["accept"] == "application/x-ndjson"
+            if self.throttle_first > 0:
+                self.throttle_first -= 1
+                return httpx.Response(429, headers={"retry-after": "0"}, json={"error": "slow down"})
+            self.batches.append(len(body["items"]))
+            self.domain_intervals.add(body.get("domain_interval"))
+            domains = {item["url"].split("//")[1].split("/")[0] for item in body["items"]}
+            for domain in domains:
+                self.batch_domains[domain] = self.batch_domains.get(domain, 0) + 1
+                self.max_batches_per_domain = max(self.max_batches_per_domain, self.batch_domains[domain])
+            return httpx.Response(200, headers={"content-type": "application/x-ndjson"},
+                                  content=self._stream(body["items"], domains))
+        if request.url.path == "/api/directory/scrape":
+            body = json.loads(request.content)
+            domain = body["url"].split("//")[1].split("/")[0]
+            self.in_flight[domain] = self.in_flight.get(domain, 0) + 1
+            self.max_in_flight_per_domain = max(self.max_in_flight_per_domain, self.in_flight[domain])
+            await asyncio.sleep(0.01)
+            self.in_flight[domain] -= 1
+            if self.throttle_first > 0:
+                self.throttle_first -= 1
+                return httpx.Response(429, headers={"retry-after": "0"}, json={"error": "slow down"})
+            if body["fallback_name"] in self.fail_names:
+                return httpx.Response(422, json={"error": "scrape failed"})
+            return httpx.Response(201, json={"success": True, "listing": self._listing(body)})
+        if request.url.path == "/rest/v1/directory_listings":
+            return httpx.Response(200, json=[
+                {"id": f"l{i}", "website": w, "business_name": f"Listing {i}", "city": "Tampa",
+                 "updated_at": "2026-02-06T12:00:00+00:00"} for i, w in enumerate(self.existing)])
+        if request.url.path == "/rest/v1/crm_leads" and request.method == "GET":
+            return httpx.Response(200, json=[
+                {"id": f"c{i}", "email": e, "updated_at": "2026-02-06T12:00:00+00:00"} for i, e in enumerate(self.emails)])
+        if request.url.path == "/rest/v1/crm_leads":
+            if self.crm_down:
+                return httpx.Response(503, json={"message": "unavailable"})
+            body = json.loads(request.content)
+            rows = body if isinstance(body, list) else [body]
+            self.lead_prefers.append(request.headers.get("prefer", ""))
+            stored = set(self.emails) | {lead["email"] for lead in self.leads}
+            self.leads.extend(rows)
+            # on_conflict=email with ignore-duplicates: existing leads are left out of the representation
+            return httpx.Response(201, json=[{"email": row["email"]} for row in rows if row["email"] not in stored])
+        return httpx.Response(404)
+
+
+ITEMS = [
+    {"name": "Alpha Plumbing", "industry": "plumbing", "url": "alpha.com"},
+    {"name": "Bravo HVAC", "industry": "hvac", "url": "bravo.com"},
+    {"name": "Charlie Roofing", "industry": "roofing", "url": "www.charlie.com"},
+    {"name": "Dunedin Blue Jays", "industry": "general", "url": "milb.com/dunedin"},
+    {"name": "Clearwater Threshers", "industry": "general", "url": "milb.com/clearwater"},
+]
+
+
+class TestRateLimiting:
+    """Adaptive rate and per-domain politeness"""
+
+    def test_limiter_halves_on_throttle_and_recovers(self):
+        limiter = AdaptiveRateLimiter(rate=8, min_rate=1, max_rate=10, increase=1)
+        limiter.on_throttle()
+        assert limiter.rate == 4
+        limiter.on_success()
+        assert limiter.rate == 5
+        for _ in range(20):
+            limiter.on_success()
+        assert limiter.rate == 10
+        print("✓ AIMD rate: 8 -> 4 -> 5 -> capped at 10")
+
+    def test_domain_politeness_spaces_requests(self):
+        polite = DomainPoliteness(interval=0.05)
+        stamps = []
+
+        async def hit():
+            stamps.append(time.monotonic())
+
+        async def run():
+            await asyncio.gather(*(polite("milb.com", hit) for _ in range(3)))
+
+        asyncio.run(run())
+        gaps = [b - a for a, b in zip(stamps, stamps[1:])]
+        assert all(g >= 0.045 for g in gaps)
+        print(f"✓ Same-domain gaps: {[round(g, 3) for g in gaps]}")
+
+
+class TestBulkRun:
+    """End-to-end loader run against the fake backend"""
+
+    def test_loads_all_with_crm_and_retries_429(self):
+        backend = FakeBackend(throttle_first=2)
+        opts = make_opts(crm=True)
+        counts = asyncio.run(bulk_loader.run(ITEMS, opts, transport=httpx.MockTransport(backend.handler)))
+
+        assert counts == {"ok": 5, "fallback": 0, "error": 0}
+        assert len(backend.scrapes) == 5
+        assert len(backend.leads) == 5
+        assert backend.max_in_flight_per_domain == 1  # milb.com never hit concurrently
+        assert "test_batch" in backend.leads[0]["tags"]
+        print(f"✓ Loaded {counts['ok']} with 2 throttled retries")
+
+    def test_existing_lead_counts_as_exists_not_failure(self, tmp_path):
+        from dead_letters import DeadLetters
+        backend = FakeBackend()
+        dead_letters = DeadLetters(":memory:")
+        path = tmp_path / "stats.json"
+        opts = make_opts(crm=True, no_stats=False, stats_json=str(path))
+        asyncio.run(bulk_loader.run(ITEMS, opts, transport=httpx.MockTransport(backend.handler), dead_letters=dead_letters))
+
+        # Both milb.com teams derive info@milb.com; the second upsert finds the lead already there
+        assert json.loads(path.read_text())["crm"] == {"pushed": 4, "exists": 1}
+        assert all("resolution=ignore-duplicates" in prefer for prefer in backend.lead_prefers)
+        assert dead_letters.counts().get("pending", 0) == 0
+        dead_letters.close()
+        print("✓ Duplicate email counted as existing, nothing dead-lettered")
+
+    def test_dedupe_skips_existing_and_intra_batch(self):
+        backend = FakeBackend(existing=["https://www.alpha.com/"])
+        items = ITEMS + [{"name": "Bravo Again", "industry": "hvac", "url": "https://bravo.com"}]
+        opts = make_opts(dedupe=True, skip_domains=["charlie.com"])
+        counts = asyncio.run(bulk_loader.run(items, opts, transport=httpx.MockTransport(backend.handler)))
+
+        scraped = {s["fallback_name"] for s in backend.scrapes}
+        assert scraped == {"Bravo HVAC", "Dunedin Blue Jays", "Clearwater Threshers"}
+        assert counts["ok"] == 3
+        print(f"✓ Scraped {sorted(scraped)}")
+
+    def test_dedupe_by_name_city_and_known_crm_emails(self):
+        backend = FakeBackend(existing=["https://listing0.example.com"], emails=["info@bravo.com"])
+        items = ITEMS + [{"name": "Listing 0", "industry": "general", "url": "listing-zero.com"},
+                         {"name": "The Alpha Plumbing, LLC", "industry": "plumbing", "url": "alphaplumbing.net"}]
+        opts = make_opts(dedupe=True, crm=True)
+        asyncio.run(bulk_loader.run(items, opts, transport=httpx.MockTransport(backend.handler)))
+
+        scraped = {s["fallback_name"] for s in backend.scrapes}
+        assert "Listing 0" not in scraped  # same name + city as an existing listing
+        assert "The Alpha Plumbing, LLC" not in scraped  # same business as Alpha Plumbing in this batch
+        assert "Bravo HVAC" in scraped
+        assert {lead["email"] for lead in backend.leads} == {"info@alpha.com", "info@charlie.com", "info@milb.com"}
+        print(f"✓ Name+city and CRM email dedupe, {len(backend.leads)} leads pushed")
+
+
+class TestJournalResume:
+    """Checkpoint journal: interrupted runs resume where they stopped"""
+
+    def run_with_journal(self, backend, path, **overrides):
+        opts = make_opts(no_journal=False, journal=str(path), **overrides)
+        return asyncio.run(bulk_loader.run(ITEMS, opts, transport=httpx.MockTransport(backend.handler)))
+
+    def test_rerun_retries_only_failures(self, tmp_path):
+        path = tmp_path / "batch.jsonl"
+        first = FakeBackend(fail_names={"Bravo HVAC", "Dunedin Blue Jays"})
+        counts = self.run_with_journal(first, path)
+        assert counts == {"ok": 3, "fallback": 0, "error": 2}
+
+        second = FakeBackend()
+        counts = self.run_with_journal(second, path)
+        assert counts == {"ok": 2, "fallback": 0, "error": 0}
+        assert {s["fallback_name"] for s in second.scrapes} == {"Bravo HVAC", "Dunedin Blue Jays"}
+
+        third = FakeBackend()
+        assert self.run_with_journal(third, path) == {"ok": 0, "fallback": 0, "error": 0}
+        assert third.scrapes == []
+        print("✓ Second run retried 2 failures, third run was a no-op")
+
+    def test_crm_failure_resumes_without_rescrape(self, tmp_path):
+        path = tmp_path / "batch.jsonl"
+        self.run_with_journal(FakeBackend(crm_down=True), path, crm=True)
+
+        backend = FakeBackend()
+        counts = self.run_with_journal(backend, path, crm=True)
+        assert counts["ok"] == 5
+        assert backend.scrapes == []
+        assert len(backend.leads) == 5
+        assert backend.leads[0]["name"] == "Alpha Plumbing"
+        print("✓ CRM push resumed from journaled listings, no re-scrape")
+
+    def test_replay_ignores_torn_line_and_fresh_starts_over(self, tmp_path):
+        path = tmp_path / "batch.jsonl"
+        journal = ScrapeJournal(str(path))
+        journal.record("alpha.com", "scrape", "ok", name="Alpha Plumbing", listing={"id": "1"})
+        journal.close()
+        with open(path, "a") as f:
+            f.write('{"ts": 1, "key": "bravo.com", "ev')
+
+        replayed = ScrapeJournal(str(path))
+        assert replayed.completed("alpha.com")
+        assert not replayed.completed("bravo.com")
+        replayed.close()
+
+        backend = FakeBackend()
+        self.run_with_journal(backend, path)
+        assert "Alpha Plumbing" not in {s["fallback_name"] for s in backend.scrapes}
+        reopened = ScrapeJournal(str(path))
+        assert reopened.completed("bravo.com")  # appended cleanly after the torn line
+        reopened.close()
+
+        backend = FakeBackend()
+        self.run_with_journal(backend, path, fresh=True)
+        assert len(backend.scrapes) == 5
+        print("✓ Torn line skipped on replay; --fresh re-scrapes everything")
+
+
+class TestStreamingInput:
+    """CSV/JSONL input pipeline: validation, normalization, sharding, bounded read-ahead"""
+
+    def test_csv_and_jsonl_rows_are_validated_and_normalized(self, tmp_path):
+        csv_path = tmp_path / "metro.csv"
+        csv_path.write_text(
+            "Name,Industry,URL,City,State\n"
+            "  Alpha   Plumbing ,Plumbing,https://alpha.com/,Tampa,fl\n"
+            ",hvac,bravo.com,,\n"
+            "Charlie Roofing,,not-a-url,,\n"
+            "Delta Dental,dental,delta.com,,\n"
+        )
+        rejects = []
+        rows = list(bulk_input.iter_businesses(str(csv_path), rejects=rejects))
+        assert rows == [
+            {"name": "Alpha Plumbing", "industry": "plumbing", "url": "https://alpha.com", "city": "Tampa", "state": "FL"},
+            {"name": "Delta Dental", "industry": "dental", "url": "delta.com"},
+        ]
+        assert rejects == [(3, "missing name"), (4, "bad url 'not-a-url'")]
+
+        jsonl_path = tmp_path / "metro.jsonl.gz"
+        with gzip.open(jsonl_path, "wt") as f:
+            f.write(json.dumps({"name": "Echo Spa", "url": "echo.com"}) + "\n\n{oops\n")
+        rejects = []
+        rows = list(bulk_input.iter_businesses(str(jsonl_path), rejects=rejects))
+        assert rows == [{"name": "Echo Spa", "url": "echo.com", "industry": "general"}]
+        assert rejects == [(3, "malformed row")]
+        print("✓ 3 valid rows, 3 rejects with line numbers")
+
+    def test_shards_partition_the_input(self, tmp_path):
+        path = tmp_path / "big.jsonl"
+        with open(path, "w") as f:
+            for i in range(1000):
+                f.write(json.dumps({"name": f"Biz {i}", "url": f"biz{i}.com"}) + "\n")
+
+        shards = [list(bulk_input.iter_businesses(str(path), shard=(i, 4))) for i in range(4)]
+        urls = [b["url"] for shard in shards for b in shard]
+        assert len(urls) == 1000 and len(set(urls)) == 1000
+        assert all(150 < len(shard) < 350 for shard in shards)
+        assert [bulk_input.count_businesses(str(path), (i, 4)) for i in range(4)] == [len(s) for s in shards]
+        assert bulk_input.parse_shard("3/4") == (3, 4)
+        with pytest.raises(ValueError):
+            bulk_input.parse_shard("4/4")
+        print(f"✓ Shard sizes {[len(s) for s in shards]}")
+
+    def test_loader_reads_ahead_a_bounded_window(self):
+        pulled = 0
+        max_ahead = 0
+        backend = FakeBackend()
+
+        def stream():
+            nonlocal pulled, max_ahead
+            for i in range(300):
+                pulled += 1
+                max_ahead = max(max_ahead, pulled - len(backend.scrapes))
+                yield {"name": f"Biz {i}", "industry": "general", "url": f"biz{i}.com"}
+
+        opts = make_opts(concurrency=4)
+        counts = asyncio.run(bulk_loader.run(stream(), opts, transport=httpx.MockTransport(backend.handler)))
+        assert counts["ok"] == 300
+        assert max_ahead <= 4 * 4 + 4 + 1  # queue + in-flight + the row being pushed
+        print(f"✓ 300 streamed rows, never more than {max_ahead} read ahead")
+
+    def test_batch_presets_load_from_data_files(self):
+        opts = bulk_loader.parse_args(["--batch", "batch5"])
+        assert opts.crm and opts.dedupe and opts.tag == "batch_5_ybor"
+        assert "revolve.com" in opts.skip_domains
+        for name in bulk_loader.BATCHES:
+            opts = bulk_loader.parse_args(["--batch", name])
+            rejects = []
+            rows = list(bulk_input.iter_businesses(opts.input, rejects=rejects))
+            assert rows and not rejects
+        print("✓ Preset data files parse cleanly")
+
+
+class TestBatchEndpoint:
+    """Batches through /api/directory/scrape/bulk with streamed NDJSON results"""
+
+    def test_batches_stream_results_into_journal_and_crm(self, tmp_path):
+        items = [{"name": f"Biz {i}", "industry": "general", "url": f"biz{i}.com"} for i in range(23)]
+        backend = FakeBackend(throttle_first=1, fail_names={"Biz 7"})
+        opts = make_opts(batch_size=10, concurrency=2, crm=True, no_journal=False, journal=str(tmp_path / "j.jsonl"))
+        counts = asyncio.run(bulk_loader.run(items, opts, transport=httpx.MockTransport(backend.handler)))
+
+        assert counts == {"ok": 22, "fallback": 0, "error": 1}
+        assert sorted(backend.batches) == [3, 10, 10]
+        assert len(backend.leads) == 22
+        journal = ScrapeJournal(str(tmp_path / "j.jsonl"))
+        assert journal.completed("biz0.com", crm=True) and not journal.scrape_done("biz7.com")
+        journal.close()
+        print(f"✓ 23 businesses in batches of {sorted(backend.batches)} after one 429")
+
+    def test_batches_never_share_a_domain_in_flight(self):
+        items = [{"name": f"Team {d}{i}", "industry": "general", "url": f"{d}.com/team{i}"}
+                 for i in range(6) for d in ("milb", "mlb", "nhl")]
+        backend = FakeBackend()
+        opts = make_opts(batch_size=2, concurrency=3, domain_interval=0.01)
+        counts = asyncio.run(bulk_loader.run(items, opts, transport=httpx.MockTransport(backend.handler)))
+
+        assert counts["ok"] == 18 and len(backend.batches) >= 9
+        assert backend.max_batches_per_domain == 1
+        assert backend.domain_intervals == {0.01}  # the API spaces same-host fetches inside a batch
+        print(f"✓ {len(backend.batches)} batches, never two on one domain at once")
+
+    def test_cut_stream_retries_only_missing_results(self):
+        items = [{"name": f"Biz {i}", "industry": "general", "url": f"biz{i}.com"} for i in range(8)]
+        backend = FakeBackend(cut_stream_after=5)
+        opts = make_opts(batch_size=8, concurrency=1)
+        counts = asyncio.run(bulk_loader.run(items, opts, transport=httpx.MockTransport(backend.handler)))
+
+        assert counts["ok"] == 8
+        assert backend.batches == [8, 3]
+        assert len(backend.scrapes) == 8  # nothing scraped twice
+        print("✓ Stream cut after 5 results; 3 pending re-sent")
+
+    def test_refresh_rechecks_existing_sites_and_reports_unchanged(self, capsys):
+        items = [{"name": f"Biz {i}", "industry": "general", "url": f"biz{i}.com"} for i in range(6)]
+        existing = ["https://biz0.com", "https://biz1.com", "https://biz2.com"]
+        backend = FakeBackend(existing=existing, unchanged={"https://biz0.com", "https://biz1.com"})
+        opts = make_opts(batch_size=10, concurrency=1, dedupe=True, refresh=True)
+        counts = asyncio.run(bulk_loader.run(items, opts, transport=httpx.MockTransport(backend.handler)))
+
+        assert counts == {"ok": 6, "fallback": 0, "error": 0}
+        assert backend.batches == [6]  # existing sites re-checked, not skipped
+        out = capsys.readouterr().out
+        assert out.count("(unchanged)") == 2 and "2 unchanged" in out
+        print("✓ 3 existing sites re-checked, 2 reported unchanged")
+
+
+class TestLoadStats:
+    """Per-stage timings, rolling throughput, ETA and the JSON summary"""
+
+    def test_rolling_rate_eta_and_percentiles(self):
+        now = [0.0]
+        stats = LoadStats(total=100, window=10, clock=lambda: now[0])
+        for i in range(40):
+            now[0] = i * 0.5  # 2 per second
+            stats.add("scrape_http", (i + 1) / 100)
+            stats.finish({"status": "error", "error_class": "http_503"} if i % 10 == 0 else {"status": "ok", "crm": True})
+
+        assert stats.rate() == pytest.approx(2.1, abs=0.01)  # 21 completions in the last 10s
+        assert stats.eta() == pytest.approx(60 / 2.1, abs=0.1)
+        summary = stats.summary()
+        assert summary["stages"]["scrape_http"]["p50_ms"] == 200 and summary["stages"]["scrape_http"]["p95_ms"] == 380
+        assert summary["error_classes"] == {"http_503": 4} and summary["error_rate"] == 0.1
+        assert summary["crm"] == {"pushed": 36}
+        assert "ETA 28s" in stats.progress_line()
+        print(f"✓ {stats.progress_line()}")
+
+    def test_batch_run_writes_stage_summary(self, tmp_path):
+        items = [{"name": f"Biz {i}", "industry": "general", "url": f"biz{i}.com"} for i in range(12)]
+        backend = FakeBackend(fail_names={"Biz 2"})
+        path = tmp_path / "stats.json"
+        opts = make_opts(batch_size=5, concurrency=2, crm=True, no_stats=False, stats_json=str(path))
+        asyncio.run(bulk_loader.run(items, opts, transport=httpx.MockTransport(backend.handler)))
+
+        summary = json.loads(path.read_text())
+        assert summary["done"] == 12 and summary["statuses"] == {"ok": 11, "error": 1}
+        assert summary["error_classes"] == {"scrape_failed": 1}
+        stages = summary["stages"]
+        assert stages["dedupe"]["count"] == 12 and stages["crm"]["count"] == 11
+        assert stages["scrape_http"]["count"] == 3  # one per batch
+        assert stages["llm"]["p50_ms"] == 900 and stages["site_fetch"]["count"] == 11
+        assert summary["bottleneck"] == "llm" and summary["options"]["batch_size"] == 5
+        print(f"✓ Stages: {sorted(stages)}; bottleneck {summary['bottleneck']}")
+
+    def test_streamed_input_gets_a_total_for_the_eta(self, tmp_path, capsys):
+        rows = [{"name": f"Biz {i}", "industry": "general", "url": f"biz{i}.com"} for i in range(6)]
+        rows.append(dict(rows[0], name="Biz 0 Again"))
+        path = tmp_path / "input.jsonl"
+        path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+        stats_json = tmp_path / "stats.json"
+        opts = make_opts(no_stats=False, stats_json=str(stats_json), progress_interval=0)
+        total = bulk_input.count_businesses(str(path))
+        asyncio.run(bulk_loader.run(bulk_input.iter_businesses(str(path)), opts,
+                                    transport=httpx.MockTransport(FakeBackend().handler), total=total))
+
+        summary = json.loads(stats_json.read_text())
+        assert total == 7 and summary["total"] == summary["done"] == 6  # the skipped duplicate leaves the total
+        out = capsys.readouterr().out
+        assert "Processing 7 businesses" in out and "[6/6]" in out and "ETA" in out
+        print("✓ Streamed run reports progress against a counted total")
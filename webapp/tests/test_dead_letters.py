@@ -0,0 +1,94 @@
+"""
+GreenLine365 Dead-Letter Store Tests (offline)
+Failed scrapes / CRM pushes are recorded, retried with backoff and reported
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+httpx = pytest.importorskip("httpx")
+import bulk_loader
+import push_to_crm
+import retry_dead_letters
+from dead_letters import BASE_DELAY, DeadLetters, backoff
+from test_bulk_loader import FakeBackend, make_opts
+from test_push_to_crm import FakeCrm, listings
+
+
+class TestDeadLetterStore:
+    """Attempts, backoff, abandonment and the domain report"""
+
+    def test_backoff_and_abandon(self):
+        dlq = DeadLetters(":memory:", max_attempts=3)
+        assert dlq.add("scrape", "alpha.com", {"url": "alpha.com"}, "http_503", domain="alpha.com", now=0) == "pending"
+        assert [e["key"] for e in dlq.due(now=BASE_DELAY)] == ["alpha.com"]
+        assert dlq.due(now=BASE_DELAY - 1) == []
+
+        dlq.add("scrape", "alpha.com", {"url": "alpha.com"}, "ReadTimeout", domain="alpha.com", now=BASE_DELAY)
+        entry = dlq.get("scrape", "alpha.com")
+        assert entry["attempts"] == 2 and entry["next_retry_at"] == BASE_DELAY + backoff(2) == 3 * BASE_DELAY
+        assert dlq.add("scrape", "alpha.com", {}, "ReadTimeout", domain="alpha.com", now=10 * BASE_DELAY) == "abandoned"
+        assert dlq.due(now=1e12) == []
+        print("✓ Exponential backoff, abandoned after max attempts")
+
+    def test_resolve_and_domain_report(self):
+        dlq = DeadLetters(":memory:")
+        for i in range(3):
+            dlq.add("scrape", f"milb.com/team{i}", {}, "http_403", domain="milb.com")
+        dlq.add("crm", "info@milb.com", {}, "http_409", domain="milb.com")
+        dlq.add("scrape", "bravo.com", {}, "ReadTimeout", domain="bravo.com")
+        dlq.resolve("scrape", "bravo.com")
+
+        report = dlq.domain_report(min_failures=2)
+        assert [row["domain"] for row in report] == ["milb.com"]
+        assert report[0]["attempts"] == 4 and report[0]["error_classes"] == ["http_403", "http_409"]
+        assert dlq.counts() == {"pending": 4, "resolved": 1}
+        print("✓ Resolved entries drop out of the failing-domain report")
+
+
+class TestRetryWorker:
+    """Failures from the loaders are drained by retry_dead_letters.py"""
+
+    def test_failed_scrapes_and_crm_pushes_are_retried(self, tmp_path):
+        path = str(tmp_path / "dlq.sqlite3")
+        items = [{"name": f"Biz {i}", "industry": "general", "url": f"biz{i}.com"} for i in range(5)]
+        backend = FakeBackend(fail_names={"Biz 1", "Biz 3"}, crm_down=True)
+        opts = make_opts(crm=True, dead_letters=path)
+        counts = asyncio.run(bulk_loader.run(items, opts, transport=httpx.MockTransport(backend.handler)))
+        assert counts["error"] == 2
+
+        dlq = DeadLetters(path)
+        assert dlq.get("scrape", "biz1.com")["error_class"] == "http_422"
+        assert dlq.get("crm", "info@biz0.com")["error_class"] == "http_503"
+        assert dlq.counts() == {"pending": 5}
+
+        backend.fail_names, backend.crm_down = set(), False
+        worker_opts = retry_dead_letters.parse_args(["--dead-letters", path, "--api-base", opts.api_base])
+        results = asyncio.run(retry_dead_letters.drain(dlq, worker_opts, httpx.MockTransport(backend.handler),
+                                                       now=1e12))
+        assert results["scrape"]["ok"] == 2 and results["crm"]["inserted"] == 3
+        assert dlq.counts() == {"resolved": 5}
+        assert len(backend.leads) == 2 + 3  # retried scrapes pushed with --crm, plus the retried leads
+        dlq.close()
+        print("✓ 2 scrapes and 3 CRM pushes resolved on retry")
+
+    def test_crm_sync_errors_are_dead_lettered(self, tmp_path):
+        path = str(tmp_path / "dlq.sqlite3")
+        rows = listings(10)
+        rows[4]["email"] = "bad-address@biz4.com"
+        crm = FakeCrm(rows)
+        opts = push_to_crm.parse_args(["--index", ":memory:", "--dead-letters", path])
+        counts = asyncio.run(push_to_crm.run(opts, transport=httpx.MockTransport(crm.handler)))
+        assert counts["error"] == 1
+
+        dlq = DeadLetters(path)
+        entry = dlq.get("crm", "bad-address@biz4.com")
+        assert entry["error_class"] == "http_400" and entry["domain"] == "biz4.com"
+        assert entry["payload"]["name"] == "Biz 4"
+        dlq.close()
+        print("✓ Rejected lead recorded with its error class")
@@ -0,0 +1,122 @@
+"""
+GreenLine365 Directory Index Tests (offline)
+Keyset/watermark sync of the local duplicate-detection index against an
+in-memory stand-in for the Supabase REST API
+"""
+
+import os
+import re
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+import directory_index
+from directory_index import DirectoryIndex
+
+KEYSET = re.compile(r'^\(updated_at\.gt\."(.+)",and\(updated_at\.eq\."(.+)",id\.gt\.(.+)\)\)$')
+NULLS_AFTER = re.compile(r'^\(and\(updated_at\.is\.null,id\.gt\.(.+)\),updated_at\.not\.is\.null\)$')
+
+
+class FakeRest:
+    """Just enough PostgREST filtering/ordering for the keyset queries"""
+
+    def __init__(self, tables):
+        self.tables = tables
+        self.requests = []
+
+    def get(self, table, params):
+        self.requests.append((table, dict(params)))
+        rows = sorted(self.tables.get(table, []), key=lambda r: (r["updated_at"] is not None, r["updated_at"] or "", r["id"]))
+        if "updated_at" in params:
+            since = params["updated_at"][len("gte."):]
+            rows = [r for r in rows if r["updated_at"] is not None and r["updated_at"] >= since]
+        if "or" in params:
+            m = KEYSET.match(params["or"])
+            if m:
+                ts, _, last_id = m.groups()
+                rows = [r for r in rows if r["updated_at"] is not None and
+                        (r["updated_at"] > ts or (r["updated_at"] == ts and r["id"] > last_id))]
+            else:
+                last_id = NULLS_AFTER.match(params["or"]).group(1)
+                rows = [r for r in rows if r["updated_at"] is not None or r["id"] > last_id]
+        return rows[:params["limit"]]
+
+
+def listing(i, updated_at, website=None, name=None, city="Tampa"):
+    return {"id": f"{i:04d}", "website": website or f"https://www.biz{i}.com/", "business_name": name or f"Biz {i}",
+            "city": city, "updated_at": updated_at}
+
+
+@pytest.fixture
+def small_pages(monkeypatch):
+    monkeypatch.setattr(directory_index, "PAGE_SIZE", 10)
+
+
+class TestDirectoryIndexSync:
+    """Initial and incremental syncs"""
+
+    def test_initial_sync_pages_through_ties(self, small_pages, tmp_path):
+        # 35 rows, 12 sharing each timestamp: page boundaries fall inside ties
+        rows = [listing(i, f"2026-02-0{1 + i // 12}T12:00:00+00:00") for i in range(35)]
+        rest = FakeRest({"directory_listings": rows, "crm_leads": []})
+        index = DirectoryIndex(str(tmp_path / "index.sqlite3"))
+
+        pulled = index.sync(rest.get)
+        assert pulled == {"directory_listings": 35, "crm_leads": 0}
+        assert index.counts() == {"listings": 35, "leads": 0}
+        assert len([r for r in rest.requests if r[0] == "directory_listings"]) == 4
+        print(f"✓ 35 rows in {len(rest.requests)} keyset requests")
+
+    def test_incremental_sync_pulls_only_changes(self, small_pages, tmp_path):
+        rows = [listing(i, f"2026-01-{1 + i:02d}T12:00:00+00:00") for i in range(25)]
+        leads = [{"id": "c1", "email": "Info@Biz1.com", "updated_at": "2026-02-01T12:00:00+00:00"}]
+        rest = FakeRest({"directory_listings": rows, "crm_leads": leads})
+        path = str(tmp_path / "index.sqlite3")
+        DirectoryIndex(path).sync(rest.get)
+
+        rows[3] = listing(3, "2026-02-05T09:00:00+00:00", website="https://biz3-new.com")
+        rows.append(listing(99, "2026-02-05T09:30:00+00:00", name="Gulf Coast Dental"))
+        rest.requests.clear()
+
+        index = DirectoryIndex(path)  # watermark survives a restart
+        pulled = index.sync(rest.get)
+        assert pulled["directory_listings"] == 3  # 2 changes + the watermark row re-read by the lookback
+        assert index.has_site("biz3-new.com") and not index.has_site("biz3.com")
+        assert index.has_name_city("Gulf Coast Dental LLC", "tampa")
+        assert index.has_email("info@biz1.com")
+        assert index.counts() == {"listings": 26, "leads": 1}
+        print(f"✓ Incremental sync pulled {pulled}")
+
+    def test_rows_without_updated_at_are_synced(self, small_pages, tmp_path):
+        rows = [listing(i, None) for i in range(12)] + [listing(50, "2026-02-01T12:00:00+00:00")]
+        rest = FakeRest({"directory_listings": rows})
+        index = DirectoryIndex(":memory:")
+        assert index.sync(rest.get, ("directory_listings",)) == {"directory_listings": 13}
+
+        index.rebuild()
+        assert index.counts()["listings"] == 0
+        index.sync(rest.get, ("directory_listings",))
+        assert index.counts()["listings"] == 13
+        print("✓ NULL updated_at rows paged, rebuild resyncs")
+
+
+class TestDirectoryIndexLookups:
+    """Normalized keys"""
+
+    def test_name_city_key_ignores_noise(self):
+        key = directory_index.name_city_key
+        assert key("The Alpha Plumbing, LLC", "Tampa") == key("alpha plumbing", "  tampa ") == "alpha plumbing|tampa"
+        assert key("Alpha Plumbing", "Orlando") != key("Alpha Plumbing", "Tampa")
+        assert key("The LLC", "Tampa") is None
+        print("✓ Name+city keys normalized")
+
+    def test_site_lookup_keeps_paths_distinct(self):
+        rest = FakeRest({"directory_listings": [listing(1, "2026-02-01T12:00:00+00:00", website="https://www.milb.com/dunedin")]})
+        index = DirectoryIndex(":memory:")
+        index.sync(rest.get, ("directory_listings",))
+        assert index.has_site("milb.com/dunedin/")
+        assert not index.has_site("milb.com/tampa")
+        assert index.site_keys() == {"milb.com/dunedin"}
+        print("✓ milb.com/dunedin indexed, milb.com/tampa not a dupe")
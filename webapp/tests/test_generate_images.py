@@ -0,0 +1,106 @@
+"""
+GreenLine365 Static Image Generator Tests (offline)
+Manifest-driven generation against the fake image provider
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+import generate_images
+from image_providers import FakeProvider, FakeProviderError
+
+
+def write_manifest(tmp_path, n=7, prompt="A sunny storefront"):
+    manifest = {
+        "styles": {"hero": {"system_message": "You are a photographer."}},
+        "images": [{"id": f"img-{i}", "output": f"public/images/img-{i}.png", "style": "hero",
+                    "prompt": f"{prompt} #{i}"} for i in range(n)],
+    }
+    path = tmp_path / "images.json"
+    path.write_text(json.dumps(manifest))
+    return path
+
+
+def make_opts(manifest, root, *args):
+    return generate_images.parse_args(["--manifest", str(manifest), "--root", str(root), "--provider", "fake",
+                                       "--no-derivatives", *args])
+
+
+class FlakyProvider(FakeProvider):
+    """Fake provider whose first call for each listed prompt is refused"""
+
+    def __init__(self, flaky=()):
+        super().__init__(latency="fixed:200", size="32x18")
+        self.flaky = set(flaky)
+
+    async def generate(self, prompt):
+        if prompt in self.flaky:
+            self.flaky.discard(prompt)
+            self.calls += 1
+            raise FakeProviderError("The response was blocked due to SAFETY (simulated)")
+        return await super().generate(prompt)
+
+
+class TestGenerateImages:
+    """Concurrency, lock-file skipping and failure retries"""
+
+    def test_generates_concurrently_then_skips_unchanged(self, tmp_path):
+        manifest = write_manifest(tmp_path)
+        provider = FlakyProvider()
+        factory = lambda name, system_message, concurrency: provider
+
+        started = time.monotonic()
+        results = asyncio.run(generate_images.run(make_opts(manifest, tmp_path), factory))
+        elapsed = time.monotonic() - started
+        assert len(results["ok"]) == 7 and not results["failed"]
+        assert elapsed < 1.0  # 7 x 200ms provider calls in parallel
+        assert (tmp_path / "public/images/img-3.png").read_bytes()[:4] == b"\x89PNG"
+
+        lock = json.loads((tmp_path / "images.lock.json").read_text())
+        assert lock["img-0"]["status"] == "ok" and lock["img-0"]["output"] == "public/images/img-0.png"
+
+        manifest_data = json.loads(manifest.read_text())
+        manifest_data["images"][2]["prompt"] = "A rainy storefront"
+        manifest.write_text(json.dumps(manifest_data))
+        provider.calls = 0
+        results = asyncio.run(generate_images.run(make_opts(manifest, tmp_path), factory))
+        assert results["ok"] == ["img-2"] and len(results["skipped"]) == 6
+        assert provider.calls == 1
+        print(f"✓ 7 images in {elapsed:.2f}s; rerun regenerated only the edited entry")
+
+    def test_failures_get_a_retry_round_and_are_picked_up_next_run(self, tmp_path):
+        manifest = write_manifest(tmp_path, n=3)
+        provider = FlakyProvider(flaky={"A sunny storefront #1"})
+        factory = lambda name, system_message, concurrency: provider
+
+        results = asyncio.run(generate_images.run(make_opts(manifest, tmp_path), factory))
+        assert sorted(results["ok"]) == ["img-0", "img-1", "img-2"]  # refusal retried in round 2
+
+        provider.flaky = {"A sunny storefront #0"}
+        results = asyncio.run(generate_images.run(make_opts(manifest, tmp_path, "--force", "--retry-rounds", "0",
+                                                            "--only", "img-0"), factory))
+        assert results["failed"] == ["img-0"]
+        lock = json.loads((tmp_path / "images.lock.json").read_text())
+        assert lock["img-0"]["status"] == "failed" and lock["img-0"]["error_class"] == "refusal"
+
+        results = asyncio.run(generate_images.run(make_opts(manifest, tmp_path), factory))
+        assert results["ok"] == ["img-0"] and sorted(results["skipped"]) == ["img-1", "img-2"]
+        print("✓ Failed image retried, then regenerated on the next run")
+
+    def test_manifest_validation_and_repo_manifest(self, tmp_path):
+        path = tmp_path / "bad.json"
+        path.write_text(json.dumps({"images": [{"id": "a", "output": "a.png", "prompt": "x", "style": "nope"}]}))
+        with pytest.raises(ValueError, match="unknown style"):
+            generate_images.load_manifest(str(path))
+
+        images = generate_images.load_manifest(generate_images.DEFAULT_MANIFEST)
+        assert {"dining", "nightlife", "hero-directory", "hero-directory-alt"} <= {e["id"] for e in images}
+        assert all(e["system_message"] for e in images)
+        print(f"✓ Repo manifest has {len(images)} images")
@@ -6,6 +6,7 @@ Tests all directory, review, stripe, chat, stats APIs
 import pytest
 import requests
 import os
+import uuid
 
 BASE_URL = "http://localhost:3000"
 
@@ -88,6 +89,37 @@ class TestDirectoryAPI:
         print(f"✓ Locked photos: {data.get('locked_photos_count')}")
 
 
+class TestDirectoryScrape:
+    """POST /api/directory/scrape against a site that can't be fetched"""
+
+    def test_unreachable_site_fallback_then_refresh_error(self):
+        """First scrape creates a fallback listing; a failed refresh leaves it untouched"""
+        url = f"https://test-unreachable-{uuid.uuid4().hex[:12]}.invalid"
+        payload = {
+            "url": url,
+            "fallback_name": "TEST_Unreachable Bakery",
+            "fallback_industry": "restaurants",
+            "fallback_city": "Tampa",
+            "fallback_state": "FL",
+        }
+
+        response = requests.post(f"{BASE_URL}/api/directory/scrape", json=payload)
+        assert response.status_code == 201
+        listing = response.json()["listing"]
+        assert listing["business_name"] == "TEST_Unreachable Bakery"
+        assert listing["city"] == "Tampa"
+        print(f"✓ First scrape created fallback listing {listing['slug']}")
+
+        response = requests.post(f"{BASE_URL}/api/directory/scrape", json={**payload, "fallback_name": "TEST_Renamed"})
+        assert response.status_code == 500
+        assert "no content" in response.json()["error"]
+
+        detail = requests.get(f"{BASE_URL}/api/directory/{listing['slug']}").json()
+        assert detail["business_name"] == "TEST_Unreachable Bakery"
+        assert detail["city"] == "Tampa"
+        print("✓ Failed refresh left the listing untouched")
+
+
 class TestReviewsAPI:
     """Reviews API tests"""
     
@@ -0,0 +1,115 @@
+"""
+GreenLine365 Image Derivatives Tests
+Tests the WebP/AVIF derivative pipeline and srcset manifest (runs offline)
+"""
+
+import io
+import json
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'services'))
+
+Image = pytest.importorskip("PIL.Image")
+from image_derivatives import (
+    blurhash,
+    build_derivatives,
+    build_generated_derivatives,
+    derivative_widths,
+    shutdown_pool,
+)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _pool():
+    yield
+    shutdown_pool()
+
+
+@pytest.fixture
+def source_png(tmp_path):
+    public = tmp_path / "public" / "images"
+    public.mkdir(parents=True)
+    path = public / "hero-test.png"
+    img = Image.new("RGB", (1000, 500))
+    for x in range(0, 1000, 10):
+        for y in range(0, 500, 10):
+            img.putpixel((x, y), (x % 256, y % 256, 128))
+    img.save(path)
+    return str(path)
+
+
+class TestDerivativeWidths:
+    """Width selection never upscales past the source"""
+
+    def test_small_source_keeps_original_width(self):
+        assert derivative_widths(500) == [320, 500]
+        print("✓ 500px source -> 320, 500")
+
+    def test_large_source_caps_at_max_width(self):
+        assert derivative_widths(4000) == [320, 640, 960, 1280, 1920]
+        print("✓ 4000px source capped at 1920")
+
+
+class TestBuildDerivatives:
+    """Manifest + files produced for a generated PNG"""
+
+    def test_manifest_written_with_srcset(self, source_png):
+        manifest = build_derivatives(source_png)
+        out_dir = os.path.join(os.path.dirname(source_png), "derivatives")
+
+        assert manifest["width"] == 1000
+        assert set(manifest["sources"]) == {"image/avif", "image/webp"}
+        for variants in manifest["sources"].values():
+            assert [v["width"] for v in variants] == [320, 640, 960, 1000]
+            for v in variants:
+                assert v["src"].startswith("/images/derivatives/hero-test-")
+                assert os.path.exists(os.path.join(out_dir, os.path.basename(v["src"])))
+        assert manifest["srcset"]["image/webp"].endswith("hero-test-1000.webp 1000w")
+
+        with open(os.path.join(out_dir, "hero-test.manifest.json")) as f:
+            assert json.load(f) == manifest
+        print(f"✓ {sum(len(v) for v in manifest['sources'].values())} derivatives written")
+
+    def test_placeholders(self, source_png):
+        manifest = build_derivatives(source_png, formats=("webp",))
+        placeholder = manifest["placeholder"]
+        assert len(placeholder["blurhash"]) == 28  # 4x3 components
+        assert placeholder["lqip"].startswith("data:image/webp;base64,")
+        print(f"✓ blurhash {placeholder['blurhash']}")
+
+    def test_blurhash_solid_color(self):
+        img = Image.new("RGB", (64, 64), (255, 0, 0))
+        assert blurhash(img, 1, 1) == "00TI:j"
+        print("✓ Solid red blurhash matches reference")
+
+
+class TestGeneratedDerivatives:
+    """Generated images: content-hash names, reuse and the entry cap"""
+
+    @staticmethod
+    def png_bytes(color):
+        buf = io.BytesIO()
+        Image.new("RGB", (400, 200), color).save(buf, "PNG")
+        return buf.getvalue()
+
+    def test_repeat_image_reuses_files_and_cap_evicts_oldest(self, tmp_path):
+        out_dir = str(tmp_path / "generated")
+        first = build_generated_derivatives(self.png_bytes((255, 0, 0)), out_dir, formats=("webp",))
+        files = sorted(os.listdir(out_dir))
+        mtimes = {name: os.path.getmtime(os.path.join(out_dir, name)) for name in files if name.endswith(".webp")}
+        time.sleep(0.01)
+        assert build_generated_derivatives(self.png_bytes((255, 0, 0)), out_dir, formats=("webp",)) == first
+        assert sorted(os.listdir(out_dir)) == files
+        assert all(os.path.getmtime(os.path.join(out_dir, name)) == mtime for name, mtime in mtimes.items())
+
+        for color in ((0, 255, 0), (0, 0, 255)):
+            time.sleep(0.01)
+            build_generated_derivatives(self.png_bytes(color), out_dir, max_entries=2, formats=("webp",))
+        manifests = [name for name in os.listdir(out_dir) if name.endswith(".manifest.json")]
+        assert len(manifests) == 2 and first["source"] not in os.listdir(out_dir)
+        assert not any(name.startswith(first["source"][:-4]) for name in os.listdir(out_dir))
+        print(f"✓ Repeat reused, cap kept {len(manifests)} sets")
@@ -0,0 +1,284 @@
+"""
+GreenLine365 Image Service Tests (offline)
+Runs the unified image service against the built-in fake provider
+"""
+
+import asyncio
+import base64
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'services'))
+
+pytest.importorskip("fastapi")
+from fastapi.testclient import TestClient
+
+import image_dedupe
+import image_providers
+from image_dedupe import ImageCache, hamming, image_hash, prompt_key
+from image_providers import FakeProvider, FakeProviderError
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setenv("IMAGE_PROVIDER", "fake")
+    monkeypatch.setenv("FAKE_IMAGE_LATENCY", "fixed:1")
+    monkeypatch.setenv("FAKE_IMAGE_SIZE", "64x36")
+    image_providers._instances.clear()
+    image_dedupe._cache = ImageCache(str(tmp_path / "cache"))
+    import image_service
+    with TestClient(image_service.app) as c:
+        yield c
+    image_providers._instances.clear()
+
+
+class TestFakeProvider:
+    """Deterministic synthetic PNGs with configurable failures"""
+
+    def test_same_prompt_same_png(self):
+        provider = FakeProvider(latency="fixed:0", size="32x18")
+        first = asyncio.run(provider.generate("hero shot"))
+        second = asyncio.run(provider.generate("hero shot"))
+        other = asyncio.run(provider.generate("dining shot"))
+
+        assert first["data"] == second["data"]
+        assert first["data"] != other["data"]
+        assert base64.b64decode(first["data"]).startswith(b"\x89PNG")
+        assert provider.stats()["calls"] == 3
+        print("✓ Fake provider output is deterministic per prompt")
+
+    def test_error_rate_one_always_raises(self):
+        provider = FakeProvider(latency="fixed:0", error_rate=1.0, errors="rate_limit")
+        with pytest.raises(FakeProviderError, match="429"):
+            asyncio.run(provider.generate("x"))
+        assert provider.stats()["errors"] == 1
+        print("✓ error_rate=1 raises simulated 429")
+
+    def test_invalid_latency_spec(self):
+        with pytest.raises(ValueError):
+            FakeProvider(latency="gaussian:10")
+
+
+class TestUnifiedEndpoints:
+    """Both endpoint shapes served by one app"""
+
+    def test_generate_image_multi(self, client):
+        response = client.post("/api/generate-image", json={"prompt": "Tampa skyline", "count": 3})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["success"] is True
+        assert len(data["images"]) == 3
+        print(f"✓ {data['message']}")
+
+    def test_generate_single(self, client):
+        response = client.post("/generate", json={"prompt": "Tampa skyline"})
+        data = response.json()
+        assert data["success"] is True
+        assert data["mime_type"] == "image/png"
+        print("✓ /generate returns a single image")
+
+    def test_caller_api_keys_are_not_cached(self, client):
+        for n in range(3):
+            response = client.post("/generate", json={"prompt": "Tampa skyline", "api_key": f"caller-key-{n}"})
+            assert response.json()["success"] is True
+        assert list(image_providers._instances) == ["fake"]
+        assert client.get("/health").json()["provider_stats"]["calls"] == 0  # served by per-request providers
+        print("✓ Caller-supplied keys get short-lived providers")
+
+    def test_health_reports_provider_stats(self, client):
+        client.post("/api/generate-image", json={"prompt": "x", "count": 2})
+        data = client.get("/health").json()
+        assert data["provider"] == "fake"
+        assert data["provider_stats"]["calls"] == 2
+        assert data["max_rss_kb"] > 0
+        assert data["deferred_imports"]["PIL.Image"]["state"] == "loaded"  # hashing needed it
+        print(f"✓ Health: {data['provider_stats']}")
+
+
+class FakeLlmChat:
+    """Stand-in for emergentintegrations' LlmChat: keeps history like the real session"""
+
+    instances = []
+
+    def __init__(self, api_key, session_id, system_message):
+        self.history = []
+        FakeLlmChat.instances.append(self)
+
+    def with_model(self, *model):
+        return self
+
+    def with_params(self, **params):
+        return self
+
+    async def send_message_multimodal_response(self, message):
+        self.history.append(message.text)
+        await asyncio.sleep(0.01)
+        return f"seen {len(self.history)}", [{"data": "aGk=", "mime_type": "image/png"}]
+
+
+class TestNanoBananaProvider:
+    """Real-provider plumbing against a stand-in SDK"""
+
+    def test_each_image_gets_a_fresh_chat(self, monkeypatch):
+        sdk = type("sdk", (), {"LlmChat": FakeLlmChat, "UserMessage": lambda text: type("m", (), {"text": text})})
+
+        class LoadedSdk:
+            async def load(self):
+                return sdk
+
+        monkeypatch.setattr(image_providers, "EMERGENT_CHAT", LoadedSdk())
+        FakeLlmChat.instances.clear()
+        provider = image_providers.NanoBananaProvider(api_key="key", concurrency=2)
+
+        async def run():
+            first = await provider.generate("first prompt")
+            in_flight = asyncio.create_task(provider.generate("second prompt"))
+            await asyncio.sleep(0)
+            await provider.close()  # must not break the call in flight
+            return first, await in_flight
+
+        first, second = asyncio.run(run())
+        assert first["text_response"] == second["text_response"] == "seen 1"
+        assert [chat.history for chat in FakeLlmChat.instances] == [["first prompt"], ["second prompt"]]
+        print("✓ No chat history shared between images")
+
+
+class TestDeferredImports:
+    """Heavy modules load in the background or on first use, never on the event loop"""
+
+    def test_load_get_and_status(self):
+        from deferred_imports import DeferredModule
+
+        module = DeferredModule("colorsys")
+        assert module.status()["state"] == "deferred"
+        loaded = asyncio.run(module.load())
+        assert loaded.__name__ == "colorsys" and module.get() is loaded
+        assert module.status()["state"] == "loaded" and module.status()["seconds"] is not None
+
+        missing = DeferredModule("no_such_sdk_for_tests")
+        missing.start()
+        with pytest.raises(ModuleNotFoundError):
+            asyncio.run(missing.load())
+        assert missing.status()["state"] == "error" and "no_such_sdk_for_tests" in missing.status()["error"]
+        print("✓ Deferred imports")
+
+
+class TestDeduplication:
+    """Near-duplicate variations are dropped/regenerated and cached"""
+
+    def test_identical_images_hash_equal(self):
+        png = FakeProvider(size="64x36").render("a")
+        other = FakeProvider(size="64x36").render("something else entirely")
+        assert hamming(image_hash(png), image_hash(png)) == 0
+        assert hamming(image_hash(png), image_hash(other)) > 6
+        print("✓ dHash separates distinct images")
+
+    def test_prompt_key_normalizes_wording(self):
+        assert prompt_key("Tampa skyline, at dusk!") == prompt_key("at dusk tampa SKYLINE")
+
+    def test_near_duplicates_regenerated(self, client, monkeypatch):
+        provider = image_providers.get_provider()
+        original = provider.render
+        # Every variation renders the same image until a regenerate suffix is used
+        regenerated = ("Distinctly", "Completely")
+        monkeypatch.setattr(
+            provider, "render", lambda prompt: original(prompt if any(w in prompt for w in regenerated) else "same")
+        )
+        data = client.post("/api/generate-image", json={"prompt": "Tampa skyline", "count": 3}).json()
+
+        assert data["duplicates_dropped"] == 2
+        assert len(data["images"]) == 3
+        assert len({img["phash"] for img in data["images"]}) == 3
+        print(f"✓ {data['duplicates_dropped']} duplicates dropped, {len(data['images'])} distinct kept")
+
+    def test_reuse_cached_skips_provider(self, client):
+        first = client.post("/api/generate-image", json={"prompt": "Ybor City street", "count": 2}).json()
+        calls = client.get("/health").json()["provider_stats"]["calls"]
+
+        second = client.post(
+            "/api/generate-image", json={"prompt": "ybor city street", "count": 2, "reuse_cached": True}
+        ).json()
+
+        assert second["cached"] == 2
+        assert {img["id"] for img in second["images"]} == {img["id"] for img in first["images"]}
+        assert client.get("/health").json()["provider_stats"]["calls"] == calls
+        print("✓ Cached images served without a provider call")
+
+
+@pytest.fixture
+def fast_retries(monkeypatch):
+    import image_retry
+    for policy in image_retry.RETRY_POLICIES.values():
+        monkeypatch.setattr(policy, "base_delay", 0.0)
+    image_retry._trackers.clear()
+    return image_retry
+
+
+class TestRetries:
+    """Error classification, retry policies, hedging and accounting"""
+
+    @pytest.mark.parametrize("error, expected", [
+        (asyncio.TimeoutError(), "timeout"),
+        (FakeProviderError(FakeProvider.ERROR_MESSAGES["rate_limit"]), "rate_limit"),
+        (FakeProviderError(FakeProvider.ERROR_MESSAGES["refusal"]), "refusal"),
+        (ConnectionResetError("Connection reset by peer"), "transport"),
+        (ValueError("bad json"), "unknown"),
+    ])
+    def test_classify_error(self, fast_retries, error, expected):
+        assert fast_retries.classify_error(error) == expected
+
+    def test_rate_limit_retried_until_policy_exhausted(self, fast_retries):
+        provider = FakeProvider(latency="fixed:0", error_rate=1.0, errors="rate_limit")
+        result, outcome = asyncio.run(fast_retries.generate_with_retry(provider, "x"))
+        assert result is None
+        assert outcome["attempts"] == fast_retries.RETRY_POLICIES["rate_limit"].max_attempts
+        assert outcome["error_class"] == "rate_limit"
+        print(f"✓ rate_limit retried {outcome['retries']} times")
+
+    def test_refusal_not_retried(self, fast_retries):
+        provider = FakeProvider(latency="fixed:0", error_rate=1.0, errors="refusal")
+        _, outcome = asyncio.run(fast_retries.generate_with_retry(provider, "x"))
+        assert outcome["attempts"] == 1
+
+    def test_hedged_call_wins_over_slow_primary(self, fast_retries, monkeypatch):
+        monkeypatch.setattr(fast_retries, "HEDGE_PERCENTILE", 50.0)
+        monkeypatch.setattr(fast_retries, "HEDGE_MIN_SAMPLES", 1)
+        provider = FakeProvider(latency="fixed:0", size="8x8")
+        fast_retries.get_latency_tracker(provider.name).record(0.01)
+        delays = iter([1.0, 0.0])  # primary stalls, hedge answers immediately
+        monkeypatch.setattr(provider, "sample_latency", lambda: next(delays))
+
+        async def run():
+            start = asyncio.get_running_loop().time()
+            result, outcome = await fast_retries.generate_with_retry(provider, "x")
+            return result, outcome, asyncio.get_running_loop().time() - start
+
+        result, outcome, elapsed = asyncio.run(run())
+        assert result is not None
+        assert outcome["hedged"] is True
+        assert elapsed < 0.5
+        print(f"✓ Hedged call returned in {elapsed * 1000:.0f}ms")
+
+    def test_response_accounts_for_partial_success(self, client, fast_retries, monkeypatch):
+        provider = image_providers.get_provider()
+        failing = {"Tampa skyline Alternative composition."}
+        original = provider.generate
+
+        async def flaky(prompt):
+            if prompt in failing:
+                raise FakeProviderError("503 Service Unavailable")
+            return await original(prompt)
+
+        monkeypatch.setattr(provider, "generate", flaky)
+        data = client.post("/api/generate-image", json={"prompt": "Tampa skyline", "count": 3}).json()
+
+        stats = data["stats"]
+        assert stats["requested"] == 3
+        assert stats["returned"] == 2
+        assert stats["failed"] == 1
+        assert stats["retried"] == fast_retries.RETRY_POLICIES["transport"].max_attempts - 1
+        assert stats["errors"] == {"transport": 3}
+        assert "2 of 3" in data["message"]
+        print(f"✓ {data['message']}")
@@ -0,0 +1,205 @@
+"""
+GreenLine365 CRM Push Tests (offline)
+Batched crm_leads upserts against a PostgREST stand-in
+"""
+
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+httpx = pytest.importorskip("httpx")
+import push_to_crm
+from test_directory_index import FakeRest
+
+
+def make_opts(**overrides):
+    opts = push_to_crm.parse_args(["--batch-size", "50", "--concurrency", "4"])
+    opts.index = ":memory:"
+    opts.dead_letters = ":memory:"
+    for key, value in overrides.items():
+        setattr(opts, key, value)
+    return opts
+
+
+class FakeCrm:
+    """directory_listings + crm_leads with on_conflict=email upsert semantics"""
+
+    def __init__(self, listings, existing=(), fail_posts=0, post_status=None):
+        self.listings = listings
+        self.fail_posts = fail_posts
+        self.post_status = post_status
+        # Existing leads belong to someone else: another source, tenant and hand-added tags
+        self.leads = {e: {"id": f"c{i}", "email": e, "status": "contacted", "name": "Old", "user_id": "other-tenant",
+                          "source": "referral", "tags": ["vip"], "notes": "met at expo",
+                          "updated_at": "2026-01-01T00:00:00+00:00"} for i, e in enumerate(existing)}
+        self.posts = []
+
+    def handler(self, request):
+        if request.method == "GET":
+            params = dict(request.url.params.items())
+            params["limit"] = int(params["limit"])
+            rest = FakeRest({"directory_listings": self.listings, "crm_leads": list(self.leads.values())})
+            return httpx.Response(200, json=rest.get(request.url.path.rsplit("/", 1)[1], params))
+
+        assert request.url.params["on_conflict"] == "email"
+        prefer = request.headers["prefer"]
+        rows = json.loads(request.content)
+        self.posts.append((prefer, len(rows)))
+        if self.fail_posts > 0:
+            self.fail_posts -= 1
+            return httpx.Response(503, json={"message": "unavailable"})
+        if self.post_status:
+            return httpx.Response(self.post_status, json={"message": "Invalid API key"})
+        if any(row["email"].startswith("bad") for row in rows):
+            return httpx.Response(400, json={"message": "new row violates check constraint"})
+
+        written = []
+        for row in rows:
+            if row["email"] in self.leads:
+                if "merge-duplicates" not in prefer:
+                    continue
+                self.leads[row["email"]].update(row)
+            else:
+                self.leads[row["email"]] = {"id": f"c{len(self.leads)}", "status": "new", **row}
+            written.append({"email": row["email"]})
+        return httpx.Response(201, json=written)
+
+
+def listings(n, start=0, updated_at="2026-02-01T12:00:00+00:00"):
+    return [{"id": f"l{i:04d}", "business_name": f"Biz {i}", "website": f"https://www.biz{i}.com",
+             "industry": "plumbing", "city": "Tampa", "state": "FL", "updated_at": updated_at}
+            for i in range(start, start + n)]
+
+
+class TestCrmUpsert:
+    """Per-row outcomes for batched upserts"""
+
+    def run(self, crm, **overrides):
+        opts = make_opts(**overrides)
+        return asyncio.run(push_to_crm.run(opts, transport=httpx.MockTransport(crm.handler)))
+
+    def test_batches_and_outcomes(self):
+        rows = listings(180) + [
+            {"id": "dup", "business_name": "Biz 0 Again", "website": "biz0.com", "updated_at": None},
+            {"id": "none", "business_name": "No Web", "updated_at": None},
+        ]
+        crm = FakeCrm(rows, existing=["info@biz1.com", "info@biz2.com"])
+        counts = self.run(crm)
+
+        assert counts["inserted"] == 178
+        assert counts["existing"] == 2
+        assert counts["duplicate"] == 1 and counts["no_email"] == 1
+        assert counts["requests"] == 4  # 180 leads / 50 per batch
+        assert all("resolution=ignore-duplicates" in prefer for prefer, _ in crm.posts)
+        assert crm.leads["info@biz1.com"]["status"] == "contacted"
+        print(f"✓ {dict(counts)}")
+
+    def test_merge_updates_without_resetting_status(self):
+        crm = FakeCrm(listings(10), existing=["info@biz3.com"])
+        counts = self.run(crm, merge=True)
+
+        assert counts["inserted"] == 9 and counts["updated"] == 1
+        lead = crm.leads["info@biz3.com"]
+        assert lead["company"] == "Biz 3" and lead["status"] == "contacted"
+        assert (lead["name"], lead["user_id"], lead["source"], lead["tags"], lead["notes"]) == (
+            "Old", "other-tenant", "referral", ["vip"], "met at expo")
+        assert "created_at" not in lead
+        assert crm.leads["info@biz4.com"]["source"] == "gl365_directory"  # new leads are inserted whole
+        print("✓ Merge filled contact fields only")
+
+    def test_rejected_batch_is_bisected_to_bad_rows(self, tmp_path):
+        rows = listings(40)
+        rows[17]["email"] = "bad-address@"
+        crm = FakeCrm(rows)
+        report = tmp_path / "report.jsonl"
+        counts = self.run(crm, report=str(report), batch_size=40)
+
+        assert counts["inserted"] == 39 and counts["error"] == 1
+        assert counts["requests"] <= 1 + 2 * 6  # one bisection path down to a single row
+        outcomes = [json.loads(line) for line in report.read_text().splitlines()]
+        assert len(outcomes) == 40
+        bad = [o for o in outcomes if o["outcome"] == "error"]
+        assert bad[0]["listing_id"] == "l0017" and "check constraint" in bad[0]["error"]
+        print(f"✓ Bad row isolated in {counts['requests']} requests")
+
+    def test_auth_error_fails_batch_without_bisecting(self):
+        crm = FakeCrm(listings(100), post_status=401)
+        counts = self.run(crm, batch_size=50)
+
+        assert counts["error"] == 100
+        assert counts["requests"] == 2  # one per batch, no split
+        print("✓ 401 failed each batch once")
+
+
+class TestIncrementalSync:
+    """--incremental: watermark paging, cron exit codes"""
+
+    @pytest.fixture
+    def small_pages(self, monkeypatch):
+        import directory_index
+        monkeypatch.setattr(directory_index, "PAGE_SIZE", 25)
+
+    def run(self, crm, index_path, *args):
+        opts = push_to_crm.parse_args(["--incremental", "--index", str(index_path),
+                                       "--dead-letters", ":memory:", *args])
+        return asyncio.run(push_to_crm.run(opts, transport=httpx.MockTransport(crm.handler)))
+
+    def test_second_run_only_pushes_changed_listings(self, small_pages, tmp_path):
+        index_path = tmp_path / "index.sqlite3"
+        rows = listings(60)
+        for i, row in enumerate(rows):
+            row["updated_at"] = f"2026-01-{1 + i // 3:02d}T00:00:00+00:00"  # 3 rows per day
+        crm = FakeCrm(rows)
+        counts = self.run(crm, index_path)
+        assert counts["inserted"] == 60 and not counts["incomplete"]
+
+        crm.listings[5].update(business_name="Biz Five Renamed", updated_at="2026-02-10T09:00:00+00:00")
+        crm.listings += listings(2, start=100, updated_at="2026-02-10T09:05:00+00:00")
+        crm.posts.clear()
+        counts = self.run(crm, index_path, "--merge")
+
+        # 3 changed rows + the 3 rows at the old watermark re-read by the lookback
+        assert counts["updated"] == 1 + 3 and counts["inserted"] == 2
+        assert sum(n for _, n in crm.posts) == 6
+        assert crm.leads["info@biz5.com"]["company"] == "Biz Five Renamed"
+        assert sorted(prefer.split(",")[0] for prefer, _ in crm.posts) == [
+            "resolution=ignore-duplicates", "resolution=merge-duplicates"]
+        print(f"✓ Second run pushed {sum(n for _, n in crm.posts)} of {len(crm.listings)} listings")
+
+    def test_incremental_leaves_leads_from_other_sources_alone(self, small_pages, tmp_path):
+        crm = FakeCrm(listings(10), existing=["info@biz1.com"])
+        before = dict(crm.leads["info@biz1.com"])
+        counts = self.run(crm, tmp_path / "index.sqlite3")
+
+        assert counts["inserted"] == 9 and counts["existing"] == 1
+        assert crm.leads["info@biz1.com"] == before
+        assert all("resolution=ignore-duplicates" in prefer for prefer, _ in crm.posts)
+        print("✓ Existing referral lead untouched by the incremental sync")
+
+    def test_transient_failure_keeps_watermark(self, small_pages, tmp_path):
+        index_path = tmp_path / "index.sqlite3"
+        crm = FakeCrm(listings(60), fail_posts=1)
+        counts = self.run(crm, index_path, "--batch-size", "100")
+        assert counts["incomplete"] == 1 and counts["transient_errors"] == 25
+
+        counts = self.run(crm, index_path, "--batch-size", "100")
+        assert not counts["incomplete"]
+        assert len(crm.leads) == 60
+        print("✓ Failed page retried on the next run")
+
+    def test_main_exit_codes_and_lock(self, tmp_path, monkeypatch):
+        index_path = tmp_path / ".cache" / "index.sqlite3"  # not created yet, as on a fresh checkout
+        held = push_to_crm.acquire_lock(str(index_path))
+        assert push_to_crm.main(["--incremental", "--index", str(index_path)]) == 2
+        held.close()
+
+        async def fake_run(opts, transport=None):
+            return {"incomplete": 1, "transient_errors": 3}
+        monkeypatch.setattr(push_to_crm, "run", fake_run)
+        assert push_to_crm.main(["--incremental", "--index", str(index_path)]) == 1
+        print("✓ Exit 2 while locked, 1 when incomplete")